@@ -2,26 +2,63 @@
 """
 设备配置迁移脚本 - 从复杂架构迁移到 Uptime Kuma
 将原 devices.yml 中的设备配置转换为 Uptime Kuma 导入格式
+
+设备清单逐个读取、监控项逐个写出，内存占用与设备数量无关，几十万个监控项的清单也可以直接转换。
 """
 
 import yaml
 import json
 import argparse
+import os
 import sys
+from collections import Counter
 from pathlib import Path
 
+UPTIME_KUMA_VERSION = "1.21.0"
+
+def _checked_device(device):
+    if not isinstance(device, dict):
+        raise ValueError(f"每个设备应为键值对，实际为 {type(device).__name__}: {device!r}")
+    return device
+
+def iter_devices_config(config_path):
+    """逐个产出设备配置；不会把整个清单加载到内存中
+
+    清单根节点为列表时按元素逐个解析，其他结构按原方式整体解析；根节点或某个设备的结构不对时抛出ValueError。
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        loader = yaml.SafeLoader(f)
+        try:
+            loader.get_event() # StreamStart
+            if loader.check_event(yaml.StreamEndEvent):
+                return
+            loader.get_event() # DocumentStart
+            if not loader.check_event(yaml.SequenceStartEvent):
+                devices = loader.construct_document(loader.compose_node(None, None)) or []
+                if not isinstance(devices, list):
+                    raise ValueError(f"根节点应为设备列表，实际为 {type(devices).__name__}")
+                for device in devices:
+                    yield _checked_device(device)
+                return
+            loader.get_event()
+            while not loader.check_event(yaml.SequenceEndEvent):
+                yield _checked_device(loader.construct_document(loader.compose_node(None, None)))
+        finally:
+            loader.dispose()
+
 def load_devices_config(config_path):
     """加载原设备配置文件"""
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            devices = yaml.safe_load(f)
-        return devices if devices else []
+        return list(iter_devices_config(config_path))
     except FileNotFoundError:
         print(f"错误: 找不到配置文件 {config_path}")
         return []
     except yaml.YAMLError as e:
         print(f"错误: YAML文件解析失败 {e}")
         return []
+    except ValueError as e:
+        print(f"错误: 设备配置格式不正确 {e}")
+        return []
 
 def convert_device_to_uptime_kuma(device):
     """将单个设备配置转换为 Uptime Kuma 监控项"""
@@ -149,24 +186,77 @@ def convert_device_to_uptime_kuma(device):
     
     return monitors
 
-def generate_uptime_kuma_config(devices):
-    """生成 Uptime Kuma 导入配置"""
-    all_monitors = []
-    
+class MigrationStats:
+    """转换过程中的计数，用于 --dry-run 摘要和完成提示"""
+
+    def __init__(self):
+        self.devices = 0
+        self.skipped = 0
+        self.monitors = 0
+        self.by_monitor_type = Counter()
+        self.by_device_type = Counter()
+
+    def print_summary(self):
+        print(f"设备: {self.devices} 个 (跳过 {self.skipped} 个)")
+        print(f"监控项: {self.monitors} 个")
+        for monitor_type, count in sorted(self.by_monitor_type.items()):
+            print(f"  {monitor_type}: {count}")
+        print("按设备类型:")
+        for device_type, count in sorted(self.by_device_type.items()):
+            print(f"  {device_type}: {count}")
+
+def iter_monitors(devices, stats=None):
+    """逐个产出监控项；stats不为None时同时累计计数"""
     for device in devices:
         monitors = convert_device_to_uptime_kuma(device)
-        all_monitors.extend(monitors)
-    
+        if stats is not None:
+            stats.devices += 1
+            if not monitors:
+                stats.skipped += 1
+            stats.monitors += len(monitors)
+            stats.by_device_type[str(device.get('type', 'unknown'))] += 1
+            stats.by_monitor_type.update(monitor['type'] for monitor in monitors)
+        yield from monitors
+
+def generate_uptime_kuma_config(devices):
+    """生成 Uptime Kuma 导入配置(全部在内存中，适合小规模清单；大清单使用write_uptime_kuma_config)"""
     # 生成配置文件结构
     config = {
-        "version": "1.21.0",
-        "monitors": all_monitors,
+        "version": UPTIME_KUMA_VERSION,
+        "monitors": list(iter_monitors(devices)),
         "notifications": [],  # 通知配置需要手动在界面中设置
         "tags": []
     }
     
     return config
 
+def write_uptime_kuma_config(monitors, f, compact=False):
+    """把监控项逐个写入f，输出与 json.dump(generate_uptime_kuma_config(...), indent=2) 相同
+
+    compact为True时不缩进、不换行，文件体积约为缩进格式的一半。返回写出的监控项数。
+    """
+    if compact:
+        dumps = lambda value: json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        f.write(f'{{"version":{dumps(UPTIME_KUMA_VERSION)},"monitors":[')
+        count = 0
+        for monitor in monitors:
+            if count:
+                f.write(',')
+            f.write(dumps(monitor))
+            count += 1
+        f.write('],"notifications":[],"tags":[]}')
+        return count
+
+    f.write(f'{{\n  "version": {json.dumps(UPTIME_KUMA_VERSION)},\n  "monitors": [')
+    count = 0
+    for monitor in monitors:
+        text = json.dumps(monitor, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+        f.write(f"{',' if count else ''}\n    {text}")
+        count += 1
+    f.write('\n  ],\n' if count else '],\n')
+    f.write('  "notifications": [],\n  "tags": []\n}')
+    return count
+
 def create_usage_guide(output_dir):
     """创建使用指南文件"""
     guide_content = """# Uptime Kuma 设备监控配置指南
@@ -322,39 +412,65 @@ def main():
     parser.add_argument('--output', '-o', default='uptime-kuma-config',
                        help='输出目录 (默认: uptime-kuma-config)')
     parser.add_argument('--dry-run', action='store_true',
-                       help='仅显示转换结果，不写入文件')
+                       help='仅统计转换结果(设备数、各类监控项数)，不写入文件')
+    parser.add_argument('--compact', action='store_true',
+                       help='输出不缩进的紧凑JSON，适合大规模清单')
     
     args = parser.parse_args()
     
-    # 加载设备配置
+    # 逐个读取设备配置并转换，不在内存中保留整个清单
     print(f"正在加载设备配置: {args.input}")
-    devices = load_devices_config(args.input)
-    
-    if not devices:
-        print("没有找到设备配置，退出")
+    if not os.path.exists(args.input):
+        print(f"错误: 找不到配置文件 {args.input}")
         sys.exit(1)
+    stats = MigrationStats()
+    monitors = iter_monitors(iter_devices_config(args.input), stats)
+    temp_file = None
+    error = None
     
-    print(f"找到 {len(devices)} 个设备")
+    try:
+        if args.dry_run:
+            for _ in monitors:
+                pass
+        else:
+            # 创建输出目录
+            output_dir = Path(args.output)
+            output_dir.mkdir(exist_ok=True)
+            
+            # 先写入临时文件，转换中途出错时不会留下不完整的配置文件
+            config_file = output_dir / "uptime-kuma-config.json"
+            temp_file = output_dir / "uptime-kuma-config.json.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                write_uptime_kuma_config(monitors, f, compact=args.compact)
+            if stats.devices:
+                os.replace(temp_file, config_file)
+    except yaml.YAMLError as e:
+        error = f"YAML文件解析失败 {e}"
+    except ValueError as e:
+        error = f"设备配置格式不正确 {e}"
+    except Exception as e:
+        error = f"转换失败 ({type(e).__name__}) {e}"
+    finally:
+        # 任何错误(包括中断)都不留下不完整的临时文件
+        if temp_file is not None and temp_file.exists():
+            temp_file.unlink()
     
-    # 转换配置
-    uptime_kuma_config = generate_uptime_kuma_config(devices)
+    if error:
+        print(f"错误: {error}")
+        sys.exit(1)
+    
+    if not stats.devices:
+        print("没有找到设备配置，退出")
+        sys.exit(1)
     
     if args.dry_run:
-        print("\n=== 转换结果预览 ===")
-        print(json.dumps(uptime_kuma_config, indent=2, ensure_ascii=False))
+        print("\n=== 转换结果摘要 ===")
+        stats.print_summary()
         return
     
-    # 创建输出目录
-    output_dir = Path(args.output)
-    output_dir.mkdir(exist_ok=True)
-    
-    # 写入配置文件
-    config_file = output_dir / "uptime-kuma-config.json"
-    with open(config_file, 'w', encoding='utf-8') as f:
-        json.dump(uptime_kuma_config, f, indent=2, ensure_ascii=False)
-    
+    print(f"找到 {stats.devices} 个设备")
     print(f"✅ Uptime Kuma配置文件已生成: {config_file}")
-    print(f"   生成了 {len(uptime_kuma_config['monitors'])} 个监控项")
+    print(f"   生成了 {stats.monitors} 个监控项")
     
     # 生成迁移指南（改为使用指南）
     create_usage_guide(output_dir)
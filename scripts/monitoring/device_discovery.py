@@ -128,27 +128,71 @@ def write_prometheus_sd_file(filepath, targets_config):
     except Exception as e:
         print(f"Error writing Prometheus SD config to {filepath}: {e}")
 
+# --- 发现结果缓存(可选) --- #
+# 默认每次运行都按设备清单重新生成。DISCOVERY_CACHE_TTL 大于0时把结果缓存到Redis，
+# 该时长内再次运行直接使用缓存(清单的修改最多晚这么久生效)。
+# Redis客户端与通知服务共用同一个工厂 redis_factory.py，连接参数通过REDIS_*环境变量配置，
+# 运行时需在PYTHONPATH中包含 scripts/notification；发现结果默认使用1号库，可用DISCOVERY_REDIS_DB覆盖
+DISCOVERY_CACHE_TTL = int(os.environ.get('DISCOVERY_CACHE_TTL', 0))
+DISCOVERY_REDIS_DB = int(os.environ.get('DISCOVERY_REDIS_DB', 1))
+redis_client = None
+
+def get_redis_client():
+    """首次使用缓存时才创建客户端"""
+    global redis_client
+    if redis_client is None:
+        from redis_factory import create_redis_client
+        redis_client = create_redis_client(db=DISCOVERY_REDIS_DB)
+    return redis_client
+
+def cache_discovery_results(targets, cache_type, ttl=300):
+    """缓存发现结果"""
+    cache_key = f"discovery:{cache_type}"
+    get_redis_client().setex(cache_key, ttl, json.dumps(targets))
+
+def get_cached_discovery_results(cache_type):
+    """获取缓存的发现结果"""
+    cache_key = f"discovery:{cache_type}"
+    cached = get_redis_client().get(cache_key)
+    return json.loads(cached) if cached else None
+
 # --- 主逻辑 --- #
-if __name__ == "__main__":
+def main():
     print("Starting device discovery and configuration generation...")
 
-    # 1. 加载设备清单
-    devices = load_device_inventory(DEVICE_INVENTORY_FILE)
-    if not devices:
-        print("No devices found in inventory. Exiting.")
-        exit(1)
-    
-    print(f"Loaded {len(devices)} devices from {DEVICE_INVENTORY_FILE}")
+    # 1. 开启缓存时先尝试使用缓存的结果；Redis不可用时直接重新生成
+    blackbox_sd_config = snmp_sd_config = None
+    if DISCOVERY_CACHE_TTL > 0:
+        try:
+            blackbox_sd_config = get_cached_discovery_results('blackbox')
+            snmp_sd_config = get_cached_discovery_results('snmp')
+        except (ImportError, redis.RedisError) as e:
+            print(f"Discovery cache unavailable, regenerating: {e}")
+            blackbox_sd_config = snmp_sd_config = None
+
+    if blackbox_sd_config is None or snmp_sd_config is None:
+        # 2. 加载设备清单
+        devices = load_device_inventory(DEVICE_INVENTORY_FILE)
+        if not devices:
+            print("No devices found in inventory. Exiting.")
+            exit(1)
+        print(f"Loaded {len(devices)} devices from {DEVICE_INVENTORY_FILE}")
+
+        # 3. 生成Blackbox Exporter与SNMP Exporter的目标
+        blackbox_sd_config = generate_blackbox_targets(devices)
+        snmp_sd_config = generate_snmp_targets(devices)
+        if DISCOVERY_CACHE_TTL > 0:
+            try:
+                cache_discovery_results(blackbox_sd_config, 'blackbox', DISCOVERY_CACHE_TTL)
+                cache_discovery_results(snmp_sd_config, 'snmp', DISCOVERY_CACHE_TTL)
+            except (ImportError, redis.RedisError) as e:
+                print(f"Could not cache discovery results: {e}")
 
-    # 2. 生成Blackbox Exporter的目标
-    blackbox_sd_config = generate_blackbox_targets(devices)
     if blackbox_sd_config:
         write_prometheus_sd_file(BLACKBOX_TARGETS_FILE, blackbox_sd_config)
     else:
         print("No Blackbox Exporter targets generated.")
 
-    # 3. 生成SNMP Exporter的目标
-    snmp_sd_config = generate_snmp_targets(devices)
     if snmp_sd_config:
         write_prometheus_sd_file(SNMP_TARGETS_FILE, snmp_sd_config)
     else:
@@ -168,2504 +212,5 @@ if __name__ == "__main__":
     # print("\nSNMP Targets Config:")
     # print(yaml.dump(snmp_sd_config, indent=2))
 
-redis_client = redis.Redis(host='redis', port=6379, db=1, decode_responses=True)
-
-def cache_discovery_results(targets, cache_type, ttl=300):
-    """缓存发现结果"""
-    cache_key = f"discovery:{cache_type}"
-    redis_client.setex(cache_key, ttl, json.dumps(targets))
-
-def get_cached_discovery_results(cache_type):
-    """获取缓存的发现结果"""
-    cache_key = f"discovery:{cache_type}"
-    cached = redis_client.get(cache_key)
-    return json.loads(cached) if cached else None
-
-def main():
-    # 尝试从缓存获取结果
-    blackbox_targets = get_cached_discovery_results('blackbox')
-    snmp_targets = get_cached_discovery_results('snmp')
-    
-    if not blackbox_targets or not snmp_targets:
-        # 缓存未命中，重新生成
-        devices = load_devices(DEVICES_FILE)
-        blackbox_targets = generate_blackbox_targets(devices)
-        snmp_targets = generate_snmp_targets(devices)
-        
-        # 缓存结果
-        cache_discovery_results(blackbox_targets, 'blackbox')
-        cache_discovery_results(snmp_targets, 'snmp')
-    
-    # 写入配置文件
-    write_prometheus_sd_file(blackbox_targets, BLACKBOX_SD_FILE)
-    write_prometheus_sd_file(snmp_targets, SNMP_SD_FILE)
-    
-    print("Device configuration generation complete.")
-
-    # 示例: 打印生成的配置 (用于调试)
-    # print("\nBlackbox Targets Config:")
-    # print(yaml.dump(blackbox_sd_config, indent=2))
-    # print("\nSNMP Targets Config:")
-    # print(yaml.dump(snmp_sd_config, indent=2))
-    
-    print("Device configuration generation complete.")
-
-    # 示例: 打印生成的配置 (用于调试)
-    # print("\nBlackbox Targets Config:")
-    # print(yaml.dump(blackbox_sd_config, indent=2))
-    # print("\nSNMP Targets Config:")
-    # print(yaml.dump(snmp_sd_config, indent=2))
-    
-    print("Device configuration generation complete.")
-
-    # 示例: 打印生成的配置 (用于调试)
-    # print("\nBlackbox Targets Config:")
-    # print(yaml.dump(blackbox_sd_config, indent=2))
-    # print("\nSNMP Targets Config:")
-    # print(yaml.dump(snmp_sd_config, indent=2))
-    
-    print("Device configuration generation complete.")
-
-    # 示例: 打印生成的配置 (用于调试)
-    # print("\nBlackbox Targets Config:")
-    # print(yaml.dump(blackbox_sd_config, indent=2))
-    # print("\nSNMP Targets Config:")
-    # print(yaml.dump(snmp_sd_config, indent=2))
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration generation complete.")
-    
-    print("Device configuration
\ No newline at end of file
+if __name__ == "__main__":
+    main()
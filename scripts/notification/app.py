@@ -1,45 +1,149 @@
 import os
 import json
 import logging
+import logging.handlers
+import queue
+import random
 import requests
-from flask import Flask, request, jsonify
-import yaml
+from flask import Flask, Response, request, jsonify
 import redis
 import hashlib
+import atexit
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from datetime import datetime, timedelta
 
+import metrics
+from audit_log import FILTERS as AUDIT_FILTERS, DeliveryAuditLog
+from circuit_breaker import BreakerRegistry
+from config_state import ConfigWatcher, NotificationState, read_config_file
+from delta import ALREADY_NOTIFIED, DeltaTracker
+from device_state import DeviceStateStore, device_ip
+from escalation import EscalationScheduler
+from fallback_store import TRANSIENT_ERRORS, UNAVAILABLE_ERRORS, LocalDedup, LocalDeviceStates, RedisHealth
+from flapping import flapping_summary_alert, is_flapping_summary
+from inventory import DeviceInventory
+from l1_cache import CacheInvalidator, LocalCache
+from lanes import LaneScheduler
+from message_templates import STILL_FIRING_FIELD
+from maintenance import MaintenanceStore
+from outages import OutageStats
+from redis_factory import create_redis_client
+from retry_queue import RetryJob, RetryQueue
+from routing import SUPPORTED_PLATFORMS
+from zabbix import ZabbixBatcher, is_native_event, normalize_event
+
 app = Flask(__name__)
 
 # 配置日志
+# 请求线程只把日志记录放入队列，格式化与I/O由后台QueueListener线程完成
 LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(level=LOG_LEVEL,
-                    format='%(asctime)s - %(levelname)s - %(message)s',
-                    handlers=[
-                        logging.StreamHandler(), # 输出到控制台
-                        # logging.FileHandler('/app/logs/notification.log') # 输出到文件 (确保目录存在且可写)
-                    ])
+# 完整payload的采样比例(0~1)，DEBUG级别下总是输出
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', 0))
+# 单行日志中最多列出的告警指纹数量
+LOG_MAX_FINGERPRINTS = int(os.environ.get('LOG_MAX_FINGERPRINTS', 10))
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """原样入队日志记录，不在调用线程中格式化消息"""
+    def prepare(self, record):
+        return record
+
+log_stream_handler = logging.StreamHandler() # 输出到控制台
+log_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+# log_file_handler = logging.FileHandler('/app/logs/notification.log') # 输出到文件 (确保目录存在且可写)
+log_queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+logging.basicConfig(level=LOG_LEVEL, handlers=[log_queue_handler])
+log_listener = None
+
+def start_log_listener():
+    """启动后台日志线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+    global log_listener
+    log_queue_handler.queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(log_queue_handler.queue, log_stream_handler,
+                                                  respect_handler_level=True)
+    log_listener.start()
+
+def stop_log_listener():
+    """停止后台日志线程，并输出队列中剩余的日志"""
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+start_log_listener()
+atexit.register(stop_log_listener)
 
 # 从环境变量或配置文件加载Webhook URL
-CONFIG_FILE_PATH = '/app/config/notification_config.yml'
+# 配置文件会被后台线程监视，修改后自动热加载，无需重启服务
+CONFIG_FILE_PATH = os.environ.get('CONFIG_FILE_PATH', '/app/config/notification_config.yml')
+CONFIG_RELOAD_INTERVAL = float(os.environ.get('CONFIG_RELOAD_INTERVAL', 5))
 
-DEFAULT_DINGTALK_WEBHOOK = os.environ.get('DINGTALK_WEBHOOK')
-DEFAULT_WECHAT_WEBHOOK = os.environ.get('WECHAT_WEBHOOK')
-DEFAULT_FEISHU_WEBHOOK = os.environ.get('FEISHU_WEBHOOK')
+ENV_WEBHOOKS = {
+    'dingtalk': os.environ.get('DINGTALK_WEBHOOK'),
+    'wechat': os.environ.get('WECHAT_WEBHOOK'),
+    'feishu': os.environ.get('FEISHU_WEBHOOK'),
+}
 
-config = {}
-if os.path.exists(CONFIG_FILE_PATH):
-    try:
-        with open(CONFIG_FILE_PATH, 'r') as f:
-            config = yaml.safe_load(f) or {}
+def build_state(config, version=None):
+    return NotificationState(config, ENV_WEBHOOKS, version)
+
+config, config_version = {}, None
+try:
+    config, config_version = read_config_file(CONFIG_FILE_PATH)
+    if config_version:
         logging.info(f"Loaded configuration from {CONFIG_FILE_PATH}")
-    except Exception as e:
-        logging.error(f"Error loading config file {CONFIG_FILE_PATH}: {e}")
+except Exception as e:
+    logging.error(f"Error loading config file {CONFIG_FILE_PATH}: {e}")
+try:
+    state = build_state(config, config_version)
+except Exception as e:
+    logging.error(f"Invalid configuration in {CONFIG_FILE_PATH}, using defaults: {e}")
+    state = build_state({})
+
+def swap_state(new_state, error):
+    """热加载回调：替换全局状态引用；在途请求持有的旧状态不受影响"""
+    global state
+    if new_state is None:
+        metrics.CONFIG_RELOADS.labels('failure').inc()
+        return
+    state = new_state
+    breakers.configure(new_state.breaker_settings)
+    retry_queue.configure(new_state.retry_settings)
+    lanes.configure(new_state.lane_settings)
+    metrics.CONFIG_RELOADS.labels('success').inc()
 
-DINGTALK_WEBHOOK = config.get('dingtalk_webhook', DEFAULT_DINGTALK_WEBHOOK)
-WECHAT_WEBHOOK = config.get('wechat_webhook', DEFAULT_WECHAT_WEBHOOK)
-FEISHU_WEBHOOK = config.get('feishu_webhook', DEFAULT_FEISHU_WEBHOOK)
+config_watcher = None
+
+def start_config_watcher():
+    """启动配置文件监视线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+    global config_watcher
+    if CONFIG_RELOAD_INTERVAL <= 0:
+        return
+    config_watcher = ConfigWatcher(CONFIG_FILE_PATH, build_state, swap_state,
+                                   interval=CONFIG_RELOAD_INTERVAL, current_version=state.version)
+    config_watcher.start()
+
+# HTTP连接池：复用到各厂商Webhook的keep-alive连接，避免每条消息重新握手TLS
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 20))
+
+def create_http_session():
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+http_session = create_http_session()
 
 # --- 辅助函数：发送通知 --- #
+def vendor_error_code(error):
+    """请求异常对应的错误码：HTTP错误取状态码，网络错误取异常类型"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return response.status_code
+    return type(error).__name__
+
 def send_dingtalk_message(webhook_url, title, message_markdown, at_mobiles=None, is_at_all=False):
     if not webhook_url:
         logging.warning("DingTalk webhook URL is not configured.")
@@ -56,17 +160,21 @@ def send_dingtalk_message(webhook_url, title, message_markdown, at_mobiles=None,
             "isAtAll": is_at_all
         }
     }
+    started = time.perf_counter()
     try:
-        response = requests.post(webhook_url, headers=headers, data=json.dumps(payload), timeout=10)
+        response = http_session.post(webhook_url, headers=headers, data=json.dumps(payload), timeout=10)
         response.raise_for_status() # 如果HTTP状态码是4xx/5xx，则抛出异常
         result = response.json()
         if result.get("errcode") == 0:
             logging.info(f"DingTalk message sent successfully: {title}")
+            metrics.observe_delivery('dingtalk', started, True)
             return True, "Sent"
         else:
             logging.error(f"Failed to send DingTalk message: {result.get('errmsg')}")
+            metrics.observe_delivery('dingtalk', started, False, result.get('errcode'))
             return False, result.get('errmsg')
     except requests.exceptions.RequestException as e:
+        metrics.observe_delivery('dingtalk', started, False, vendor_error_code(e))
         logging.error(f"Error sending DingTalk message: {e}")
         return False, str(e)
 
@@ -81,17 +189,21 @@ def send_wechat_message(webhook_url, content_markdown):
             "content": content_markdown
         }
     }
+    started = time.perf_counter()
     try:
-        response = requests.post(webhook_url, headers=headers, data=json.dumps(payload), timeout=10)
+        response = http_session.post(webhook_url, headers=headers, data=json.dumps(payload), timeout=10)
         response.raise_for_status()
         result = response.json()
         if result.get("errcode") == 0:
             logging.info(f"WeChat message sent successfully.")
+            metrics.observe_delivery('wechat', started, True)
             return True, "Sent"
         else:
             logging.error(f"Failed to send WeChat message: {result.get('errmsg')}")
+            metrics.observe_delivery('wechat', started, False, result.get('errcode'))
             return False, result.get('errmsg')
     except requests.exceptions.RequestException as e:
+        metrics.observe_delivery('wechat', started, False, vendor_error_code(e))
         logging.error(f"Error sending WeChat message: {e}")
         return False, str(e)
 
@@ -128,189 +240,1196 @@ def send_feishu_message(webhook_url, title, text_content):
     #         "text": f"{title}\n{text_content}"
     #     }
     # }
+    started = time.perf_counter()
     try:
-        response = requests.post(webhook_url, headers=headers, data=json.dumps(payload), timeout=10)
+        response = http_session.post(webhook_url, headers=headers, data=json.dumps(payload), timeout=10)
         response.raise_for_status()
         result = response.json()
         if result.get("StatusCode") == 0 or result.get("code") == 0: # 飞书API成功响应码可能不同
             logging.info(f"Feishu message sent successfully: {title}")
+            metrics.observe_delivery('feishu', started, True)
             return True, "Sent"
         else:
             logging.error(f"Failed to send Feishu message: {result.get('msg') or result.get('message')}")
+            metrics.observe_delivery('feishu', started, False, result.get('code', result.get('StatusCode')))
             return False, result.get('msg') or result.get('message')
     except requests.exceptions.RequestException as e:
+        metrics.observe_delivery('feishu', started, False, vendor_error_code(e))
         logging.error(f"Error sending Feishu message: {e}")
         return False, str(e)
 
 # --- Alertmanager Webhook处理函数 --- #
-def format_alertmanager_payload(payload, platform):
-    alerts_markdown = []
-    title_prefix = "Prometheus告警"
-    common_summary = payload.get('commonAnnotations', {}).get('summary', 'N/A')
+# 消息模板在加载配置时编译一次，可在notification_config.yml的templates中按平台/alertname覆盖
+# 返回 (标题, [分片正文...])：超过平台消息字节上限(message_limits)的告警组被拆成多条消息
+def format_alertmanager_payload(payload, platform, current=None):
+    return (current or state).templates.render_chunks(payload, platform)
+
+class LazyJson:
+    """延迟到日志后台线程中才序列化，紧凑格式，不做缩进美化"""
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return json.dumps(self.obj, ensure_ascii=False, separators=(',', ':'))
+
+def log_webhook_payload(platform, payload):
+    """输出单行结构化摘要；完整payload仅在DEBUG级别或被采样时输出"""
+    logger = logging.getLogger()
+    if logger.isEnabledFor(logging.INFO):
+        alerts = payload.get('alerts', [])
+        firing = sum(1 for alert in alerts if alert.get('status') == 'firing')
+        fingerprints = ','.join(alert.get('fingerprint', '-') for alert in alerts[:LOG_MAX_FINGERPRINTS])
+        if len(alerts) > LOG_MAX_FINGERPRINTS:
+            fingerprints += ',...'
+        logger.info("webhook platform=%s status=%s group=%s alerts=%d firing=%d resolved=%d fingerprints=%s",
+                    platform, payload.get('status'), payload.get('groupKey', '-'), len(alerts),
+                    firing, len(alerts) - firing, fingerprints)
+    if logger.isEnabledFor(logging.DEBUG):
+        level = logging.DEBUG
+    elif LOG_PAYLOAD_SAMPLE_RATE and random.random() < LOG_PAYLOAD_SAMPLE_RATE:
+        level = logging.INFO
+    else:
+        return
+    logger.log(level, "webhook payload platform=%s: %s", platform, LazyJson(payload))
+
+# --- 路由与投递 --- #
+# 路由表在加载配置时编译；未配置routes的平台以 dingtalk_webhook 等旧配置兜底
+# default/zabbix 路由沿用钉钉目的地
+ROUTE_PLATFORM_ALIASES = {'default': 'dingtalk', 'zabbix': 'dingtalk'}
+
+def send_platform_message(destination, title, message):
+    if destination.platform == 'dingtalk':
+        return send_dingtalk_message(destination.url, title, message)
+    elif destination.platform == 'wechat':
+        return send_wechat_message(destination.url, message)
+    elif destination.platform == 'feishu':
+        return send_feishu_message(destination.url, title, message)
+    return False, f"Unsupported platform: {destination.platform}"
+
+# 投递审计日志：每次投递尝试(含重试、故障转移各跳与升级通知)的结果写入本地SQLite文件，见audit_log.py
+# AUDIT_LOG_PATH 为空时不记录；AUDIT_LOG_MAX_MB 为数据占用空间上限，超出后从最早的记录开始删除
+AUDIT_LOG_PATH = os.environ.get('AUDIT_LOG_PATH', '/app/logs/deliveries.db')
+AUDIT_LOG_MAX_MB = float(os.environ.get('AUDIT_LOG_MAX_MB', 512))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.environ.get('AUDIT_LOG_FLUSH_INTERVAL', 1.0))
+audit_log = DeliveryAuditLog(AUDIT_LOG_PATH, int(AUDIT_LOG_MAX_MB * 1024 * 1024), AUDIT_LOG_FLUSH_INTERVAL)
+
+def audit_subjects(alerts):
+    """消息中各告警的 (指纹, 设备IP, alertname, 状态)，随消息传给send_to_destination与重试队列"""
+    if not audit_log.enabled:
+        return ()
+    return tuple((alert_fingerprint(alert), device_ip(alert.get('labels', {})) or None,
+                  alert.get('labels', {}).get('alertname', ''), alert.get('status', '')) for alert in alerts)
+
+# 每个目的地一个熔断器：厂商故障时快速失败并转入重试队列，避免线程堆积在10秒超时上拖累其他渠道
+breakers = BreakerRegistry(state.breaker_settings)
+
+def send_to_destination(destination, title, message, subjects=(), attempt=0):
+    """subjects为消息中各告警的审计信息(见audit_subjects)，attempt为重试次数(首次发送为0)"""
+    breaker = breakers.get(destination)
+    if not breaker.allow():
+        audit_log.record(destination, subjects, attempt, False, 0, "Circuit open")
+        return False, "Circuit open"
+    started = time.perf_counter()
+    success, response_message = False, "Send raised"
+    try:
+        success, response_message = send_platform_message(destination, title, message)
+    finally:
+        elapsed = time.perf_counter() - started
+        breaker.record(success, elapsed)
+        audit_log.record(destination, subjects, attempt, success, elapsed, response_message)
+    return success, response_message
+
+def retry_send(job):
+    success, _ = send_to_destination(job.destination, job.title, job.message, job.subjects, job.attempt)
+    return success
+
+def submit_retry(job):
+    """到期的重试交给消息所属lane的worker执行，critical消息的重试不排在warning的重试之后"""
+    return job.lane is not None and lanes.submit(job.lane, retry_queue.attempt, job)
+
+retry_queue = RetryQueue(retry_send, state.retry_settings, submit_retry)
+
+# --- 分片发送 --- #
+# 同一目的地的多个分片在所属lane的线程池中并行发送；分片可能乱序到达，正文中的 "(第i/n部分)" 用于区分
+
+def chunk_titles(title, chunks):
+    total = len(chunks)
+    if total == 1:
+        return [title]
+    return [f"{title} ({index}/{total})" for index in range(1, total + 1)]
+
+def send_chunks(destination, title, chunks, subjects=(), lane=None):
+    """发送同一目的地的各分片，返回与chunks一一对应的 (标题, success, 说明) 列表；lane为所属的优先级lane"""
+    titles = chunk_titles(title, chunks)
+    if len(chunks) == 1:
+        try:
+            success, response_message = send_to_destination(destination, titles[0], chunks[0], subjects)
+        except Exception as e:
+            success, response_message = False, str(e)
+        return [(titles[0], success, response_message)]
+    chunk_executor, _ = lanes.executors(lane)
+    futures = [chunk_executor.submit(send_to_destination, destination, chunk_title, chunk, subjects)
+               for chunk_title, chunk in zip(titles, chunks)]
+    results = []
+    for chunk_title, future in zip(titles, futures):
+        try:
+            success, response_message = future.result()
+        except Exception as e:
+            success, response_message = False, str(e)
+        results.append((chunk_title, success, response_message))
+    return results
+
+def send_all_chunks(destination, title, chunks, subjects=(), lane=None):
+    """所有分片都送达才算成功；用作故障转移中的一跳"""
+    failed = [response_message for _, success, response_message
+              in send_chunks(destination, title, chunks, subjects, lane) if not success]
+    return not failed, "; ".join(failed) or "Sent"
+
+def queue_for_retry(destination, titled_chunks, subjects=(), lane=None):
+    """把未送达的分片交给重试队列；返回未能入队的分片数"""
+    return sum(1 for chunk_title, chunk in titled_chunks
+               if not retry_queue.put(RetryJob(destination, chunk_title, chunk, subjects=subjects, lane=lane)))
+
+# --- 故障转移 --- #
+# 路由规则可配置 failover.chain(按顺序的备用目的地)与 failover.deadline(每一跳的等待秒数)。
+# 主目的地在deadline内未确认送达时并行启动下一跳，先确认送达的一跳即视为投递成功；
+# 已启动的较慢一跳不会被取消，因此极端情况下可能两个渠道都收到消息，以重复换取有界的通知延迟。
+# 各跳在所属lane的故障转移线程池中发送(见lanes.py)。
+
+def _await_hops(pending, errors, deadline, latest=None):
+    """等待已启动的各跳，直到有一跳送达、最新一跳失败、全部失败或到达deadline(None表示不限)
+
+    返回送达的 (跳序号, 目的地)，未送达时返回None。
+    """
+    while pending:
+        timeout = None if deadline is None else deadline - time.monotonic()
+        if timeout is not None and timeout <= 0:
+            return None
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            position, hop = pending.pop(future)
+            try:
+                success, response_message = future.result()
+            except Exception as e:
+                success, response_message = False, str(e)
+            if success:
+                return position, hop
+            errors.append(f"{hop.name}: {response_message}")
+        if latest in done and deadline is not None:
+            # 最新一跳明确失败时不必等满deadline，立即启动下一跳
+            return None
+    return None
+
+def send_with_failover(primary, failover, title, chunks, payload, title_prefix="", current=None, subjects=(),
+                       lane=None):
+    """按故障转移链投递(每一跳按该平台的上限重新分片)，返回 (实际送达的目的地或None, 结果说明)"""
+    hops = (primary,) + tuple(d for d in failover.chain if d.name != primary.name)
+    rendered = {primary.platform: (title, chunks)}
+    _, failover_executor = lanes.executors(lane)
+    pending, errors = {}, []
+    delivered = None
+    for position, hop in enumerate(hops):
+        if hop.platform not in rendered:
+            hop_title, hop_chunks = format_alertmanager_payload(payload, hop.platform, current)
+            rendered[hop.platform] = (f"{title_prefix}{hop_title}", hop_chunks)
+        hop_title, hop_chunks = rendered[hop.platform]
+        if not hop_chunks:
+            continue
+        if position:
+            metrics.FAILOVER_HOPS.labels(primary.name).inc()
+        future = failover_executor.submit(send_all_chunks, hop, hop_title, hop_chunks, subjects, lane)
+        pending[future] = (position, hop)
+        delivered = _await_hops(pending, errors, time.monotonic() + failover.deadline, future)
+        if delivered:
+            break
+    else:
+        # 最后一跳之后没有后继，等到已启动的各跳都有结果
+        delivered = _await_hops(pending, errors, None)
 
+    if delivered is None:
+        metrics.FAILOVER_DELIVERIES.labels(primary.name, 'none', 'none').inc()
+        return None, "; ".join(errors) or "No hop confirmed delivery"
+    position, hop = delivered
+    metrics.FAILOVER_DELIVERIES.labels(primary.name, hop.name, 'primary' if position == 0 else f"fallback{position}").inc()
+    if position:
+        logging.warning(f"Delivered via {hop.name} (hop {position}) for {primary.name}; "
+                        f"earlier hops: {'; '.join(errors) or 'no confirmation within deadline'}")
+    return hop, "Sent"
+
+def deliver(channel, payload, title_prefix="", current=None, lane=None):
+    """按路由表把告警分组发送到各目的地；lane为告警所属的优先级lane，发送与重试使用该lane的线程
+
+    返回 (success, message)；没有需要发送的内容时success为None。
+    """
+    current = current or state
+    groups = current.routing.group_alerts(channel, payload.get('alerts', []), payload.get('commonLabels'))
+    if not groups:
+        logging.warning(f"No {channel} destination configured for these alerts.")
+        return False, "Unknown platform or not configured"
+
+    sent, queued, errors = [], [], []
+    tracked = []
+    for (destination, failover, escalation), alerts in groups.items():
+        # 恢复告警在接收时已停止跟踪(见untrack_resolved)，这里只开始跟踪firing告警
+        if escalation is not None:
+            for alert in alerts:
+                if alert.get('status') == 'firing' and not is_flapping_summary(alert):
+                    tracked.append((destination, escalation, alert_fingerprint(alert), alert, channel, title_prefix))
+        # 组内已通知过的持续告警不再渲染正文，只在消息末尾计数
+        fresh = [alert for alert in alerts if not alert.get(ALREADY_NOTIFIED)]
+        if not fresh:
+            continue
+        group_payload = dict(payload, alerts=fresh)
+        if len(fresh) < len(alerts):
+            group_payload[STILL_FIRING_FIELD] = len(alerts) - len(fresh)
+        title, chunks = format_alertmanager_payload(group_payload, channel, current)
+        if not chunks:
+            continue
+        title = f"{title_prefix}{title}"
+        subjects = audit_subjects(fresh)
+        if failover is None:
+            results = send_chunks(destination, title, chunks, subjects, lane)
+            failed = [(chunk_title, chunk, response_message)
+                      for (chunk_title, success, response_message), chunk in zip(results, chunks) if not success]
+            if not failed:
+                sent.append(destination.name)
+                continue
+            response_message = failed[0][2]
+            unsent = [(chunk_title, chunk) for chunk_title, chunk, _ in failed]
+        else:
+            delivered_by, response_message = send_with_failover(
+                destination, failover, title, chunks, group_payload, title_prefix, current, subjects, lane)
+            if delivered_by is not None:
+                sent.append(delivered_by.name if delivered_by is destination else f"{delivered_by.name} (failover for {destination.name})")
+                continue
+            unsent = list(zip(chunk_titles(title, chunks), chunks))
+
+        # 失败或熔断的分片由重试队列负责后续投递
+        if queue_for_retry(destination, unsent, subjects, lane):
+            errors.append(f"{destination.name}: {response_message}")
+        else:
+            logging.warning(f"Delivery of {len(unsent)}/{len(chunks)} message(s) to {destination.name} failed "
+                            f"({response_message}), queued for retry")
+            queued.append(destination.name)
+
+    if tracked:
+        sync_escalations(tracked, [], [], current)
+
+    if not sent and not queued and not errors:
+        return None, "No alerts to send"
+    if errors:
+        return False, "; ".join(errors)
+    if queued:
+        return True, "; ".join(filter(None, [sent and f"Sent to {', '.join(sent)}", f"Queued for retry: {', '.join(queued)}"]))
+    return True, "Sent" if len(sent) == 1 else f"Sent to {', '.join(sent)}"
+
+# --- 优先级lane --- #
+# 告警按severity分到各lane(配置见notification_config.yml中的lanes)，由lane的worker异步投递，
+# 请求线程只负责入队，大量warning不会占住处理critical的线程。lane队列满时在请求线程中直接投递。
+# 每个lane有各自的分片与故障转移线程池，大小为该lane可用的worker数乘以 LANE_SEND_THREADS。
+LANE_SEND_THREADS = int(os.environ.get('LANE_SEND_THREADS', 4))
+lanes = LaneScheduler(state.lane_settings, LANE_SEND_THREADS)
+
+def deliver_logged(channel, payload, title_prefix, current, on_failure=None, lane=None):
+    """投递一个lane的告警，返回 (success, message)
+
+    发送失败的消息已由deliver交给重试队列；连重试队列也无法接收(或投递出错)时调用 on_failure(需要发送的告警)，
+    撤销接收时记录的去重等状态，调用方(如Alertmanager)重发时会重新投递，而不是被判定为重复。
+    """
+    try:
+        success, response_message = deliver(channel, payload, title_prefix, current, lane)
+    except Exception as e:
+        logging.error(f"Delivering {channel} alerts raised: {e}", exc_info=True)
+        success, response_message = False, str(e)
+    if success is False:
+        logging.error(f"Delivering {len(payload.get('alerts', []))} {channel} alert(s) failed: {response_message}")
+        if on_failure is not None:
+            on_failure([alert for alert in payload.get('alerts', []) if not alert.get(ALREADY_NOTIFIED)])
+    return success, response_message
+
+def has_destination(channel, payload, current):
+    """入队前同步检查路由，没有任何目的地时调用方直接返回错误"""
+    return bool(current.routing.group_alerts(channel, payload.get('alerts', []), payload.get('commonLabels')))
+
+def dispatch(channel, payload, title_prefix="", current=None, on_failure=None):
+    """按lane拆分告警并入队投递，返回 ({lane: 需要发送的告警数}, 错误列表)
+
+    只有已通知过的持续告警的lane不投递。lane队列满或未启动时在请求线程中直接投递，失败时计入错误列表；
+    lane中的异步投递失败时调用on_failure，见deliver_logged。
+    """
+    current = current or state
+    groups = {}
     for alert in payload.get('alerts', []):
-        status = alert.get('status', 'firing').upper()
-        summary = alert.get('annotations', {}).get('summary', common_summary)
-        description = alert.get('annotations', {}).get('description', '无详细描述')
-        instance = alert.get('labels', {}).get('instance', 'N/A')
-        alertname = alert.get('labels', {}).get('alertname', 'N/A')
-        severity = alert.get('labels', {}).get('severity', 'N/A').upper()
-        starts_at = alert.get('startsAt', 'N/A')
-        
-        grafana_link = payload.get('externalURL', '') # Alertmanager的externalURL，可以指向Grafana
-        # 尝试从告警标签或注释中获取更具体的Grafana链接
-        if 'grafana_link' in alert.get('annotations', {}):
-            grafana_link = alert['annotations']['grafana_link']
-        elif grafana_link and alertname != 'N/A' and instance != 'N/A':
-             # 尝试构建一个通用的Grafana explore链接
-            query_expr = f"{{alertname='{alertname}', instance='{instance}'}}"
-            grafana_link = f"{grafana_link.replace('/alerts', '/explore')}?orgId=1&left=%5B%22now-1h%22,%22now%22,%22Prometheus%22,%7B%22expr%22:%22{requests.utils.quote(alertname + query_expr)}%22%7D%5D"
-
-        title = f"[{status}] {alertname} - {instance}"
-        if platform == "dingtalk":
-            md = f"#### {title}\n\n"
-            md += f"- **级别**: {severity}\n"
-            md += f"- **摘要**: {summary}\n"
-            md += f"- **详情**: {description}\n"
-            md += f"- **开始时间**: {starts_at.split('.')[0].replace('T', ' ')}\n"
-            if grafana_link:
-                md += f"- **[查看Grafana]({grafana_link})**\n"
-            alerts_markdown.append(md)
-        elif platform == "wechat":
-            md = f"**{title}**\n"
-            md += f">级别: <font color=\"warning\">{severity}</font>\n"
-            md += f">摘要: {summary}\n"
-            md += f">详情: {description}\n"
-            md += f">开始时间: {starts_at.split('.')[0].replace('T', ' ')}\n"
-            if grafana_link:
-                md += f">[查看Grafana]({grafana_link})\n"
-            alerts_markdown.append(md)
-        elif platform == "feishu":
-            md = f"**{title}**\n"
-            md += f"- **级别**: {severity}\n"
-            md += f"- **摘要**: {summary}\n"
-            md += f"- **详情**: {description}\n"
-            md += f"- **开始时间**: {starts_at.split('.')[0].replace('T', ' ')}\n"
-            if grafana_link:
-                md += f"- **[查看Grafana]({grafana_link})**\n"
-            alerts_markdown.append(md)
-
-    full_message = "\n\n---\n\n".join(alerts_markdown)
-    if not full_message and payload.get('status') == 'resolved':
-        title = f"[{payload.get('status','resolved').upper()}] {payload.get('commonLabels',{}).get('alertname','Alert')} Resolved"
-        full_message = f"告警 **{payload.get('commonLabels',{}).get('alertname','N/A')}** 已恢复.\n实例: {payload.get('commonLabels',{}).get('instance','N/A')}"
-        if platform == "dingtalk":
-            full_message = f"#### {title}\n\n{full_message}"
-
-    return title_prefix, full_message
+        groups.setdefault(current.lane_settings.lane_for(alert), []).append(alert)
+    queued, errors = {}, []
+    for name, alerts in groups.items():
+        fresh = [alert for alert in alerts if not alert.get(ALREADY_NOTIFIED)]
+        if not fresh:
+            continue
+        status = 'firing' if any(alert.get('status') == 'firing' for alert in fresh) else 'resolved'
+        lane_payload = dict(payload, alerts=alerts, status=status)
+        if not lanes.submit(name, deliver_logged, channel, lane_payload, title_prefix, current, on_failure, name):
+            success, response_message = deliver_logged(channel, lane_payload, title_prefix, current, on_failure, name)
+            if success is False:
+                errors.append(response_message)
+                continue
+        queued[name] = len(fresh)
+    return queued, errors
+
+# --- 重复通知与升级 --- #
+# 路由规则可配置 escalation(renotify_interval / escalate_after / escalate_to)，计划保存在Redis中，见escalation.py
+ESCALATION_POLL_INTERVAL = float(os.environ.get('ESCALATION_POLL_INTERVAL', 1.0))
+
+def send_or_queue(destination, title, chunks, subjects=()):
+    """发送各分片，失败的分片交给重试队列"""
+    results = send_chunks(destination, title, chunks, subjects)
+    unsent = [(chunk_title, chunk) for (chunk_title, success, _), chunk in zip(results, chunks) if not success]
+    if unsent and queue_for_retry(destination, unsent, subjects):
+        logging.error(f"Dropped {len(unsent)} escalation message(s) to {destination.name}")
+
+def send_escalation_group(destination, alerts, status, title_prefix, current):
+    title, chunks = format_alertmanager_payload({'status': status, 'alerts': alerts}, destination.platform, current)
+    if chunks:
+        send_or_queue(destination, f"{title_prefix}{title}", chunks, audit_subjects(alerts))
+
+def escalation_target(entry):
+    """按当前配置重新路由条目中的告警；目的地不再匹配或不再配置升级策略时返回None"""
+    labels = entry['alert'].get('labels', {})
+    for destination, _, escalation in state.routing.route(entry['platform'], labels):
+        if destination.name == entry['destination']:
+            return (destination, escalation) if escalation is not None else None
+    return None
+
+def escalation_muted(entry):
+    """告警处于维护窗口内时不重复通知也不升级"""
+    return maintenance.match(entry['alert'].get('labels', {}), time.time()) is not None
+
+def notify_escalations(actions):
+    """把到期的重复通知与升级按目的地合并发送"""
+    current = state
+    now = time.time()
+    groups = {}
+    escalating = {entry['id'] for entry, _, _, kind in actions if kind == 'escalate'}
+    for entry, destination, policy, kind in actions:
+        if kind == 'escalate':
+            targets = policy.escalate_to
+        elif entry['escalated'] and entry['id'] not in escalating:
+            targets = (destination,) + policy.escalate_to
+        else:
+            targets = (destination,)
+        minutes = int((now - entry['started']) // 60)
+        prefix = f"{entry['title_prefix']}[{'告警升级' if kind == 'escalate' else '重复通知'}·已持续{minutes}分钟] "
+        for target in targets:
+            groups.setdefault((target.name, prefix), (target, []))[1].append(entry['alert'])
+        metrics.ESCALATIONS.labels(destination.name, kind).inc()
+    for (_, prefix), (target, alerts) in groups.items():
+        send_escalation_group(target, alerts, 'firing', prefix, current)
+
+def untrack_resolved(alerts, channel, current):
+    """停止跟踪已恢复的告警
+
+    在维护窗口与抖动抑制之前调用，被抑制、不发送通知的恢复告警同样结束重复通知与升级。
+    """
+    resolved = [alert for alert in alerts if alert.get('status') == 'resolved']
+    if not resolved:
+        return
+    entries = [(destination, alert_fingerprint(alert))
+               for (destination, _, escalation), group in current.routing.group_alerts(channel, resolved).items()
+               if escalation is not None for alert in group]
+    if entries:
+        sync_escalations([], entries, resolved, current)
+
+def sync_escalations(tracked, resolved, resolved_alerts, current):
+    """开始跟踪新的firing告警，停止跟踪已恢复的告警
+
+    已升级的告警恢复时同时通知升级目的地(维护窗口内的除外)；resolved_alerts为本次收到的恢复告警。
+    """
+    if redis_health.degraded:
+        return
+    try:
+        with metrics.REDIS_LATENCY.labels('escalation').time():
+            removed = escalations.sync(tracked, resolved)
+    except redis.RedisError as e:
+        logging.warning(f"Escalation tracking update failed: {e}")
+        return
+    now = time.time()
+    resolved_alerts = {alert_fingerprint(alert): alert for alert in resolved_alerts
+                       if maintenance.match(alert.get('labels', {}), now) is None}
+    groups = {}
+    for entry in removed:
+        if not entry.get('escalated'):
+            continue
+        target = escalation_target(entry)
+        alert = resolved_alerts.get(entry['id'].split('|', 1)[1])
+        if target is None or alert is None:
+            continue
+        for escalated_to in target[1].escalate_to:
+            groups.setdefault(escalated_to.name, (escalated_to, []))[1].append(alert)
+    for destination, alerts in groups.values():
+        send_escalation_group(destination, alerts, 'resolved', "[升级告警已恢复] ", current)
 
 # --- Webhook端点 --- #
+# 指标标签只使用已知平台，避免任意URL路径造成标签基数膨胀
+METRIC_PLATFORMS = {'dingtalk', 'wechat', 'feishu', 'default', 'zabbix', 'alertmanager'}
+
+def metric_platform_label(platform):
+    platform = platform.lower()
+    return platform if platform in METRIC_PLATFORMS else 'unknown'
+
 @app.route('/webhook/<platform>', methods=['POST'])
 def webhook_receiver(platform):
+    metric_platform = metric_platform_label(platform)
+    started = time.perf_counter()
+    metrics.QUEUE_DEPTH.labels('webhook').inc()
     try:
-        payload = request.json
-        logging.info(f"Received webhook for {platform}: {json.dumps(payload, indent=2)}")
+        return handle_webhook(platform)
+    finally:
+        metrics.QUEUE_DEPTH.labels('webhook').dec()
+        metrics.INGEST_LATENCY.labels(metric_platform).observe(time.perf_counter() - started)
 
-        title, message = format_alertmanager_payload(payload, platform.lower())
-        if not message: # 如果没有告警内容 (例如，空的firing或resolved消息)
-            logging.info(f"No specific alert message to send for {platform}.")
-            return jsonify({"status": "success", "message": "No alerts to send"}), 200
+def admit_alerts(alerts, platform, current, group=None):
+    """更新设备状态并做维护窗口、抖动抑制、增量比较与去重，返回需要发送的告警
 
-        success = False
-        response_message = "Unknown platform or not configured"
-
-        if platform.lower() == 'dingtalk':
-            if DINGTALK_WEBHOOK:
-                success, response_message = send_dingtalk_message(DINGTALK_WEBHOOK, title, message)
-            else:
-                logging.warning("DingTalk webhook not configured for this route.")
-        elif platform.lower() == 'wechat':
-            if WECHAT_WEBHOOK:
-                success, response_message = send_wechat_message(WECHAT_WEBHOOK, message)
-            else:
-                logging.warning("WeChat webhook not configured for this route.")
-        elif platform.lower() == 'feishu':
-            if FEISHU_WEBHOOK:
-                success, response_message = send_feishu_message(FEISHU_WEBHOOK, title, message)
-            else:
-                logging.warning("Feishu webhook not configured for this route.")
-        elif platform.lower() == 'default' or platform.lower() == 'zabbix': # 示例：Zabbix也用钉钉
-            # 可以为Zabbix定义不同的格式化逻辑和发送目标
-            logging.info(f"Handling '{platform}' alert, using DingTalk as default for now.")
-            if DINGTALK_WEBHOOK:
-                success, response_message = send_dingtalk_message(DINGTALK_WEBHOOK, f"Zabbix告警: {title}", message)
-            else:
-                logging.warning(f"Default/Zabbix DingTalk webhook not configured.")
-        else:
+    alerts应已由调用方按设备清单补充过标签(路由检查同样需要这些标签)。
+    设备状态与升级跟踪仍按维护窗口内和被抑制的告警更新，只是不发送通知。
+    去重整个payload一次Redis往返，去重键按平台隔离，避免不同渠道互相抑制。
+    group为Alertmanager payload(含groupKey)时只发送组内状态有变化的告警，见split_unchanged。
+    """
+    metric_platform = metric_platform_label(platform)
+    flapping = update_device_states(alerts, current)
+    untrack_resolved(alerts, ROUTE_PLATFORM_ALIASES.get(platform.lower(), platform.lower()), current)
+    alerts = suppress_maintenance(alerts, metric_platform)
+    alerts, summaries = suppress_flapping(alerts, flapping, metric_platform, current)
+    alerts, repeats = split_unchanged(alerts, platform, group, metric_platform, current)
+    decisions = should_send_alerts(alerts, namespace=f"alert:{platform.lower()}", current=current)
+    pending = [alert for alert, send in zip(alerts, decisions) if send]
+    if len(pending) < len(alerts):
+        metrics.ALERTS_DEDUPLICATED.labels(metric_platform).inc(len(alerts) - len(pending))
+    # 抖动汇总已按汇总间隔限流，不再经过去重
+    pending.extend(summaries)
+    return with_repeats(pending, repeats)
+
+def split_unchanged(alerts, platform, group, metric_platform, current):
+    """与该告警组上次通知时的状态比较，返回 (状态有变化的告警, 仍在firing且已通知过的告警)
+
+    状态未变化的恢复告警直接丢弃。没有groupKey、未开启增量通知或Redis不可用时全部视为有变化。
+    """
+    group_key = (group or {}).get('groupKey')
+    if not alerts or not group_key or not current.delta_notifications or redis_health.degraded:
+        return alerts, []
+    entries = [(alert_fingerprint(alert), str(alert.get('status', ''))) for alert in alerts]
+    complete = not (group or {}).get('truncatedAlerts')
+    try:
+        with metrics.REDIS_LATENCY.labels('delta').time():
+            changed = delta_tracker.changed(platform.lower(), group_key, entries, current.group_state_ttl, complete)
+    except redis.RedisError as e:
+        if isinstance(e, UNAVAILABLE_ERRORS):
+            redis_health.mark_down(e)
+        logging.warning(f"Group state comparison failed, sending all alerts: {e}")
+        return alerts, []
+    fresh = [alert for alert, flag in zip(alerts, changed) if flag]
+    repeats = [alert for alert, flag in zip(alerts, changed) if not flag and alert.get('status') == 'firing']
+    if len(fresh) < len(alerts):
+        metrics.ALERTS_UNCHANGED.labels(metric_platform).inc(len(alerts) - len(fresh))
+    return fresh, repeats
+
+def forget_group_state(alerts, platform, group, current):
+    """从告警组状态中删除投递失败的告警(alerts为None时删除整个组)，下次重发时按有变化重新发送"""
+    group_key = (group or {}).get('groupKey')
+    if not group_key or not current.delta_notifications or redis_health.degraded:
+        return
+    fingerprints = None if alerts is None else [alert_fingerprint(alert) for alert in alerts]
+    try:
+        delta_tracker.forget(platform.lower(), group_key, fingerprints)
+    except redis.RedisError as e:
+        logging.warning(f"Clearing group state for {platform} failed: {e}")
+
+def with_repeats(pending, repeats):
+    """有需要发送的告警时附上仍在持续的告警(带标记，投递时只计数)；没有变化时整组不发送"""
+    if not pending or not repeats:
+        return pending
+    return pending + [dict(alert, **{ALREADY_NOTIFIED: True}) for alert in repeats]
+
+def handle_webhook(platform):
+    # 整个请求使用同一份配置状态，热加载不会影响在途请求
+    current = state
+    key = None
+    try:
+        payload = request.json
+        log_webhook_payload(platform, payload)
+
+        channel = ROUTE_PLATFORM_ALIASES.get(platform.lower(), platform.lower())
+        if channel not in SUPPORTED_PLATFORMS:
             logging.warning(f"Unsupported platform: {platform}")
             return jsonify({"status": "error", "message": "Unsupported platform"}), 400
 
-        if success:
-            return jsonify({"status": "success", "message": response_message}), 200
-        else:
-            return jsonify({"status": "error", "message": response_message}), 500
+        alerts = inventory.enrich(payload.get('alerts', []))
+        payload = dict(payload, alerts=alerts)
+        if not has_destination(channel, payload, current):
+            logging.warning(f"No {channel} destination configured for these alerts.")
+            return jsonify({"status": "error", "message": "Unknown platform or not configured"}), 500
+        if alerts:
+            key = payload_key(platform, payload)
+            if not claim_payload(key, current):
+                return duplicate_response(metric_platform_label(platform),
+                                          {"status": "success", "message": "Duplicate delivery ignored"})
+            payload = dict(payload, alerts=admit_alerts(alerts, platform, current, payload))
+            if not payload['alerts']:
+                logging.info("All %d alerts for %s suppressed by dedup.", len(alerts), platform)
+                return jsonify({"status": "success", "message": "Duplicate alerts suppressed"}), 200
+
+        # 示例：Zabbix/默认路由也用钉钉，标题加前缀区分
+        title_prefix = "Zabbix告警: " if channel != platform.lower() else ""
+        queued, errors = dispatch(channel, payload, title_prefix, current,
+                                  admission_rollback(f"alert:{platform.lower()}", key, current, platform, payload))
+        if errors:
+            release_payload(key, current)
+            return jsonify({"status": "error", "message": "; ".join(errors)}), 500
+        if not queued: # 如果没有告警内容 (例如，空的firing或resolved消息)
+            logging.info("No specific alert message to send for %s.", platform)
+            return jsonify({"status": "success", "message": "No alerts to send"}), 200
+        # 投递在lane中异步完成，失败的消息由重试队列负责；重试队列也无法接收时撤销去重与payload标记，重发时重新投递
+        return jsonify({"status": "success", "message": "Accepted", "lanes": queued}), 202
 
     except Exception as e:
         logging.error(f"Error processing webhook for {platform}: {e}", exc_info=True)
+        if key:
+            forget_group_state(None, platform, payload, current)
+        release_payload(key, current)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# --- Zabbix原生事件 --- #
+# Zabbix webhook媒介类型直接推送的事件(见zabbix.py)先进入批处理，ZABBIX_BATCH_WINDOW 秒内到达的事件合并发送；
+# Alertmanager转发到 /webhook/zabbix 的payload仍按原流程处理
+ZABBIX_BATCH_WINDOW = float(os.environ.get('ZABBIX_BATCH_WINDOW', 2.0))
+ZABBIX_BATCH_MAX = int(os.environ.get('ZABBIX_BATCH_MAX', 500))
+ZABBIX_TITLE_PREFIX = "Zabbix告警: "
+
+def send_zabbix_batch(alerts):
+    current = state
+    pending = admit_alerts(alerts, 'zabbix', current)
+    if not pending:
+        return
+    dispatch(ROUTE_PLATFORM_ALIASES['zabbix'], {'alerts': pending}, ZABBIX_TITLE_PREFIX, current,
+             lambda failed: release_dedup(failed, 'alert:zabbix', current))
+
+zabbix_batcher = ZabbixBatcher(send_zabbix_batch, ZABBIX_BATCH_WINDOW, ZABBIX_BATCH_MAX)
+
+@app.route('/webhook/zabbix', methods=['POST'])
+def zabbix_webhook():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"status": "error", "message": "Request body must be a JSON object"}), 400
+    if not is_native_event(payload):
+        return webhook_receiver('zabbix')
+    started = time.perf_counter()
+    try:
+        log_webhook_payload('zabbix', payload)
+        # 媒介类型脚本可以一次推送一个事件，也可以推送 {"events": [...]}
+        events = payload['events'] if 'events' in payload else [payload]
+        if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+            return jsonify({"status": "error", "message": "'events' must be a list of JSON objects"}), 400
+        alerts = [alert for alert in map(normalize_event, events) if alert is not None]
+        if not alerts:
+            return jsonify({"status": "error", "message": "No Zabbix event with an event ID"}), 400
+        alerts = inventory.enrich(alerts)
+        if not has_destination(ROUTE_PLATFORM_ALIASES['zabbix'], {'alerts': alerts}, state):
+            logging.warning("No Zabbix destination configured for these events.")
+            return jsonify({"status": "error", "message": "Unknown platform or not configured"}), 500
+        zabbix_batcher.add(alerts)
+        return jsonify({"status": "success", "message": "Accepted", "events": len(alerts)}), 202
+    except Exception as e:
+        logging.error(f"Error processing Zabbix events: {e}", exc_info=True)
+        return jsonify({"status": "error", "message": str(e)}), 500
+    finally:
+        metrics.INGEST_LATENCY.labels('zabbix').observe(time.perf_counter() - started)
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy"}), 200
+    # Redis降级时服务仍可正常发送告警，健康检查不因此失败
+    return jsonify({"status": "healthy", "redis": "degraded" if redis_health.degraded else "ok"}), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    body, content_type = metrics.render_latest()
+    return Response(body, content_type=content_type)
 
 # Redis连接
-redis_client = redis.Redis(host='redis', port=6379, db=0, decode_responses=True)
+# 连接参数(地址、连接池大小、超时、Sentinel)见redis_factory.py中的环境变量说明
+redis_client = create_redis_client()
 
-def should_send_alert(alert_key, alert_status):
-    """告警去重检查"""
-    cache_key = f"alert:{alert_key}"
-    
-    if alert_status == 'firing':
-        # 检查是否在5分钟内已发送相同告警
-        last_sent = redis_client.get(cache_key)
-        if last_sent:
-            return False
-        
-        # 记录告警发送时间，TTL 5分钟
-        redis_client.setex(cache_key, 300, datetime.now().isoformat())
-        return True
-    
-    elif alert_status == 'resolved':
-        # 告警恢复时删除缓存，确保下次能正常发送
-        redis_client.delete(cache_key)
+# Redis前的进程内缓存：去重标记按其在Redis中的剩余TTL缓存，设备状态最多缓存L1_CACHE_TTL秒；
+# 任何进程修改这些键时通过pub/sub通知其他进程删除本地条目。L1_CACHE_SIZE=0 关闭缓存。
+L1_CACHE_SIZE = int(os.environ.get('L1_CACHE_SIZE', 10000))
+L1_CACHE_TTL = float(os.environ.get('L1_CACHE_TTL', 30))
+dedup_cache = LocalCache('dedup', L1_CACHE_SIZE, L1_CACHE_TTL)
+state_cache = LocalCache('device_state', L1_CACHE_SIZE, L1_CACHE_TTL)
+cache_invalidator = CacheInvalidator(redis_client, [dedup_cache, state_cache])
+
+# Redis降级模式：调用失败后改用进程内去重与设备状态，恢复后回写(见fallback_store.py)
+REDIS_PROBE_INTERVAL = float(os.environ.get('REDIS_PROBE_INTERVAL', 1.0))
+# 设备状态事件每次重放的数量，限制单次Lua脚本的执行时间
+RECONCILE_BATCH = 500
+local_dedup = LocalDedup()
+local_states = LocalDeviceStates()
+
+def reconcile_redis():
+    """Redis恢复后回写降级期间的去重标记、删除的去重键与设备状态事件
+
+    回写途中Redis再次不可达时，未写入的数据放回进程内存储，下次恢复时继续。
+    """
+    markers, deleted = local_dedup.drain()
+    if markers or deleted:
+        pipe = redis_client.pipeline(transaction=False)
+        now = datetime.now().isoformat()
+        for key in deleted:
+            pipe.delete(key)
+        for key, remaining_ms in markers.items():
+            pipe.set(key, now, nx=True, px=remaining_ms)
+        cache_invalidator.publish(deleted + list(markers), client=pipe)
+        try:
+            pipe.execute()
+        except TRANSIENT_ERRORS:
+            local_dedup.restore(markers, deleted)
+            raise
+        finally:
+            cache_invalidator.invalidate_local(deleted + list(markers))
+    # 去重数据写入成功后再取出设备状态事件，失败时不必把事件插回到降级期间新产生的事件之前
+    events = local_states.drain()
+    for start in range(0, len(events), RECONCILE_BATCH):
+        try:
+            # 重放的是历史事件，不据此判定抖动，以免占用汇总间隔
+            device_states.update(events[start:start + RECONCILE_BATCH])
+        except redis.RedisError:
+            # 未重放的事件放回内存存储，下次恢复时继续
+            local_states.apply(events[start:])
+            raise
+    if markers or deleted or events:
+        logging.info(f"Reconciled {len(markers)} dedup markers, {len(deleted)} cleared keys "
+                     f"and {len(events)} device state events to Redis")
+
+redis_health = RedisHealth(redis_client, reconcile_redis, REDIS_PROBE_INTERVAL)
+
+def alert_fingerprint(alert):
+    """获取告警指纹，优先使用Alertmanager提供的fingerprint"""
+    fingerprint = alert.get('fingerprint')
+    if fingerprint:
+        return fingerprint
+    # 非Alertmanager来源的告警没有fingerprint，按标签集合计算一个稳定的指纹
+    labels = json.dumps(alert.get('labels', {}), sort_keys=True)
+    return hashlib.sha1(labels.encode('utf-8')).hexdigest()[:16]
+
+def should_send_alerts(alerts, namespace='alert', current=None):
+    """批量告警去重检查
+
+    每条firing告警使用 SET NX EX 原子地判断并记录，resolved告警删除去重键。
+    本地缓存中仍有效的去重标记直接判定为重复，不访问Redis；其余命令通过一个pipeline发送，
+    最多一次Redis往返。Redis不可用时改用进程内去重。返回与alerts一一对应的布尔列表。
+    """
+    current = current or state
+    if redis_health.degraded:
+        return should_send_alerts_locally(alerts, namespace, current)
+    decisions = [False] * len(alerts)
+    pipe = redis_client.pipeline(transaction=False)
+    queued = []
+    resolved_keys = []
+    now = datetime.now().isoformat()
+    for index, alert in enumerate(alerts):
+        cache_key = f"{namespace}:{alert_fingerprint(alert)}"
+        alert_status = alert.get('status')
+        if alert_status == 'firing':
+            if dedup_cache.get(cache_key):
+                continue
+            pipe.set(cache_key, now, nx=True, ex=current.dedup_window(alert))
+            # 同一次往返取回剩余TTL，本地标记与Redis中的标记同时过期
+            pipe.pttl(cache_key)
+        elif alert_status == 'resolved':
+            # 告警恢复时删除缓存，确保下次能正常发送
+            pipe.delete(cache_key)
+            resolved_keys.append(cache_key)
+        else:
+            continue
+        queued.append((index, alert_status, cache_key))
+
+    if not queued:
+        return decisions
+
+    try:
+        # 失效消息与删除命令在同一个pipeline中发出；generation在读取前取得，删除生效后再失效一次
+        cache_invalidator.publish(resolved_keys, client=pipe)
+        generation = dedup_cache.generation()
+        try:
+            with metrics.REDIS_LATENCY.labels('dedup').time():
+                results = iter(pipe.execute())
+        finally:
+            cache_invalidator.invalidate_local(resolved_keys)
+    except redis.RedisError as e:
+        # Redis不可达时进入降级模式，后续告警使用进程内去重，不再等待Redis超时；本批同样在进程内判定
+        if isinstance(e, UNAVAILABLE_ERRORS):
+            redis_health.mark_down(e)
+        else:
+            logging.warning(f"Alert dedup failed, deduplicating this batch in memory: {e}")
+        for index, alert_status, cache_key in queued:
+            decisions[index] = local_dedup.check(cache_key, alert_status, current.dedup_window(alerts[index]))
+        return decisions
+
+    for index, alert_status, cache_key in queued:
+        if alert_status == 'resolved':
+            next(results)
+            decisions[index] = True
+            continue
+        created, remaining_ms = next(results), next(results)
+        decisions[index] = bool(created)
+        if remaining_ms and remaining_ms > 0:
+            dedup_cache.set(cache_key, True, ttl=remaining_ms / 1000.0, generation=generation)
+    return decisions
+
+def should_send_alerts_locally(alerts, namespace, current):
+    """降级模式下的去重：先查一级缓存中降级前的标记，再查进程内去重存储"""
+    decisions = [False] * len(alerts)
+    for index, alert in enumerate(alerts):
+        alert_status = alert.get('status')
+        if alert_status not in ('firing', 'resolved'):
+            continue
+        cache_key = f"{namespace}:{alert_fingerprint(alert)}"
+        if alert_status == 'firing' and dedup_cache.get(cache_key):
+            continue
+        if alert_status == 'resolved':
+            dedup_cache.invalidate([cache_key])
+        decisions[index] = local_dedup.check(cache_key, alert_status, current.dedup_window(alert))
+    return decisions
+
+# --- 重复投递的幂等处理 --- #
+# Alertmanager在超时后重试webhook，重启后每个group_interval重发整组告警。
+# groupKey、状态和各告警(指纹, 状态)的集合相同的payload在 dedup.payload_window 秒内只处理一次。
+# 开始处理时用 SET NX 写入标记并保留整个窗口，期间到达的重复请求(包括仍在处理中的)直接确认；
+# 处理或投递失败时删除标记，失败的请求由调用方重试时重新处理。标记只占用一次Redis往返，失败时再多一次删除。
+def payload_key(platform, payload):
+    alerts = sorted(f"{alert_fingerprint(alert)}:{alert.get('status', '')}" for alert in payload.get('alerts', []))
+    content = "\n".join([str(payload.get('groupKey', '')), str(payload.get('status', ''))] + alerts)
+    return f"ingest:{platform.lower()}:{hashlib.sha1(content.encode('utf-8')).hexdigest()}"
+
+def claim_payload(key, current):
+    """首次收到该payload时返回True；窗口内的重复请求返回False"""
+    window = current.payload_dedup_window
+    if not window:
         return True
-    
-    return False
+    if redis_health.degraded:
+        return local_dedup.check(key, 'firing', window)
+    try:
+        with metrics.REDIS_LATENCY.labels('ingest').time():
+            return bool(redis_client.set(key, 1, nx=True, ex=window))
+    except redis.RedisError as e:
+        if isinstance(e, UNAVAILABLE_ERRORS):
+            redis_health.mark_down(e)
+        else:
+            logging.warning(f"Payload idempotency check failed, checking in memory: {e}")
+        return local_dedup.check(key, 'firing', window)
 
-def cache_device_status(device_ip, status, ttl=30):
-    """缓存设备状态"""
-    cache_key = f"device_status:{device_ip}"
-    redis_client.setex(cache_key, ttl, status)
+def duplicate_response(platform, body):
+    metrics.PAYLOADS_DUPLICATE.labels(platform).inc()
+    return jsonify(body), 200
+
+def release_payload(key, current):
+    """处理出错时删除标记，Alertmanager的重试仍会被处理"""
+    if not key or not current.payload_dedup_window:
+        return
+    if redis_health.degraded:
+        local_dedup.check(key, 'resolved', 0)
+        return
+    try:
+        redis_client.delete(key)
+    except redis.RedisError as e:
+        logging.warning(f"Releasing payload key {key} failed: {e}")
+
+def release_dedup(alerts, namespace, current):
+    """投递失败时删除这些firing告警的去重标记，重发的告警不会被判定为重复"""
+    keys = [f"{namespace}:{alert_fingerprint(alert)}" for alert in alerts
+            if alert.get('status') == 'firing' and not is_flapping_summary(alert)]
+    if not keys:
+        return
+    dedup_cache.invalidate(keys)
+    if redis_health.degraded:
+        for key in keys:
+            local_dedup.check(key, 'resolved', 0)
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(*keys)
+        cache_invalidator.publish(keys, client=pipe)
+        pipe.execute()
+    except redis.RedisError as e:
+        logging.warning(f"Releasing {len(keys)} dedup markers failed: {e}")
+    finally:
+        cache_invalidator.invalidate_local(keys)
+
+def admission_rollback(namespace, key, current, platform=None, group=None):
+    """投递失败时的回调：撤销接收时记录的去重标记、payload标记与告警组状态，调用方重发时重新投递"""
+    def rollback(failed):
+        release_dedup(failed, namespace, current)
+        release_payload(key, current)
+        if platform is not None:
+            forget_group_state(failed, platform, group, current)
+    return rollback
+
+def should_send_alert(alert_key, alert_status, severity=None):
+    """告警去重检查"""
+    alert = {'fingerprint': alert_key, 'status': alert_status, 'labels': {'severity': severity or ''}}
+    return should_send_alerts([alert])[0]
+
+# 设备在线状态：由设备类告警驱动，通过 /status 查询；中断记录通过 /outages 查询
+# 中断记录保留天数，0表示不清理
+OUTAGE_RETENTION_DAYS = float(os.environ.get('OUTAGE_RETENTION_DAYS', 90))
+device_states = DeviceStateStore(redis_client, state_cache, cache_invalidator,
+                                 outage_retention=int(OUTAGE_RETENTION_DAYS * 86400))
+outage_stats = OutageStats(redis_client)
+delta_tracker = DeltaTracker(redis_client)
+
+escalations = EscalationScheduler(redis_client, escalation_target, notify_escalations, ESCALATION_POLL_INTERVAL,
+                                  muted=escalation_muted)
+
+def update_device_states(alerts, current=None):
+    """根据告警更新设备状态，整个payload一次Redis往返；Redis不可用时写入进程内存储，恢复后重放
+
+    返回同一次往返中得到的抖动设备 {ip: (当前状态, 是否应发送汇总)}；降级模式下不做抖动检测。
+    """
+    current = current or state
+    events = device_states.events_from_alerts(alerts, current.device_alertnames)
+    if not events:
+        return {}
+    if redis_health.degraded:
+        local_states.apply(events)
+        return {}
+    try:
+        with metrics.REDIS_LATENCY.labels('device_state').time():
+            _, flapping = device_states.update(events, current.flap_settings)
+        return flapping
+    except UNAVAILABLE_ERRORS as e:
+        redis_health.mark_down(e)
+        local_states.apply(events)
+    except redis.RedisError as e:
+        logging.warning(f"Device state update failed: {e}")
+    return {}
+
+# 设备清单：按告警的ip/instance补充设备名称、类型、site、位置与上游设备(见inventory.py)
+DEVICE_INVENTORY_FILE = os.environ.get('DEVICE_INVENTORY_FILE', '/app/inventory/devices.yml')
+DEVICE_INVENTORY_RELOAD_INTERVAL = float(os.environ.get('DEVICE_INVENTORY_RELOAD_INTERVAL', 10.0))
+inventory = DeviceInventory(DEVICE_INVENTORY_FILE, DEVICE_INVENTORY_RELOAD_INTERVAL)
+# 在gunicorn fork之前加载一次，各worker直接继承
+inventory.reload()
+
+# 维护窗口：配置文件中的 maintenance 与 /maintenance API 创建的窗口(见maintenance.py)
+MAINTENANCE_REFRESH_INTERVAL = float(os.environ.get('MAINTENANCE_REFRESH_INTERVAL', 5.0))
+maintenance = MaintenanceStore(redis_client, lambda: state.maintenance_windows, MAINTENANCE_REFRESH_INTERVAL)
+
+def suppress_maintenance(alerts, platform):
+    """去掉处于维护窗口内的告警；只查进程内的区间索引，不访问Redis"""
+    now = time.time()
+    kept = [alert for alert in alerts if maintenance.match(alert.get('labels', {}), now) is None]
+    if len(kept) < len(alerts):
+        metrics.ALERTS_MUTED.labels(platform).inc(len(alerts) - len(kept))
+        logging.info("Muted %d alerts inside maintenance windows", len(alerts) - len(kept))
+    return kept
+
+def suppress_flapping(alerts, flapping, platform, current):
+    """去掉抖动设备的设备类告警，返回 (保留的告警, 到期的抖动汇总告警)"""
+    if not flapping:
+        return alerts, []
+    kept, summaries = [], {}
+    for alert in alerts:
+        labels = alert.get('labels', {})
+        ip = device_ip(labels) if labels.get('alertname') in current.device_alertnames else None
+        if ip not in flapping:
+            kept.append(alert)
+            continue
+        status, summary_due = flapping[ip]
+        if summary_due and ip not in summaries:
+            summaries[ip] = flapping_summary_alert(alert, ip, status, current.flap_settings)
+    if len(kept) < len(alerts):
+        metrics.ALERTS_FLAPPING_SUPPRESSED.labels(platform).inc(len(alerts) - len(kept))
+        logging.info("Suppressed %d alerts from flapping devices: %s", len(alerts) - len(kept), ', '.join(flapping))
+    return kept, list(summaries.values())
+
+def cache_device_status(device_ip, status):
+    """手动设置设备状态(down/up)，与告警驱动的状态共用存储"""
+    now = time.time()
+    at = datetime.utcfromtimestamp(now).isoformat() + 'Z'
+    device_states.update([(device_ip, 'firing' if status == 'down' else 'resolved', 'manual', '', '', at, now)])
 
 def get_cached_device_status(device_ip):
-    """获取缓存的设备状态"""
-    cache_key = f"device_status:{device_ip}"
-    return redis_client.get(cache_key)
+    """获取设备状态(up/down)，未知设备返回None"""
+    entry = device_states.get_many([device_ip])[0]
+    return entry and entry['status']
 
 # 在webhook处理函数中使用告警去重
 @app.route('/webhook/alertmanager', methods=['POST'])
 def alertmanager_webhook():
+    current = state
+    key = None
     try:
         data = request.get_json()
-        for alert in data.get('alerts', []):
-            alert_key = f"{alert.get('labels', {}).get('instance', 'unknown')}_{alert.get('labels', {}).get('alertname', 'unknown')}"
-            alert_status = alert.get('status', 'unknown')
-            
-            # 检查是否需要发送告警
-            if should_send_alert(alert_key, alert_status):
-                # 发送告警逻辑
-                send_notification(alert)
-            
-        return jsonify({'status': 'success'})
+        received = inventory.enrich(data.get('alerts', []))
+        if received and not has_destination('dingtalk', dict(data, alerts=received), current):
+            logging.warning("No dingtalk destination configured for these alerts.")
+            return jsonify({'status': 'error', 'message': 'Unknown platform or not configured'}), 500
+        if received:
+            key = payload_key('alertmanager', data)
+            if not claim_payload(key, current):
+                return duplicate_response('alertmanager', {'status': 'success', 'duplicate': True, 'queued': 0,
+                                                           'deduplicated': 0, 'suppressed': 0})
+        flapping = update_device_states(received, current)
+        untrack_resolved(received, 'dingtalk', current)
+        alerts = suppress_maintenance(received, 'alertmanager')
+        alerts, summaries = suppress_flapping(alerts, flapping, 'alertmanager', current)
+        suppressed = len(received) - len(alerts)
+        alerts, repeats = split_unchanged(alerts, 'alertmanager', data, 'alertmanager', current)
+        decisions = should_send_alerts(alerts, current=current)
+        pending = [alert for alert, send in zip(alerts, decisions) if send]
+        deduplicated = len(alerts) - len(pending)
+        if deduplicated:
+            metrics.ALERTS_DEDUPLICATED.labels('alertmanager').inc(deduplicated)
+        # 抖动汇总已按汇总间隔限流，不再经过去重
+        pending.extend(summaries)
+        queued = 0
+        if pending:
+            # 发送告警逻辑：复用默认渠道(钉钉)的路由；投递在lane中异步完成，这里只报告入队的数量
+            lanes_queued, errors = dispatch('dingtalk', dict(data, alerts=with_repeats(pending, repeats)), current=current,
+                                            on_failure=admission_rollback('alert', key, current, 'alertmanager', data))
+            if errors:
+                release_payload(key, current)
+                return jsonify({'status': 'error', 'message': '; '.join(errors)}), 500
+            queued = sum(lanes_queued.values())
+
+        return jsonify({'status': 'success', 'queued': queued, 'deduplicated': deduplicated,
+                        'unchanged': len(repeats), 'suppressed': suppressed})
     except Exception as e:
-        logger.error(f"处理Alertmanager webhook失败: {e}")
+        logging.error(f"处理Alertmanager webhook失败: {e}")
+        if key:
+            forget_group_state(None, 'alertmanager', data, current)
+        release_payload(key, current)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+# --- 设备状态查询 --- #
+# GET  /status?ip=1.1.1.1,2.2.2.2 | /status?site=A栋 | /status?type=ip_camera [&status=down]
+# POST /status {"ips": [...]}  大批量IP查询，避免URL过长
+# 每个请求只有一次Redis调用：按IP为MGET，按site/type为HGETALL(同时指定时按site查询再按type过滤)
+@app.route('/status', methods=['GET', 'POST'])
+def device_status():
+    body = (request.get_json(silent=True) or {}) if request.method == 'POST' else {}
+    if not isinstance(body, dict):
+        return jsonify({'status': 'error', 'message': 'Request body must be a JSON object'}), 400
+    ips = body.get('ips') or []
+    if not isinstance(ips, list) or not all(isinstance(ip, str) for ip in ips):
+        return jsonify({'status': 'error', 'message': "'ips' must be a list of strings"}), 400
+    ips = [ip.strip() for ip in ips if ip.strip()]
+    for value in request.args.getlist('ip'):
+        ips.extend(ip.strip() for ip in value.split(',') if ip.strip())
+    site = body.get('site') or request.args.get('site')
+    device_type = body.get('type') or request.args.get('type')
+    wanted_status = body.get('status') or request.args.get('status')
+    if not ips and not site and not device_type:
+        return jsonify({'status': 'error', 'message': 'Specify ip, site or type'}), 400
+
+    devices = None
+    if not redis_health.degraded:
+        try:
+            with metrics.REDIS_LATENCY.labels('device_status').time():
+                if ips:
+                    devices = dict(zip(ips, device_states.get_many(ips)))
+                elif site:
+                    devices = device_states.by_site(site)
+                else:
+                    devices = device_states.by_type(device_type)
+        except UNAVAILABLE_ERRORS as e:
+            redis_health.mark_down(e)
+        except redis.RedisError as e:
+            logging.error(f"Device status lookup failed: {e}")
+            return jsonify({'status': 'error', 'message': 'State store unavailable'}), 503
+    degraded = devices is None
+    if degraded:
+        # 降级模式：只能返回降级期间收到的状态变化
+        if ips:
+            devices = {ip: local_states.get(ip) for ip in ips}
+        else:
+            devices = local_states.select(site=site, device_type=None if site else device_type)
+
+    result = {}
+    for ip, entry in devices.items():
+        if entry is None:
+            entry = {'ip': ip, 'status': 'unknown'}
+        if (ips or site) and device_type and entry.get('type') != device_type:
+            continue
+        if ips and site and entry.get('site') != site:
+            continue
+        if wanted_status and entry['status'] != wanted_status:
+            continue
+        result[ip] = entry
+    down = sum(1 for entry in result.values() if entry['status'] == 'down')
+    return jsonify({'status': 'success', 'count': len(result), 'down': down, 'degraded': degraded, 'devices': result})
+
+# --- 维护窗口 --- #
+# GET    /maintenance[?ip=..&site=..&type=..]  列出全部窗口(active表示当前生效)；带标签参数时只列出对该设备当前生效的窗口
+# POST   /maintenance {"name", "ip"|"cidr"|"site"|"type", "start", "end"} 或 {..., "schedule": {"weekdays", "start", "end"}}
+# DELETE /maintenance/<id>  只能删除API创建的窗口，配置文件中的窗口随配置修改
+def maintenance_view(window, active_ids):
+    return dict(window.spec, source=window.source, active=window.id in active_ids)
+
+@app.route('/maintenance', methods=['GET'])
+def list_maintenance():
+    active_ids = {window.id for window in maintenance.index().active(time.time())}
+    windows = maintenance.windows()
+    labels = {key: request.args[key] for key in ('ip', 'instance', 'site', 'type') if request.args.get(key)}
+    if labels:
+        windows = [window for window in windows
+                   if window.id in active_ids and window.matches(device_ip(labels), labels)]
+    return jsonify({'status': 'success', 'count': len(windows),
+                    'windows': [maintenance_view(window, active_ids) for window in windows]})
+
+@app.route('/maintenance', methods=['POST'])
+def create_maintenance():
+    spec = request.get_json(silent=True)
+    try:
+        window = maintenance.add(spec)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except redis.RedisError as e:
+        logging.error(f"Saving maintenance window failed: {e}")
+        return jsonify({'status': 'error', 'message': 'Maintenance store unavailable'}), 503
+    logging.info(f"Maintenance window {window.id} created: {window.spec}")
+    active_ids = {active.id for active in maintenance.index().active(time.time())}
+    return jsonify({'status': 'success', 'window': maintenance_view(window, active_ids)}), 201
+
+@app.route('/maintenance/<window_id>', methods=['DELETE'])
+def delete_maintenance(window_id):
+    if any(window.id == window_id for window in state.maintenance_windows):
+        return jsonify({'status': 'error', 'message': 'Window is defined in the config file'}), 400
+    try:
+        removed = maintenance.remove(window_id)
+    except redis.RedisError as e:
+        logging.error(f"Deleting maintenance window failed: {e}")
+        return jsonify({'status': 'error', 'message': 'Maintenance store unavailable'}), 503
+    if not removed:
+        return jsonify({'status': 'error', 'message': 'Not found'}), 404
+    logging.info(f"Maintenance window {window_id} deleted")
+    return jsonify({'status': 'success'})
+
+# --- 中断时长统计 --- #
+# GET /outages?ip=1.1.1.1,2.2.2.2&site=A栋&type=ip_camera&from=...&to=...
+# from/to 为epoch秒或ISO时间，默认最近24小时；统计恢复时间落在窗口内的中断，未恢复的中断不计入。
+# ip/site/type 可同时指定多个，所有对象的统计在一次Redis往返中完成
+def parse_time_arg(value, default):
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+@app.route('/outages', methods=['GET'])
+def outage_summary():
+    targets = []
+    for scope, arg in (('device', 'ip'), ('site', 'site'), ('type', 'type')):
+        for value in request.args.getlist(arg):
+            targets.extend((scope, name.strip()) for name in value.split(',') if name.strip())
+    if not targets:
+        return jsonify({'status': 'error', 'message': 'Specify ip, site or type'}), 400
+    end = parse_time_arg(request.args.get('to'), time.time())
+    start = parse_time_arg(request.args.get('from'), (end or 0) - 86400)
+    if start is None or end is None or start > end:
+        return jsonify({'status': 'error', 'message': 'Invalid from/to'}), 400
+    if redis_health.degraded:
+        return jsonify({'status': 'error', 'message': 'State store unavailable'}), 503
+    try:
+        with metrics.REDIS_LATENCY.labels('outages').time():
+            summaries = outage_stats.summaries(targets, start, end)
+    except redis.RedisError as e:
+        if isinstance(e, UNAVAILABLE_ERRORS):
+            redis_health.mark_down(e)
+        logging.error(f"Outage lookup failed: {e}")
+        return jsonify({'status': 'error', 'message': 'State store unavailable'}), 503
+    result = {scope: {} for scope in ('device', 'site', 'type')}
+    for (scope, name), summary in zip(targets, summaries):
+        result[scope][name] = summary
+    return jsonify({'status': 'success', 'from': start, 'to': end,
+                    'devices': result['device'], 'sites': result['site'], 'types': result['type']})
+
+# GET /deliveries?device=1.1.1.1&fingerprint=..&destination=..&from=..&to=..&limit=100&cursor=..
+# 按时间倒序分页返回投递审计记录，响应中的next_cursor传回cursor参数获取下一页，为null时已到末尾。
+# 最近 AUDIT_LOG_FLUSH_INTERVAL 秒内的投递可能尚未写入
+@app.route('/deliveries', methods=['GET'])
+def delivery_audit():
+    if not audit_log.enabled:
+        return jsonify({'status': 'error', 'message': 'Delivery audit log disabled'}), 404
+    start = parse_time_arg(request.args.get('from'), None)
+    end = parse_time_arg(request.args.get('to'), None)
+    if (request.args.get('from') and start is None) or (request.args.get('to') and end is None):
+        return jsonify({'status': 'error', 'message': 'Invalid from/to'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid limit'}), 400
+    filters = {column: request.args.get(column) for column in AUDIT_FILTERS}
+    try:
+        records, next_cursor = audit_log.query(filters, start, end, request.args.get('cursor'), limit)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid cursor'}), 400
+    except sqlite3.Error as e:
+        logging.error(f"Delivery audit query failed: {e}")
+        return jsonify({'status': 'error', 'message': 'Delivery audit log unavailable'}), 503
+    return jsonify({'status': 'success', 'deliveries': records, 'next_cursor': next_cursor})
+
+# --- 生产模式(gunicorn)钩子 --- #
+def init_worker():
+    """gunicorn fork出worker后调用：重建不能跨进程共享的连接池与日志线程"""
+    global http_session
+    start_log_listener()
+    start_config_watcher()
+    retry_queue.start()
+    http_session = create_http_session()
+    redis_client.connection_pool.reset()
+    cache_invalidator.start()
+    redis_health.start()
+    escalations.start()
+    zabbix_batcher.start()
+    maintenance.start()
+    inventory.start()
+    audit_log.start()
+    lanes.start()
+
+def shutdown_worker():
+    """worker退出前调用：此时在途请求已处理完毕，尝试投递重试队列中剩余的消息后释放连接"""
+    inventory.stop()
+    maintenance.stop()
+    zabbix_batcher.stop()
+    escalations.stop()
+    # lane中已接收的告警投递完后再停止重试队列
+    lanes.stop()
+    retry_queue.stop()
+    # 重试队列最后一次尝试的结果也需要写入
+    audit_log.stop()
+    cache_invalidator.stop()
+    redis_health.stop()
+    http_session.close()
+    redis_client.connection_pool.disconnect()
+    stop_log_listener()
+
+# 开发模式：python app.py；生产环境请使用 gunicorn -c gunicorn.conf.py app:app
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8888))
+    start_config_watcher()
+    retry_queue.start()
+    cache_invalidator.start()
+    redis_health.start()
+    escalations.start()
+    zabbix_batcher.start()
+    maintenance.start()
+    inventory.start()
+    audit_log.start()
+    lanes.start()
     app.run(host='0.0.0.0', port=port, debug= (LOG_LEVEL == 'DEBUG') )
\ No newline at end of file
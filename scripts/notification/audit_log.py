@@ -0,0 +1,224 @@
+# scripts/notification/audit_log.py
+# 投递审计日志：记录每一次厂商Webhook投递尝试(时间、告警指纹、设备、目的地、耗时与结果)
+#
+# 记录写入本地SQLite文件(WAL模式，多个gunicorn worker可同时写入与查询)，只追加不修改。
+# 发送线程只把记录放入内存缓冲区，后台线程每 flush_interval 秒或攒满 batch_size 条时在一个事务中批量写入，
+# 投递路径上没有磁盘I/O。文件中实际使用的空间超过 max_bytes 时从最早的记录开始删除，释放的页由后续写入复用，
+# 文件大小因此稳定在上限附近。
+# 查询按 (时间, id) 倒序做游标分页，设备、指纹与时间范围都有对应的索引，百万级记录下每页只读取所需的行。
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    device TEXT,
+    alertname TEXT,
+    status TEXT,
+    destination TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    success INTEGER NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    response TEXT
+);
+CREATE INDEX IF NOT EXISTS deliveries_ts ON deliveries (ts);
+CREATE INDEX IF NOT EXISTS deliveries_device ON deliveries (device, ts);
+CREATE INDEX IF NOT EXISTS deliveries_fingerprint ON deliveries (fingerprint, ts);
+"""
+
+_INSERT = ("INSERT INTO deliveries (ts, fingerprint, device, alertname, status, destination, attempt, success, "
+           "latency_ms, response) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+_COLUMNS = ('id', 'ts', 'fingerprint', 'device', 'alertname', 'status', 'destination', 'attempt', 'success',
+            'latency_ms', 'response')
+
+# 可用于过滤的列；fingerprint与device有索引，destination在索引结果上再过滤
+FILTERS = ('fingerprint', 'device', 'destination')
+
+# 超出空间上限时分批删除，每批一个短事务，不长时间阻塞其他worker的写入
+RETENTION_BATCH = 20000
+
+RESPONSE_MAX_LENGTH = 200
+
+def encode_cursor(ts, row_id):
+    return f"{ts}-{row_id}"
+
+def decode_cursor(cursor):
+    """游标为上一页最后一条记录的 "毫秒时间戳-id"；格式错误时抛出ValueError"""
+    ts, _, row_id = str(cursor).partition('-')
+    return int(ts), int(row_id)
+
+class DeliveryAuditLog:
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, flush_interval=1.0, batch_size=1000,
+                 max_pending=50000, retention_check_interval=60.0):
+        """path为空时不记录；max_bytes为数据实际占用空间的上限"""
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.retention_check_interval = retention_check_interval
+        self._pending = []
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self._local = threading.local()
+        self._next_retention_check = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connection(self):
+        """每个线程一个连接；fork后由start()丢弃继承来的连接"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def record(self, destination, subjects, attempt, success, latency, response):
+        """记录一次投递尝试；subjects为消息中各告警的 (指纹, 设备, alertname, 状态)"""
+        if not self.path or not subjects:
+            return
+        ts = int(time.time() * 1000)
+        latency_ms = int(latency * 1000)
+        response = str(response or '')[:RESPONSE_MAX_LENGTH]
+        rows = [(ts, fingerprint, device, alertname, status, destination.name, attempt, int(bool(success)),
+                 latency_ms, response) for fingerprint, device, alertname, status in subjects]
+        with self._cond:
+            if len(self._pending) + len(rows) > self.max_pending:
+                metrics.AUDIT_RECORDS_DROPPED.inc(len(rows))
+                return
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def start(self):
+        """启动后台写入线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        if not self.path:
+            return
+        self._local = threading.local()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='audit-log', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """停止后台线程并写入缓冲区中剩余的记录"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.path:
+            self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            self.flush()
+
+    def flush(self):
+        """把缓冲区中的记录写入文件，返回写入条数"""
+        with self._cond:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.executemany(_INSERT, rows)
+        except sqlite3.Error as e:
+            metrics.AUDIT_RECORDS_DROPPED.inc(len(rows))
+            logging.error(f"Writing {len(rows)} delivery audit records to {self.path} failed: {e}")
+            return 0
+        now = time.monotonic()
+        if now >= self._next_retention_check:
+            self._next_retention_check = now + self.retention_check_interval
+            self.enforce_retention()
+        return len(rows)
+
+    def enforce_retention(self):
+        """实际占用空间超过max_bytes时删除最早的记录，降到上限的90%以下"""
+        try:
+            connection = self._connection()
+            page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+            page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            used = (page_count - free_pages) * page_size
+            if used <= self.max_bytes:
+                return 0
+            first, last = connection.execute("SELECT MIN(id), MAX(id) FROM deliveries").fetchone()
+            if first is None:
+                return 0
+            # id只在末尾追加、只从开头删除，id范围即可近似记录数，不需要COUNT全表
+            remove = max(1, int((last - first + 1) * (1 - self.max_bytes * 0.9 / used)))
+            deleted = 0
+            for low in range(first, first + remove, RETENTION_BATCH):
+                high = min(low + RETENTION_BATCH, first + remove)
+                deleted += connection.execute("DELETE FROM deliveries WHERE id >= ? AND id < ?", (low, high)).rowcount
+        except sqlite3.Error as e:
+            logging.error(f"Delivery audit log retention failed: {e}")
+            return 0
+        logging.info(f"Delivery audit log over {self.max_bytes} bytes, removed {deleted} oldest records")
+        return deleted
+
+    def query(self, filters=None, since=None, until=None, cursor=None, limit=100):
+        """按时间倒序返回一页记录与下一页的游标(没有更多记录时为None)
+
+        filters为 {列名: 值}，列名取自FILTERS；since/until为epoch秒；cursor来自上一页的返回值。
+        """
+        clauses, params = [], []
+        for column in FILTERS:
+            value = (filters or {}).get(column)
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(int(since * 1000))
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(int(until * 1000))
+        if cursor:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            clauses.append("(ts, id) < (?, ?)")
+            params.extend((cursor_ts, cursor_id))
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM deliveries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        rows = self._connection().execute(sql, params).fetchall()
+        records = []
+        for row in rows[:limit]:
+            record = dict(zip(_COLUMNS, row))
+            record['timestamp'] = record.pop('ts') / 1000
+            record['success'] = bool(record['success'])
+            records.append(record)
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last[1], last[0])
+        return records, next_cursor
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+通知服务吞吐/延迟基准测试
+以固定并发向 /webhook/<platform> 发送Alertmanager格式的请求，输出RPS与p50/p99延迟
+每个请求的告警fingerprint唯一，确保不会被去重短路
+
+用法: python bench_server.py --url http://localhost:8888/webhook/dingtalk -n 2000 -c 32
+"""
+
+import argparse
+import threading
+import time
+import uuid
+
+import requests
+
+def build_payload(alerts_per_request):
+    alerts = []
+    for _ in range(alerts_per_request):
+        alerts.append({
+            "status": "firing",
+            "fingerprint": uuid.uuid4().hex[:16],
+            "labels": {"alertname": "DeviceDown", "instance": "192.168.1.101", "severity": "critical"},
+            "annotations": {"summary": "设备掉线", "description": "Camera-Entrance-01 无法访问"},
+            "startsAt": "2024-01-01T00:00:00.000Z",
+        })
+    return {"status": "firing", "externalURL": "http://alertmanager:9093", "alerts": alerts}
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def run(url, total, concurrency, alerts_per_request):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        session = requests.Session()
+        local = []
+        local_errors = 0
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            payload = build_payload(alerts_per_request)
+            start = time.perf_counter()
+            try:
+                response = session.post(url, json=payload, timeout=30)
+                if response.status_code >= 400:
+                    local_errors += 1
+            except requests.exceptions.RequestException:
+                local_errors += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='通知服务吞吐/延迟基准测试')
+    parser.add_argument('--url', default='http://localhost:8888/webhook/dingtalk')
+    parser.add_argument('-n', '--requests', type=int, default=2000, help='请求总数')
+    parser.add_argument('-c', '--concurrency', type=int, default=32, help='并发数')
+    parser.add_argument('--alerts', type=int, default=1, help='每个请求包含的告警数')
+    args = parser.parse_args()
+
+    result = run(args.url, args.requests, args.concurrency, args.alerts)
+    print(f"requests={result['requests']} errors={result['errors']} "
+          f"rps={result['rps']:.1f} p50={result['p50_ms']:.1f}ms p99={result['p99_ms']:.1f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+消息渲染基准测试
+对比逐条字符串拼接的旧实现与预编译模板的渲染耗时，并校验两者输出一致
+
+用法: python bench_templates.py --alerts 1000 --rounds 20
+"""
+
+import argparse
+import time
+from urllib.parse import quote
+
+from message_templates import TemplateSet
+
+def legacy_format(payload, platform):
+    """旧版format_alertmanager_payload，仅作为对比基线"""
+    alerts_markdown = []
+    common_summary = payload.get('commonAnnotations', {}).get('summary', 'N/A')
+    for alert in payload.get('alerts', []):
+        status = alert.get('status', 'firing').upper()
+        summary = alert.get('annotations', {}).get('summary', common_summary)
+        description = alert.get('annotations', {}).get('description', '无详细描述')
+        instance = alert.get('labels', {}).get('instance', 'N/A')
+        alertname = alert.get('labels', {}).get('alertname', 'N/A')
+        severity = alert.get('labels', {}).get('severity', 'N/A').upper()
+        starts_at = alert.get('startsAt', 'N/A')
+        grafana_link = payload.get('externalURL', '')
+        if 'grafana_link' in alert.get('annotations', {}):
+            grafana_link = alert['annotations']['grafana_link']
+        elif grafana_link and alertname != 'N/A' and instance != 'N/A':
+            query_expr = f"{{alertname='{alertname}', instance='{instance}'}}"
+            grafana_link = f"{grafana_link.replace('/alerts', '/explore')}?orgId=1&left=%5B%22now-1h%22,%22now%22,%22Prometheus%22,%7B%22expr%22:%22{quote(alertname + query_expr)}%22%7D%5D"
+        title = f"[{status}] {alertname} - {instance}"
+        if platform == "dingtalk":
+            md = f"#### {title}\n\n"
+            md += f"- **级别**: {severity}\n"
+            md += f"- **摘要**: {summary}\n"
+            md += f"- **详情**: {description}\n"
+            md += f"- **开始时间**: {starts_at.split('.')[0].replace('T', ' ')}\n"
+            if grafana_link:
+                md += f"- **[查看Grafana]({grafana_link})**\n"
+            alerts_markdown.append(md)
+    return "Prometheus告警", "\n\n---\n\n".join(alerts_markdown)
+
+def build_payload(count):
+    alerts = []
+    for i in range(count):
+        alerts.append({
+            "status": "firing",
+            "labels": {"alertname": "DeviceDown", "instance": f"192.168.{i // 250}.{i % 250 + 1}", "severity": "critical"},
+            "annotations": {"summary": "设备掉线", "description": f"Camera-{i:04d} 连续3次探测失败"},
+            "startsAt": "2024-01-01T08:00:00.123456789Z",
+        })
+    return {"status": "firing", "externalURL": "http://alertmanager:9093/alerts", "alerts": alerts}
+
+def timed(func, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='消息渲染基准测试')
+    parser.add_argument('--alerts', type=int, default=1000, help='每组告警数')
+    parser.add_argument('--rounds', type=int, default=20, help='重复次数(取最优)')
+    args = parser.parse_args()
+
+    payload = build_payload(args.alerts)
+    templates = TemplateSet()
+    assert templates.render(payload, 'dingtalk') == legacy_format(payload, 'dingtalk'), "rendered output differs"
+
+    legacy = timed(lambda: legacy_format(payload, 'dingtalk'), args.rounds)
+    compiled = timed(lambda: templates.render(payload, 'dingtalk'), args.rounds)
+    print(f"alerts={args.alerts} legacy={legacy * 1000:.2f}ms compiled={compiled * 1000:.2f}ms "
+          f"speedup={legacy / compiled:.1f}x")
+
+if __name__ == '__main__':
+    main()
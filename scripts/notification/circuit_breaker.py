@@ -0,0 +1,98 @@
+# scripts/notification/circuit_breaker.py
+# 按目的地(Webhook URL)划分的熔断器
+#
+# 连续失败(或耗时超过阈值的"慢成功")达到阈值后熔断器打开，打开期间直接拒绝发送，
+# 调用方把消息转入重试队列，不再占用线程等待厂商超时；冷却时间过后进入半开状态，
+# 放行少量探测请求，探测成功则关闭，失败则重新打开。
+import threading
+import time
+
+import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+# 指标中的状态取值
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class BreakerSettings:
+    """熔断参数，对应notification_config.yml中的circuit_breaker"""
+    __slots__ = ('failure_threshold', 'latency_threshold', 'open_seconds', 'half_open_probes')
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.failure_threshold = int(config.get('failure_threshold', 5))
+        self.latency_threshold = float(config.get('latency_threshold', 5.0))
+        self.open_seconds = float(config.get('open_seconds', 30))
+        self.half_open_probes = int(config.get('half_open_probes', 1))
+        if self.failure_threshold < 1 or self.half_open_probes < 1:
+            raise ValueError("circuit_breaker failure_threshold and half_open_probes must be >= 1")
+
+class CircuitBreaker:
+    def __init__(self, name, registry):
+        self.name = name
+        self.registry = registry
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self._lock = threading.Lock()
+        metrics.CIRCUIT_STATE.labels(name).set(STATE_VALUES[CLOSED])
+
+    def _transition(self, new_state):
+        self.state = new_state
+        metrics.CIRCUIT_STATE.labels(self.name).set(STATE_VALUES[new_state])
+        metrics.CIRCUIT_TRANSITIONS.labels(self.name, new_state).inc()
+
+    def allow(self):
+        """是否允许本次发送；打开状态下直接返回False"""
+        settings = self.registry.settings
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < settings.open_seconds:
+                    metrics.CIRCUIT_REJECTIONS.labels(self.name).inc()
+                    return False
+                self._transition(HALF_OPEN)
+                self.probes = 0
+            if self.probes < settings.half_open_probes:
+                self.probes += 1
+                return True
+            metrics.CIRCUIT_REJECTIONS.labels(self.name).inc()
+            return False
+
+    def record(self, success, latency):
+        """记录一次发送结果；耗时超过阈值的成功也按失败计"""
+        settings = self.registry.settings
+        healthy = success and latency <= settings.latency_threshold
+        with self._lock:
+            if healthy:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._transition(CLOSED)
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= settings.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+class BreakerRegistry:
+    """每个Webhook URL一个熔断器；参数随配置热加载更新"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or BreakerSettings()
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def configure(self, settings):
+        self.settings = settings
+
+    def get(self, destination):
+        breaker = self._breakers.get(destination.url)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(destination.url)
+                if breaker is None:
+                    breaker = self._breakers[destination.url] = CircuitBreaker(destination.name, self)
+        return breaker
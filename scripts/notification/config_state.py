@@ -0,0 +1,133 @@
+# scripts/notification/config_state.py
+# 通知服务的运行时配置状态与热加载
+#
+# 配置文件中的所有内容(Webhook、路由、模板、去重窗口等)被构建成一个不可变的 NotificationState。
+# 请求开始时取一次当前状态并在整个处理过程中使用它，因此热加载只需替换一个引用：
+# 新请求使用新状态，在途请求继续使用旧状态直到完成。构建失败时保留旧状态。
+import hashlib
+import logging
+import os
+import threading
+
+import yaml
+
+from circuit_breaker import BreakerSettings
+from device_state import DEFAULT_DEVICE_ALERTS
+from flapping import FlapSettings
+from lanes import LaneSettings
+from maintenance import MaintenanceWindow
+from message_templates import TemplateSet
+from retry_queue import RetrySettings
+from routing import RoutingTable
+
+class NotificationState:
+    """由一份配置构建出的完整运行时状态；构建过程同时完成配置校验"""
+
+    def __init__(self, config, env_webhooks=None, version=None):
+        if not isinstance(config, dict):
+            raise ValueError("Configuration root must be a mapping")
+        env_webhooks = env_webhooks or {}
+        self.config = config
+        self.version = version
+        self.dingtalk_webhook = config.get('dingtalk_webhook', env_webhooks.get('dingtalk'))
+        self.wechat_webhook = config.get('wechat_webhook', env_webhooks.get('wechat'))
+        self.feishu_webhook = config.get('feishu_webhook', env_webhooks.get('feishu'))
+
+        # 消息模板与路由表在构建状态时编译一次
+        self.templates = TemplateSet(config.get('templates'), config.get('message_limits'))
+        self.routing = RoutingTable(config, fallback_urls={
+            'dingtalk': self.dingtalk_webhook,
+            'wechat': self.wechat_webhook,
+            'feishu': self.feishu_webhook,
+        })
+
+        # 告警去重窗口(秒)，可按severity分别配置
+        dedup_config = config.get('dedup') or {}
+        self.dedup_default_window = int(dedup_config.get('default_window', 300))
+        self.dedup_windows = {str(k).lower(): int(v) for k, v in (dedup_config.get('windows') or {}).items()}
+        # 内容相同的webhook重复投递(Alertmanager重试、重启后重发)在该窗口内只处理一次，0关闭
+        self.payload_dedup_window = int(dedup_config.get('payload_window', 600))
+        # 增量通知：同一告警组只发送新firing与新恢复，已通知过的持续告警只计数；组状态在Redis中保留group_state_ttl秒
+        self.delta_notifications = bool(dedup_config.get('delta_notifications', True))
+        self.group_state_ttl = int(dedup_config.get('group_state_ttl', 86400))
+
+        # 驱动设备在线状态的告警名称
+        device_state_config = config.get('device_state') or {}
+        self.device_alertnames = frozenset(device_state_config.get('alertnames') or DEFAULT_DEVICE_ALERTS)
+        self.flap_settings = FlapSettings(device_state_config.get('flapping'))
+
+        # 配置文件中的维护窗口(API创建的窗口保存在Redis中，见maintenance.py)
+        self.maintenance_windows = tuple(MaintenanceWindow(spec, 'config', f"config-{position + 1}")
+                                         for position, spec in enumerate(config.get('maintenance') or []))
+
+        # 每个目的地的熔断参数与失败消息的重试参数
+        self.breaker_settings = BreakerSettings(config.get('circuit_breaker'))
+        self.retry_settings = RetrySettings(config.get('retry'))
+
+        # 按severity划分的优先级投递通道
+        self.lane_settings = LaneSettings(config.get('lanes'))
+
+    def dedup_window(self, alert):
+        """根据告警级别获取去重窗口"""
+        severity = str(alert.get('labels', {}).get('severity', '')).lower()
+        return self.dedup_windows.get(severity, self.dedup_default_window)
+
+def read_config_file(path):
+    """读取配置文件，返回 (配置字典, 内容摘要)；文件不存在时返回空配置"""
+    if not os.path.exists(path):
+        return {}, None
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return yaml.safe_load(raw) or {}, hashlib.sha1(raw).hexdigest()[:12]
+
+class ConfigWatcher:
+    """后台轮询配置文件，内容变化时在后台线程中构建并校验新状态，成功后原子替换"""
+
+    def __init__(self, path, build_state, on_swap, interval=5.0, current_version=None):
+        self.path = path
+        self.build_state = build_state
+        self.on_swap = on_swap
+        self.interval = interval
+        self.current_version = current_version
+        self._last_stat = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stat = self._stat()
+            if stat is None or stat == self._last_stat:
+                continue
+            self._last_stat = stat
+            self.reload()
+
+    def reload(self):
+        """立即尝试重新加载；返回是否替换了状态"""
+        try:
+            config, version = read_config_file(self.path)
+            if version is not None and version == self.current_version:
+                return False
+            state = self.build_state(config, version)
+        except Exception as e:
+            logging.error(f"Config reload from {self.path} failed, keeping previous configuration: {e}")
+            self.on_swap(None, e)
+            return False
+        self.current_version = version
+        self.on_swap(state, None)
+        logging.info(f"Reloaded configuration from {self.path} (version {version})")
+        return True
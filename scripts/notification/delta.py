@@ -0,0 +1,64 @@
+# scripts/notification/delta.py
+# 增量通知：同一告警组只发送状态有变化的告警
+#
+# Alertmanager每个group_interval重发整组告警，其中大部分在上一次已经通知过。
+# 每个告警组(groupKey)在Redis哈希 delta:<平台>:<groupKey摘要> 中保存上次通知时各告警指纹的状态，
+# 新到的payload在一次往返中与之比较并整体替换：新firing与新恢复照常发送，仍在firing的告警只在消息末尾计数，
+# 重复的恢复不再发送。不再出现在组中的指纹随替换一并删除，哈希大小与组的大小相同。
+# 比较时即写入新状态；之后的投递失败(或请求出错)时再删除对应的指纹，下次重发仍按有变化发送。
+import hashlib
+
+DELTA_PREFIX = 'delta:'
+
+# 上次已通知、状态未变化的firing告警带此标记；投递时不渲染正文，只计入"仍在持续"的数量
+ALREADY_NOTIFIED = 'alreadyNotified'
+
+# ARGV: 哈希键, TTL秒数, 是否删除payload中没有的指纹(1/0), 之后每2个参数一组: 指纹, 状态
+# 返回与告警一一对应的列表: 1 状态有变化(或首次出现)，0 与上次通知时相同
+_DELTA_SCRIPT = """
+local key, ttl, prune = ARGV[1], tonumber(ARGV[2]), ARGV[3] == '1'
+local previous = redis.call('HGETALL', key)
+local old = {}
+for i = 1, #previous, 2 do
+  old[previous[i]] = previous[i + 1]
+end
+if prune then
+  redis.call('DEL', key)
+end
+local changed = {}
+for i = 4, #ARGV, 2 do
+  local fingerprint, status = ARGV[i], ARGV[i + 1]
+  table.insert(changed, old[fingerprint] ~= status and 1 or 0)
+  redis.call('HSET', key, fingerprint, status)
+end
+redis.call('EXPIRE', key, ttl)
+return changed
+"""
+
+def group_state_key(namespace, group_key):
+    return f"{DELTA_PREFIX}{namespace}:{hashlib.sha1(str(group_key).encode('utf-8')).hexdigest()}"
+
+class DeltaTracker:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self._script = redis_client.register_script(_DELTA_SCRIPT)
+
+    def changed(self, namespace, group_key, entries, ttl, complete=True):
+        """entries为 [(指纹, 状态)]，返回与之一一对应的布尔列表(True表示需要发送)
+
+        complete为False(payload被截断，只含组中的部分告警)时不删除未出现的指纹。
+        """
+        if not entries:
+            return []
+        args = [group_state_key(namespace, group_key), ttl, '1' if complete else '0']
+        for fingerprint, status in entries:
+            args.extend((fingerprint, status))
+        return [bool(flag) for flag in self._script(args=args)]
+
+    def forget(self, namespace, group_key, fingerprints=None):
+        """投递失败时删除这些告警的状态(fingerprints为None时删除整个组)，下次重发时重新视为有变化"""
+        key = group_state_key(namespace, group_key)
+        if fingerprints is None:
+            self.redis.delete(key)
+        elif fingerprints:
+            self.redis.hdel(key, *fingerprints)
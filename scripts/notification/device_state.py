@@ -0,0 +1,257 @@
+# scripts/notification/device_state.py
+# 设备当前在线/离线状态存储
+#
+# 由通知服务接收到的设备类告警(DeviceDown等)驱动：告警firing时设备记为down，该设备所有相关告警都恢复后记为up。
+# Redis中每台设备一个键 device_status:<ip>，值为JSON；同时按site、type各维护一个哈希(ip -> 同样的JSON)，
+# 因此按IP批量查询是一次MGET，按site或type查询是一次HGETALL，无论设备数量多少都只需一次往返。
+# 写入通过Lua脚本完成，一个payload中的所有状态变更一次往返原子地更新三处数据，
+# 并在同一脚本中把受影响的键发布到缓存失效频道(见l1_cache.py)；查询先查进程内缓存，只有未命中的部分访问Redis。
+# 设备由down恢复为up时，同一脚本把这次中断的时长记入按设备、site、type划分的有序集合(见outages.py)，
+# 并记录最近的状态切换时间用于抖动检测(见flapping.py)。
+import json
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from flapping import FLAP_SUMMARY_PREFIX
+from outages import OUTAGE_PREFIX
+
+KEY_PREFIX = 'device_status:'
+SITE_PREFIX = 'device_status_by_site:'
+TYPE_PREFIX = 'device_status_by_type:'
+
+# 未配置device_state.alertnames时，视为设备离线的告警
+DEFAULT_DEVICE_ALERTS = ('DeviceDown', 'SnmpDeviceUnreachable')
+
+# ARGV: 键前缀, site哈希前缀, type哈希前缀, 失效频道(空则不发布), 来源ID, 中断记录键前缀, 中断记录保留秒数,
+#       抖动汇总标记键前缀, 抖动判定窗口秒数, 抖动阈值(0为关闭), 抖动汇总间隔秒数, 当前时间(epoch秒),
+#       之后每7个参数一组: ip, firing|resolved, alertname, site, type, 时间, 时间(epoch秒)
+# 状态JSON: {"ip", "status", "since", "since_ts", "site", "type", "alerts": {alertname: 开始时间},
+#           "flaps": [最近的状态切换时间], "flapping": bool}
+# 返回 {受影响的键, 抖动中的设备}，后者为扁平列表: ip, 当前状态, 是否应发送汇总(1/0), ...
+_UPDATE_SCRIPT = """
+local prefix, site_prefix, type_prefix, channel, origin = ARGV[1], ARGV[2], ARGV[3], ARGV[4], ARGV[5]
+local outage_prefix, retention = ARGV[6], tonumber(ARGV[7])
+local flap_prefix, flap_window, flap_threshold, flap_interval = ARGV[8], tonumber(ARGV[9]), tonumber(ARGV[10]), tonumber(ARGV[11])
+local now = tonumber(ARGV[12])
+local touched = {}
+local flapping, flapping_order = {}, {}
+
+-- 成员为 "序号(定长，分数相同时按写入顺序排序)|累计时长|本次时长|ip"，分数为恢复时间；分数不小于集合中已有的最大分数，保证累计时长随分数单调递增
+local function record_outage(key, end_ts, duration, ip)
+  local last = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+  local seq, total, score = 0, 0, end_ts
+  if last[1] then
+    local last_seq, last_total = string.match(last[1], '^(%d+)|([^|]+)|')
+    seq, total = tonumber(last_seq), tonumber(last_total)
+    score = math.max(score, tonumber(last[2]))
+  end
+  redis.call('ZADD', key, score, string.format('%012d|%.3f|%.3f|%s', seq + 1, total + duration, duration, ip))
+  if retention > 0 then
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', '(' .. (score - retention))
+  end
+end
+
+for i = 13, #ARGV, 7 do
+  local ip, status, alertname, site, dtype, at = ARGV[i], ARGV[i + 1], ARGV[i + 2], ARGV[i + 3], ARGV[i + 4], ARGV[i + 5]
+  local ts = tonumber(ARGV[i + 6])
+  local raw = redis.call('GET', prefix .. ip)
+  local entry = raw and cjson.decode(raw) or {ip = ip, site = '', type = ''}
+  if type(entry.alerts) ~= 'table' then entry.alerts = {} end
+  if status == 'firing' then
+    if not entry.alerts[alertname] then entry.alerts[alertname] = at end
+  else
+    entry.alerts[alertname] = nil
+  end
+  local new_status = next(entry.alerts) and 'down' or 'up'
+  -- 告警未携带site/type标签时沿用之前的值；值变化时从旧索引中移除
+  if site == '' then site = entry.site end
+  if dtype == '' then dtype = entry.type end
+  if entry.status ~= new_status then
+    if new_status == 'up' and entry.status == 'down' and entry.since_ts and outage_prefix ~= '' then
+      local duration = math.max(0, ts - entry.since_ts)
+      record_outage(outage_prefix .. 'device:' .. ip, ts, duration, ip)
+      if site ~= '' then record_outage(outage_prefix .. 'site:' .. site, ts, duration, ip) end
+      if dtype ~= '' then record_outage(outage_prefix .. 'type:' .. dtype, ts, duration, ip) end
+    end
+    entry.status = new_status
+    entry.since = at
+    entry.since_ts = ts
+    -- 只保留最近flap_threshold次切换：最早一次仍在窗口内即说明窗口内的切换次数达到阈值
+    if flap_threshold > 0 then
+      if type(entry.flaps) ~= 'table' then entry.flaps = {} end
+      table.insert(entry.flaps, ts)
+      while #entry.flaps > flap_threshold do table.remove(entry.flaps, 1) end
+    end
+  end
+  if flap_threshold > 0 then
+    local flaps = type(entry.flaps) == 'table' and entry.flaps or {}
+    entry.flapping = #flaps >= flap_threshold and flaps[1] >= now - flap_window
+    if flapping[ip] == nil then table.insert(flapping_order, ip) end
+    flapping[ip] = entry.flapping and entry.status or false
+  end
+  if entry.site ~= '' and entry.site ~= site then
+    redis.call('HDEL', site_prefix .. entry.site, ip)
+    table.insert(touched, site_prefix .. entry.site)
+  end
+  if entry.type ~= '' and entry.type ~= dtype then
+    redis.call('HDEL', type_prefix .. entry.type, ip)
+    table.insert(touched, type_prefix .. entry.type)
+  end
+  entry.site, entry.type = site, dtype
+  local value = cjson.encode(entry)
+  redis.call('SET', prefix .. ip, value)
+  table.insert(touched, prefix .. ip)
+  if site ~= '' then
+    redis.call('HSET', site_prefix .. site, ip, value)
+    table.insert(touched, site_prefix .. site)
+  end
+  if dtype ~= '' then
+    redis.call('HSET', type_prefix .. dtype, ip, value)
+    table.insert(touched, type_prefix .. dtype)
+  end
+end
+if channel ~= '' and #touched > 0 then
+  redis.call('PUBLISH', channel, origin .. '\\n' .. table.concat(touched, '\\n'))
+end
+local flapping_result = {}
+for _, ip in ipairs(flapping_order) do
+  local status = flapping[ip]
+  if status then
+    -- 每台设备每个汇总间隔内只有一次调用得到"应发送汇总"
+    local due = redis.call('SET', flap_prefix .. ip, now, 'NX', 'EX', flap_interval) and 1 or 0
+    table.insert(flapping_result, ip)
+    table.insert(flapping_result, status)
+    table.insert(flapping_result, due)
+  end
+end
+return {touched, flapping_result}
+"""
+
+def parse_timestamp(value):
+    """把Alertmanager的RFC3339时间(可能带纳秒与时区)转换为epoch秒；无法解析时使用当前时间"""
+    if value and not value.startswith('0001-'):
+        text = value.replace('Z', '+00:00')
+        # Python 3.9的fromisoformat只接受3位或6位小数，Alertmanager可能给出纳秒精度
+        head, dot, rest = text.partition('.')
+        if dot:
+            digits = len(rest) - len(rest.lstrip('0123456789'))
+            text = f"{head}.{rest[:digits][:6].ljust(6, '0')}{rest[digits:]}" if digits else head + rest
+        try:
+            return datetime.fromisoformat(text).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+def device_ip(labels):
+    """从告警标签中取设备地址：优先ip标签，其次instance(可能是URL或host:port形式)"""
+    ip = labels.get('ip')
+    if ip:
+        return str(ip).strip()
+    instance = str(labels.get('instance') or labels.get('host') or '').strip()
+    if not instance:
+        return None
+    if '://' not in instance:
+        instance = f"//{instance}"
+    try:
+        host = urlsplit(instance).hostname
+    except ValueError:
+        return None
+    return host or None
+
+def _decode(raw):
+    if raw is None:
+        return None
+    entry = json.loads(raw)
+    if not entry.get('alerts'):
+        # cjson把空表编码为{}，统一成dict便于调用方使用
+        entry['alerts'] = {}
+    return entry
+
+_UNKNOWN = object() # 缓存中表示"Redis中没有该设备"
+
+class DeviceStateStore:
+    def __init__(self, redis_client, cache=None, invalidator=None, outage_retention=0):
+        """cache为进程内缓存(LocalCache)，invalidator为CacheInvalidator；均可省略
+
+        outage_retention为中断记录的保留秒数，0表示不清理。
+        """
+        self.redis = redis_client
+        self.outage_retention = outage_retention
+        self.cache = cache
+        self.invalidator = invalidator
+        self._update = redis_client.register_script(_UPDATE_SCRIPT)
+
+    def events_from_alerts(self, alerts, alertnames):
+        """从告警中提取状态变更事件 (ip, status, alertname, site, type, 时间, epoch秒)；非设备类告警被忽略"""
+        events = []
+        for alert in alerts:
+            labels = alert.get('labels', {})
+            alertname = labels.get('alertname')
+            status = alert.get('status')
+            if alertname not in alertnames or status not in ('firing', 'resolved'):
+                continue
+            ip = device_ip(labels)
+            if not ip:
+                continue
+            at = (alert.get('startsAt') if status == 'firing' else alert.get('endsAt')) or ''
+            events.append((ip, status, alertname, str(labels.get('site', '')), str(labels.get('type', '')),
+                           at, parse_timestamp(at)))
+        return events
+
+    def update(self, events, flap_settings=None):
+        """一次往返应用一组状态变更
+
+        返回 (受影响的键, {抖动中的ip: (当前状态, 是否应发送汇总)})；flap_settings为None时不做抖动检测。
+        """
+        if not events:
+            return [], {}
+        invalidator = self.invalidator
+        flap = flap_settings
+        args = [KEY_PREFIX, SITE_PREFIX, TYPE_PREFIX,
+                invalidator.channel if invalidator else '', invalidator.origin if invalidator else '',
+                OUTAGE_PREFIX, self.outage_retention,
+                FLAP_SUMMARY_PREFIX, flap.window if flap else 0, flap.threshold if flap else 0,
+                flap.summary_interval if flap else 0, time.time()]
+        for event in events:
+            args.extend(event)
+        touched, flapping = self._update(args=args)
+        if self.cache is not None:
+            self.cache.invalidate(touched)
+        return touched, {flapping[i]: (flapping[i + 1], bool(flapping[i + 2])) for i in range(0, len(flapping), 3)}
+
+    def get_many(self, ips):
+        """按IP批量查询，返回与ips一一对应的状态(未知设备为None)；只有缓存未命中的IP访问Redis"""
+        if not ips:
+            return []
+        cache = self.cache
+        if cache is None:
+            return [_decode(raw) for raw in self.redis.mget([f"{KEY_PREFIX}{ip}" for ip in ips])]
+        results = [cache.get(f"{KEY_PREFIX}{ip}") for ip in ips]
+        missing = [index for index, entry in enumerate(results) if entry is None]
+        if missing:
+            generation = cache.generation()
+            keys = [f"{KEY_PREFIX}{ips[index]}" for index in missing]
+            for index, key, raw in zip(missing, keys, self.redis.mget(keys)):
+                entry = _decode(raw)
+                cache.set(key, _UNKNOWN if entry is None else entry, generation=generation)
+                results[index] = entry
+        return [None if entry is _UNKNOWN else entry for entry in results]
+
+    def _hash(self, key):
+        cache = self.cache
+        if cache is not None:
+            devices = cache.get(key)
+            if devices is not None:
+                return devices
+            generation = cache.generation()
+        devices = {ip: _decode(raw) for ip, raw in self.redis.hgetall(key).items()}
+        if cache is not None:
+            cache.set(key, devices, generation=generation)
+        return devices
+
+    def by_site(self, site):
+        return self._hash(f"{SITE_PREFIX}{site}")
+
+    def by_type(self, device_type):
+        return self._hash(f"{TYPE_PREFIX}{device_type}")
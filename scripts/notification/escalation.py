@@ -0,0 +1,192 @@
+# scripts/notification/escalation.py
+# 未恢复告警的重复通知与升级
+#
+# 路由规则可配置 escalation：告警持续firing时每 renotify_interval 秒向原目的地重复通知，
+# 持续 escalate_after 秒仍未恢复时通知 escalate_to 中的目的地(之后的重复通知同时发给它们)，告警恢复时停止。
+# 待处理的告警保存在Redis中：有序集合 escalation:schedule (分数为下次处理时间，插入、改期、删除均为O(log n))
+# 与哈希 escalation:alerts (告警内容)，所有worker与副本共享同一份计划，告警在任一worker上恢复都会停止。
+# 每个worker的后台线程定期用Lua脚本领取到期条目，领取时把分数推后 lease 秒，其他worker不会重复处理；
+# 领取者崩溃时租约到期，由其他worker接手。
+import json
+import logging
+import threading
+import time
+
+import redis
+
+SCHEDULE_KEY = 'escalation:schedule'
+ALERTS_KEY = 'escalation:alerts'
+
+# ARGV: 计划键, 内容键, 之后每4个参数一组: t|r, 条目ID, 首次处理时间, 条目JSON
+# t: 开始跟踪(已在跟踪的条目保持原有计划，Alertmanager的重复通知不会推迟升级)；r: 停止跟踪
+# 返回被停止跟踪的条目JSON
+_SYNC_SCRIPT = """
+local schedule, data = ARGV[1], ARGV[2]
+local removed = {}
+for i = 3, #ARGV, 4 do
+  local op, id = ARGV[i], ARGV[i + 1]
+  if op == 't' then
+    if not redis.call('ZSCORE', schedule, id) then
+      redis.call('ZADD', schedule, ARGV[i + 2], id)
+      redis.call('HSET', data, id, ARGV[i + 3])
+    end
+  else
+    local raw = redis.call('HGET', data, id)
+    if raw then
+      table.insert(removed, raw)
+      redis.call('HDEL', data, id)
+    end
+    redis.call('ZREM', schedule, id)
+  end
+end
+return removed
+"""
+
+# ARGV: 计划键, 内容键, 当前时间, 租约秒数, 最多领取条数；返回扁平列表: 条目ID, 条目JSON, ...
+_CLAIM_SCRIPT = """
+local schedule, data, now, lease = ARGV[1], ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4])
+local due = redis.call('ZRANGEBYSCORE', schedule, '-inf', now, 'LIMIT', 0, tonumber(ARGV[5]))
+local result = {}
+for _, id in ipairs(due) do
+  local raw = redis.call('HGET', data, id)
+  if raw then
+    redis.call('ZADD', schedule, now + lease, id)
+    table.insert(result, id)
+    table.insert(result, raw)
+  else
+    redis.call('ZREM', schedule, id)
+  end
+end
+return result
+"""
+
+# ARGV: 计划键, 内容键, 之后每3个参数一组: 条目ID, 下次处理时间(空表示结束), 条目JSON
+# 处理期间已恢复(已被删除)的条目不会被重新加入
+_RESCHEDULE_SCRIPT = """
+local schedule, data = ARGV[1], ARGV[2]
+for i = 3, #ARGV, 3 do
+  local id = ARGV[i]
+  if redis.call('ZSCORE', schedule, id) then
+    if ARGV[i + 1] == '' then
+      redis.call('ZREM', schedule, id)
+      redis.call('HDEL', data, id)
+    else
+      redis.call('ZADD', schedule, ARGV[i + 1], id)
+      redis.call('HSET', data, id, ARGV[i + 2])
+    end
+  end
+end
+return 1
+"""
+
+def next_due(policy, entry):
+    """条目的下次处理时间；没有后续动作时返回None"""
+    candidates = []
+    if policy.renotify_interval:
+        candidates.append(entry['last_notified'] + policy.renotify_interval)
+    if policy.escalate_after and not entry['escalated']:
+        candidates.append(entry['started'] + policy.escalate_after)
+    return min(candidates) if candidates else None
+
+class EscalationScheduler:
+    def __init__(self, redis_client, lookup, notify, poll_interval=1.0, batch_size=500, lease=60, muted=None):
+        """lookup(entry) -> (Destination, Escalation) 或 None(路由已不再配置升级策略时)
+        notify([(entry, destination, policy, kind)]) 发送到期的通知，kind为 'renotify' 或 'escalate'
+        muted(entry) 为True时(例如处于维护窗口内)本次不通知也不升级，lease秒后再检查
+        """
+        self.redis = redis_client
+        self.lookup = lookup
+        self.notify = notify
+        self.muted = muted
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.lease = lease
+        self._sync = redis_client.register_script(_SYNC_SCRIPT)
+        self._claim = redis_client.register_script(_CLAIM_SCRIPT)
+        self._reschedule = redis_client.register_script(_RESCHEDULE_SCRIPT)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def entry_id(destination, fingerprint):
+        return f"{destination.name}|{fingerprint}"
+
+    def sync(self, tracked, resolved):
+        """一次往返开始跟踪和停止跟踪一批告警
+
+        tracked为 [(Destination, Escalation, 告警指纹, alert, 路由平台, 标题前缀)]，resolved为 [(Destination, 告警指纹)]；
+        返回被停止跟踪的条目(dict)，调用方据此通知已升级的目的地告警已恢复。
+        """
+        if not tracked and not resolved:
+            return []
+        now = time.time()
+        args = [SCHEDULE_KEY, ALERTS_KEY]
+        for destination, policy, fingerprint, alert, platform, title_prefix in tracked:
+            entry_id = self.entry_id(destination, fingerprint)
+            entry = {'id': entry_id, 'destination': destination.name, 'platform': platform, 'title_prefix': title_prefix,
+                     'alert': alert, 'started': now, 'last_notified': now, 'escalated': False}
+            args.extend(('t', entry_id, now + policy.first_due(), json.dumps(entry, ensure_ascii=False)))
+        for destination, fingerprint in resolved:
+            args.extend(('r', self.entry_id(destination, fingerprint), '', ''))
+        return [json.loads(raw) for raw in self._sync(args=args)]
+
+    def __len__(self):
+        return self.redis.zcard(SCHEDULE_KEY)
+
+    def start(self):
+        """启动后台线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='escalation', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        available = True
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+                available = True
+            except redis.RedisError as e:
+                if available:
+                    logging.warning(f"Escalation scheduler cannot reach Redis, pausing: {e}")
+                    available = False
+                processed = 0
+            except Exception as e:
+                logging.error(f"Escalation scheduler error: {e}", exc_info=True)
+                processed = 0
+            # 一批处理满时立即领取下一批
+            if processed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def run_once(self, now=None):
+        """领取并处理一批到期条目，返回领取数量"""
+        now = time.time() if now is None else now
+        claimed = self._claim(args=[SCHEDULE_KEY, ALERTS_KEY, now, self.lease, self.batch_size])
+        if not claimed:
+            return 0
+        actions, updates = [], []
+        for index in range(0, len(claimed), 2):
+            entry_id, entry = claimed[index], json.loads(claimed[index + 1])
+            target = self.lookup(entry)
+            if target is None:
+                updates.extend((entry_id, '', ''))
+                continue
+            destination, policy = target
+            if self.muted is not None and self.muted(entry):
+                updates.extend((entry_id, now + self.lease, claimed[index + 1]))
+                continue
+            if policy.escalate_after and not entry['escalated'] and now >= entry['started'] + policy.escalate_after:
+                entry['escalated'] = True
+                actions.append((entry, destination, policy, 'escalate'))
+            if policy.renotify_interval and now >= entry['last_notified'] + policy.renotify_interval:
+                entry['last_notified'] = now
+                actions.append((entry, destination, policy, 'renotify'))
+            due = next_due(policy, entry)
+            updates.extend((entry_id, '' if due is None else due, json.dumps(entry, ensure_ascii=False)))
+        # 先改期再发送：发送耗时较长，期间恢复的告警由改期脚本保证不会被重新加入
+        self._reschedule(args=[SCHEDULE_KEY, ALERTS_KEY, *updates])
+        if actions:
+            self.notify(actions)
+        return len(claimed) // 2
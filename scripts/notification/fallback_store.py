@@ -0,0 +1,172 @@
+# scripts/notification/fallback_store.py
+# Redis不可用时的降级模式
+#
+# 任何一次Redis调用失败后进入降级模式：去重与设备状态改用进程内存储，后续告警不再等待Redis超时，
+# 按原速度继续发送。后台线程每隔 probe_interval 秒PING一次Redis，恢复后先把降级期间的数据回写
+# (未过期的去重标记以 SET NX 补写剩余TTL，恢复的告警删除去重键，设备状态事件按顺序重放)，再退出降级模式。
+import logging
+import threading
+import time
+from collections import deque
+
+import redis
+
+import metrics
+from redis_factory import PoolExhaustedError
+
+# 表示Redis不可达的异常；命令错误(ResponseError等)不触发降级
+UNAVAILABLE_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+# 回写降级期间的数据时遇到这些错误保留数据，下次探测再试；连接池被占满时Redis可达但暂时无法回写
+TRANSIENT_ERRORS = UNAVAILABLE_ERRORS + (PoolExhaustedError,)
+
+class LocalDedup:
+    """进程内去重标记，语义与Redis中的 SET NX EX / DEL 相同"""
+
+    def __init__(self):
+        self._markers = {} # key -> 过期时间(time.time())
+        self._deleted = set()
+        self._lock = threading.Lock()
+
+    def check(self, key, status, window):
+        """返回是否应发送该告警"""
+        now = time.time()
+        with self._lock:
+            if status == 'resolved':
+                self._markers.pop(key, None)
+                self._deleted.add(key)
+                return True
+            expires = self._markers.get(key)
+            if expires is not None and expires > now:
+                return False
+            self._markers[key] = now + window
+            self._deleted.discard(key)
+            return True
+
+    def drain(self):
+        """取出降级期间的数据用于回写：({key: 剩余毫秒}, [已删除的key])；不足1毫秒即将过期的标记不再回写"""
+        now = time.time()
+        with self._lock:
+            markers = {}
+            for key, expires in self._markers.items():
+                remaining_ms = int((expires - now) * 1000)
+                if remaining_ms > 0:
+                    markers[key] = remaining_ms
+            deleted = list(self._deleted)
+            self._markers.clear()
+            self._deleted.clear()
+        return markers, deleted
+
+    def restore(self, markers, deleted):
+        """回写失败时放回drain取出的数据；取出之后又有新记录的key以新记录为准"""
+        now = time.time()
+        with self._lock:
+            for key, remaining_ms in markers.items():
+                if key not in self._deleted:
+                    self._markers.setdefault(key, now + remaining_ms / 1000.0)
+            for key in deleted:
+                if key not in self._markers:
+                    self._deleted.add(key)
+
+class LocalDeviceStates:
+    """降级期间的设备状态：按与Redis Lua脚本相同的规则在内存中维护，并保留事件以便恢复后重放"""
+
+    def __init__(self, max_events=100000):
+        self._states = {}
+        self._events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._events)
+
+    def apply(self, events):
+        with self._lock:
+            for event in events:
+                ip, status, alertname, site, device_type, at, _ = event
+                # 事件带有原始时间，恢复后重放时中断时长按告警时间而非重放时间计算
+                self._events.append(event)
+                entry = self._states.setdefault(ip, {'ip': ip, 'site': '', 'type': '', 'alerts': {}})
+                if status == 'firing':
+                    entry['alerts'].setdefault(alertname, at)
+                else:
+                    entry['alerts'].pop(alertname, None)
+                new_status = 'down' if entry['alerts'] else 'up'
+                if entry.get('status') != new_status:
+                    entry['status'] = new_status
+                    entry['since'] = at
+                entry['site'] = site or entry['site']
+                entry['type'] = device_type or entry['type']
+
+    def get(self, ip):
+        with self._lock:
+            entry = self._states.get(ip)
+            return dict(entry, alerts=dict(entry['alerts'])) if entry else None
+
+    def select(self, site=None, device_type=None):
+        with self._lock:
+            return {ip: dict(entry, alerts=dict(entry['alerts'])) for ip, entry in self._states.items()
+                    if (site is None or entry['site'] == site) and (device_type is None or entry['type'] == device_type)}
+
+    def drain(self):
+        """取出待重放的事件并清空内存状态"""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            self._states.clear()
+        return events
+
+class RedisHealth:
+    """Redis可用性开关：失败后进入降级模式，由后台线程探测恢复并调用reconcile回写数据"""
+
+    def __init__(self, redis_client, reconcile, probe_interval=1.0):
+        self.redis = redis_client
+        self.reconcile = reconcile
+        self.probe_interval = probe_interval
+        self.degraded = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        metrics.REDIS_DEGRADED.set(0)
+
+    def mark_down(self, error):
+        with self._lock:
+            if self.degraded:
+                return
+            self.degraded = True
+        logging.error(f"Redis unavailable, switching to in-memory dedup and device state: {error}")
+        metrics.REDIS_DEGRADED.set(1)
+        self._wakeup.set()
+
+    def start(self):
+        """启动探测线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='redis-health', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping:
+            if not self.degraded:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            time.sleep(self.probe_interval)
+            try:
+                self.redis.ping()
+                self.reconcile()
+                self.degraded = False
+                # 第一次回写与退出降级之间写入内存存储的数据
+                self.reconcile()
+            except TRANSIENT_ERRORS as e:
+                logging.debug(f"Redis still unavailable: {e}")
+                self.degraded = True
+                continue
+            except redis.RedisError as e:
+                # 回写命令本身出错时重试也不会成功，放弃剩余数据并退出降级
+                logging.error(f"Reconciling degraded-mode data to Redis failed, discarding it: {e}")
+                self.degraded = False
+            metrics.REDIS_DEGRADED.set(0)
+            logging.warning("Redis reachable again, left degraded mode")
@@ -0,0 +1,48 @@
+# scripts/notification/flapping.py
+# 设备状态抖动(flapping)检测
+#
+# 接触不良的PoE端口上的摄像头会每隔几分钟上下线一次，每次切换都会产生一条通知。
+# 设备状态脚本(device_state.py)在每台设备的状态JSON中保存最近 threshold 次up/down切换的时间(定长环形记录)，
+# 最早一次仍在 window 秒内时判定为抖动；判定与状态更新在同一次Redis往返中完成。
+# 抖动期间该设备的单条设备类告警不再发送，改为每 summary_interval 秒最多发送一条"仍在抖动"的汇总。
+import hashlib
+
+FLAPPING_ALERTNAME = 'DeviceFlapping'
+FLAP_SUMMARY_PREFIX = 'device_flap_summary:'
+
+class FlapSettings:
+    """抖动检测参数，对应notification_config.yml中的device_state.flapping"""
+    __slots__ = ('window', 'threshold', 'summary_interval')
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.window = int(config.get('window', 900))
+        # 窗口内up/down切换次数达到该值时判定为抖动，0关闭检测
+        self.threshold = int(config.get('threshold', 6))
+        self.summary_interval = int(config.get('summary_interval', 1800))
+        if self.window <= 0 or self.threshold < 0 or self.summary_interval <= 0:
+            raise ValueError("device_state.flapping: window/summary_interval must be positive and threshold >= 0")
+
+def is_flapping_summary(alert):
+    """是否为本服务生成的抖动汇总告警；汇总没有对应的恢复告警，不参与重复通知与升级"""
+    labels = alert.get('labels', {})
+    return labels.get('alertname') == FLAPPING_ALERTNAME and labels.get('flapping') == 'true'
+
+def flapping_summary_alert(alert, ip, status, settings):
+    """以被抑制的告警为模板生成一条"仍在抖动"汇总告警"""
+    labels = dict(alert.get('labels', {}), alertname=FLAPPING_ALERTNAME, flapping='true')
+    status_text = '离线' if status == 'down' else '在线'
+    fingerprint = hashlib.sha1(f"{FLAPPING_ALERTNAME}:{ip}".encode('utf-8')).hexdigest()[:16]
+    return {
+        'status': 'firing',
+        'labels': labels,
+        'annotations': {
+            'summary': f"设备 {ip} 状态频繁切换，当前{status_text}",
+            'description': (f"最近{settings.window}秒内在线/离线切换不少于{settings.threshold}次。"
+                            f"抖动期间该设备的单条告警已抑制，每{settings.summary_interval}秒汇总一次"),
+        },
+        'startsAt': alert.get('startsAt'),
+        'endsAt': alert.get('endsAt'),
+        'generatorURL': alert.get('generatorURL', ''),
+        'fingerprint': fingerprint,
+    }
@@ -0,0 +1,56 @@
+# scripts/notification/gunicorn.conf.py
+# 通知服务生产模式配置: gunicorn -c gunicorn.conf.py app:app
+# 所有参数均可通过环境变量覆盖，便于在docker-compose中按部署规模调整
+import os
+import shutil
+
+# prometheus_client多进程模式：必须在导入app(及prometheus_client)之前设置
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/notification_metrics')
+# preload_app时app在on_starting之前导入，无标签的Gauge/Counter在定义时即创建指标文件，目录需提前存在
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8888)}"
+
+# worker进程数与每个进程的线程数
+# gthread: 线程模型，无需额外依赖；gevent: 协程模型，需要安装gevent
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000)) # 仅gevent生效
+
+# 单个请求包含同步发送厂商Webhook，超时需大于发送超时(10s)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# 优雅退出：收到SIGTERM后停止接收新请求，最多等待该时长让在途投递完成
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 预加载：在master中加载配置与模块，worker通过fork共享，启动更快、内存更省
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None # 默认关闭访问日志，减少热路径开销
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'INFO').lower()
+
+def on_starting(server):
+    # 清理上次运行残留的指标文件
+    multiproc_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+def post_fork(server, worker):
+    # fork之后重建HTTP与Redis连接池，避免多个进程共享同一socket
+    import app
+    app.init_worker()
+    server.log.info(f"Worker {worker.pid} initialized connection pools")
+
+def worker_exit(server, worker):
+    import app
+    app.shutdown_worker()
+    server.log.info(f"Worker {worker.pid} drained and exited")
+
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
+
+def on_exit(server):
+    server.log.info("Notification service stopped")
@@ -0,0 +1,154 @@
+# scripts/notification/inventory.py
+# 设备清单(devices.yml)索引：按设备地址补充告警中的设备名称、类型、位置与上游设备
+#
+# 告警里通常只有instance(IP、host:port或blackbox探测的URL)，值班人员无法直接判断是哪栋楼的哪台摄像头。
+# 清单在进程内建成 "规范化IP -> 设备信息" 的字典，每条告警只做一次字典查找，不做任何I/O；
+# 后台线程轮询文件，变化时只重新解析有变动的设备条目，新字典构建完成后整体替换。
+import ipaddress
+import logging
+import os
+import threading
+
+import yaml
+
+from device_state import device_ip
+
+# 补充到告警标签中的字段；告警中已有的同名标签不会被覆盖
+ENRICHED_LABELS = ('device_name', 'type', 'site', 'location', 'upstream')
+
+def normalize_ip(value):
+    """IP地址、host:port或URL -> 规范写法(IPv6压缩、去掉前导空白)；主机名统一小写"""
+    if not value:
+        return None
+    host = device_ip({'instance': str(value)})
+    if not host:
+        return None
+    try:
+        return str(ipaddress.ip_address(host))
+    except ValueError:
+        return host.lower()
+
+class DeviceEntry:
+    __slots__ = ('ip', 'name', 'type', 'site', 'location', 'upstream_ref', 'labels', 'raw')
+
+    def __init__(self, ip, raw):
+        self.ip = ip
+        self.raw = raw
+        self.name = str(raw.get('name') or ip)
+        self.type = str(raw.get('type') or '')
+        self.site = str(raw.get('site') or '')
+        self.location = str(raw.get('location') or '')
+        # 上游NVR/交换机可以写名称或IP
+        self.upstream_ref = str(raw.get('upstream') or '')
+        self.labels = None
+
+    def resolve(self, by_ip, by_name):
+        """根据上游引用生成要补充的标签"""
+        upstream = ''
+        if self.upstream_ref:
+            target = by_name.get(self.upstream_ref) or by_ip.get(normalize_ip(self.upstream_ref))
+            upstream = f"{target.name} ({target.ip})" if target else self.upstream_ref
+        values = {'device_name': self.name, 'type': self.type, 'site': self.site,
+                  'location': self.location, 'upstream': upstream}
+        self.labels = {key: value for key, value in values.items() if value}
+
+class DeviceInventory:
+    def __init__(self, path, interval=10.0):
+        self.path = path
+        self.interval = interval
+        self._by_ip = {}
+        self._last_stat = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._by_ip)
+
+    def lookup(self, labels):
+        """按告警标签中的ip/instance查找设备，未收录时返回None"""
+        ip = device_ip(labels)
+        return self._by_ip.get(ip) or self._by_ip.get(normalize_ip(ip))
+
+    def enrich(self, alerts):
+        """返回补充了设备信息标签的告警列表；未收录的设备原样返回"""
+        by_ip = self._by_ip
+        if not by_ip:
+            return alerts
+        enriched = []
+        for alert in alerts:
+            labels = alert.get('labels', {})
+            ip = device_ip(labels)
+            entry = by_ip.get(ip) or by_ip.get(normalize_ip(ip))
+            if entry is None or not entry.labels:
+                enriched.append(alert)
+                continue
+            merged = dict(entry.labels)
+            merged.update(labels)
+            enriched.append(dict(alert, labels=merged))
+        return enriched
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def reload(self):
+        """文件变化时重新加载；只有内容变化或上游设备变化的条目会被重建。返回是否有变化"""
+        stat = self._stat()
+        if stat == self._last_stat:
+            return False
+        self._last_stat = stat
+        if stat is None:
+            if self._by_ip:
+                logging.warning(f"Device inventory {self.path} disappeared, keeping {len(self._by_ip)} devices")
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                devices = yaml.safe_load(f) or []
+            if not isinstance(devices, list):
+                raise ValueError("inventory root must be a list of devices")
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            logging.error(f"Loading device inventory {self.path} failed, keeping previous copy: {e}")
+            return False
+
+        old = self._by_ip
+        by_ip, changed = {}, set()
+        for raw in devices:
+            if not isinstance(raw, dict):
+                continue
+            ip = normalize_ip(raw.get('ip'))
+            if not ip:
+                continue
+            previous = old.get(ip)
+            if previous is not None and previous.raw == raw:
+                by_ip[ip] = previous
+            else:
+                by_ip[ip] = DeviceEntry(ip, raw)
+                changed.add(ip)
+        removed = old.keys() - by_ip.keys()
+        by_name = {entry.name: entry for entry in by_ip.values()}
+        # 上游设备被修改或删除时，引用它的设备也需要重新生成标签
+        touched_names = {old[ip].name for ip in removed | (changed & old.keys())} | {by_ip[ip].name for ip in changed}
+        for ip, entry in by_ip.items():
+            if ip in changed or entry.labels is None or entry.upstream_ref in touched_names \
+                    or normalize_ip(entry.upstream_ref) in changed | removed:
+                entry.resolve(by_ip, by_name)
+        self._by_ip = by_ip
+        logging.info(f"Device inventory loaded from {self.path}: {len(by_ip)} devices "
+                     f"({len(changed - old.keys())} added, {len(changed & old.keys())} changed, {len(removed)} removed)")
+        return True
+
+    def start(self):
+        """启动文件监视线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='device-inventory', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.reload()
@@ -0,0 +1,166 @@
+# scripts/notification/l1_cache.py
+# Redis前的进程内一级缓存
+#
+# 去重标记和设备状态会在短时间内被反复读取，命中本地缓存时不再访问Redis。每个条目带TTL，
+# 超过容量时淘汰最久未使用的条目。修改Redis中对应数据的一方(任意副本、任意worker)把键名发布到
+# 失效频道，各进程的订阅线程收到后删除本地条目；订阅连接断开期间可能漏掉消息，因此重连后清空整个缓存。
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import metrics
+
+# 消息格式为按行分隔的 "<来源ID>\n<键1>\n<键2>..."(site名称可能含空格)；本进程发布的消息无需再处理
+INVALIDATION_CHANNEL = 'notification:cache-invalidate'
+
+_MISSING = object()
+
+class LocalCache:
+    """带TTL的LRU缓存；max_entries为0时关闭缓存(get总是未命中，set不保存)
+
+    从Redis读取后回填时应传入读取前取得的 generation()：读取期间该键被失效过则放弃回填，
+    避免把已过时的值写回缓存。最近失效的键记录各自的generation，其他键的失效不影响回填；
+    记录超出上限或整个缓存被清空后，早于此的回填一律放弃。
+    """
+
+    # 保留失效记录的数量下限；实际上限取此值与max_entries中较大者
+    MIN_INVALIDATION_HISTORY = 1024
+
+    def __init__(self, name, max_entries, default_ttl):
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict() # key -> (过期时间, value)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._invalidated = OrderedDict() # key -> 最近一次失效时的generation
+        self._floor = 0 # 早于此generation的回填无法判断是否跨过了失效
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """返回缓存值；未命中或已过期时返回default"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    metrics.L1_CACHE_REQUESTS.labels(self.name, 'hit').inc()
+                    return entry[1]
+                del self._entries[key]
+        metrics.L1_CACHE_REQUESTS.labels(self.name, 'miss').inc()
+        return default
+
+    def generation(self):
+        return self._generation
+
+    def set(self, key, value, ttl=None, generation=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation and (
+                    generation < self._floor or self._invalidated.get(key, -1) > generation):
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.L1_CACHE_EVICTIONS.labels(self.name).inc()
+
+    def invalidate(self, keys):
+        if not keys:
+            return
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                self._invalidated[key] = self._generation
+                self._invalidated.move_to_end(key)
+            limit = max(self.MIN_INVALIDATION_HISTORY, self.max_entries)
+            while len(self._invalidated) > limit:
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = generation
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+            self._entries.clear()
+
+class CacheInvalidator:
+    """订阅失效频道，删除各本地缓存中的对应条目"""
+
+    def __init__(self, redis_client, caches, channel=INVALIDATION_CHANNEL, reconnect_delay=1.0):
+        self.redis = redis_client
+        self.caches = caches
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.origin = uuid.uuid4().hex
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, keys, client=None):
+        """先删除本进程的条目，再通知其他进程；client可传入pipeline，与写操作在同一次往返中发送
+
+        传入pipeline时写操作尚未生效，本进程的其他线程仍可能读到旧值并回填(本进程的消息不会再处理)，
+        因此execute()之后还需调用 invalidate_local()，使读取跨过写入的回填因generation变化而被放弃。
+        """
+        if not keys:
+            return
+        self.invalidate_local(keys)
+        (client or self.redis).publish(self.channel, '\n'.join((self.origin, *keys)))
+
+    def invalidate_local(self, keys):
+        for cache in self.caches:
+            cache.invalidate(keys)
+
+    def start(self):
+        """启动订阅线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        if all(cache.max_entries <= 0 for cache in self.caches):
+            return
+        # fork出的worker各自需要不同的来源ID，否则会忽略兄弟进程发布的消息
+        self.origin = uuid.uuid4().hex
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='cache-invalidator', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _clear_all(self):
+        for cache in self.caches:
+            cache.clear()
+
+    def _run(self):
+        connected = True
+        while not self._stop.is_set():
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                # 订阅建立之前可能错过了失效消息
+                self._clear_all()
+                connected = True
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None or message.get('type') != 'message':
+                        continue
+                    origin, *keys = message['data'].split('\n')
+                    if origin != self.origin:
+                        self.invalidate_local(keys)
+            except Exception as e:
+                # 除Redis错误外，连接在其他线程中被关闭时也可能抛出ValueError/OSError
+                if connected:
+                    logging.warning(f"Cache invalidation subscription lost, clearing local caches: {e}")
+                    connected = False
+                self._clear_all()
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
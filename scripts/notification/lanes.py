@@ -0,0 +1,233 @@
+# scripts/notification/lanes.py
+# 按严重级别划分的优先级投递通道(lane)
+#
+# 告警按severity标签分到不同lane，每个lane有独立的队列和专属worker，critical的专属worker只处理critical，
+# 大量warning积压时critical的投递延迟不受影响。另有一组共享worker在各lane之间调度：
+# strict 总是先处理优先级最高(配置中靠前)的非空lane；weighted 按weight比例在非空lane之间平滑轮转，
+# 低优先级lane在高优先级持续繁忙时也能分到处理能力。
+# lane的队列满时 submit 返回False，由调用方在请求线程中直接投递，形成背压而不丢弃告警。
+# 多分片并行发送与故障转移各跳同样使用lane专属的线程池(见executors)，其他lane积压的多分片或故障转移消息
+# 不会占满发送线程而排在critical之前。
+import collections
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+SCHEDULING_POLICIES = ('strict', 'weighted')
+
+DEFAULT_LANES = (
+    {'name': 'critical', 'severities': ['critical'], 'workers': 4, 'weight': 6},
+    {'name': 'warning', 'severities': ['warning'], 'workers': 2, 'weight': 3},
+    {'name': 'default', 'workers': 1, 'weight': 1},
+)
+
+class Lane:
+    __slots__ = ('name', 'severities', 'workers', 'weight', 'max_queue')
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict) or not spec.get('name'):
+            raise ValueError("lanes.lanes: each lane needs a name")
+        self.name = str(spec['name'])
+        self.severities = frozenset(str(value).lower() for value in spec.get('severities') or ())
+        self.workers = int(spec.get('workers', 1))
+        self.weight = int(spec.get('weight', 1))
+        self.max_queue = int(spec.get('max_queue', 1000))
+        if self.workers < 0 or self.weight <= 0 or self.max_queue <= 0:
+            raise ValueError(f"lane '{self.name}': workers must be >= 0, weight and max_queue positive")
+
+class LaneSettings:
+    """优先级通道参数，对应notification_config.yml中的lanes"""
+    __slots__ = ('scheduling', 'shared_workers', 'lanes', 'default', '_by_severity')
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.scheduling = str(config.get('scheduling', 'strict')).lower()
+        if self.scheduling not in SCHEDULING_POLICIES:
+            raise ValueError(f"lanes.scheduling must be one of {', '.join(SCHEDULING_POLICIES)}")
+        self.shared_workers = int(config.get('shared_workers', 2))
+        self.lanes = tuple(Lane(spec) for spec in config.get('lanes') or DEFAULT_LANES)
+        if not self.lanes:
+            raise ValueError("lanes.lanes must not be empty")
+        names = [lane.name for lane in self.lanes]
+        if len(set(names)) != len(names):
+            raise ValueError("lanes.lanes: duplicate lane name")
+        self._by_severity = {}
+        for lane in self.lanes:
+            for severity in lane.severities:
+                self._by_severity.setdefault(severity, lane.name)
+        # 未列出severity的lane接收其余告警；都列出时最后一个lane兜底
+        catch_all = [lane for lane in self.lanes if not lane.severities]
+        self.default = (catch_all[0] if catch_all else self.lanes[-1]).name
+        if self.shared_workers < 0 or (self.shared_workers == 0 and any(lane.workers == 0 for lane in self.lanes)):
+            raise ValueError("lanes: a lane without workers needs shared_workers > 0")
+
+    def lane_for(self, alert):
+        severity = str(alert.get('labels', {}).get('severity', '')).lower()
+        return self._by_severity.get(severity, self.default)
+
+class LaneScheduler:
+    def __init__(self, settings=None, send_threads=4):
+        """send_threads为每个worker同时发送的分片(或故障转移跳)数，lane的线程池按其worker数乘以该值设定大小"""
+        self.settings = settings or LaneSettings()
+        self.send_threads = send_threads
+        self._queues = {}
+        self._credits = {}
+        self._pools = {} # lane名(None为不经lane的投递) -> (分片线程池, 故障转移线程池, 线程数)
+        self._cond = threading.Condition()
+        self._threads = {}
+        self._running = False
+        self._stopping = False
+        self._sync_queues()
+
+    def _sync_queues(self):
+        """按当前配置增删队列；被删除lane中的任务移到默认lane"""
+        settings = self.settings
+        for lane in settings.lanes:
+            self._queues.setdefault(lane.name, collections.deque())
+            self._credits.setdefault(lane.name, 0)
+        for name in [name for name in self._queues if name not in {lane.name for lane in settings.lanes}]:
+            self._queues[settings.default].extend(self._queues.pop(name))
+            self._credits.pop(name, None)
+            self._pools.pop(name, None)
+            metrics.QUEUE_DEPTH.labels(f"lane-{name}").set(0)
+            metrics.QUEUE_DEPTH.labels(f"lane-{settings.default}").set(len(self._queues[settings.default]))
+
+    def configure(self, settings):
+        with self._cond:
+            self.settings = settings
+            self._sync_queues()
+            if self._running:
+                self._spawn()
+            # 多余的worker在下次取任务时退出
+            self._cond.notify_all()
+
+    def executors(self, name):
+        """返回lane专属的 (分片线程池, 故障转移线程池)；name为None(如升级通知)时返回不属于任何lane的一组
+
+        同时在一个lane上执行的任务不超过其专属与共享worker数之和，线程池按此乘以send_threads设定大小。
+        worker数随配置变化时换用新的线程池，旧线程池在途的发送照常完成，空闲线程随其回收退出。
+        """
+        with self._cond:
+            lane = next((lane for lane in self.settings.lanes if lane.name == name), None)
+            workers = lane.workers + self.settings.shared_workers if lane is not None else 1
+            size = max(1, workers * self.send_threads)
+            key = lane.name if lane is not None else None
+            pools = self._pools.get(key)
+            if pools is None or pools[2] != size:
+                label = key or 'other'
+                pools = self._pools[key] = (ThreadPoolExecutor(size, thread_name_prefix=f"chunk-{label}"),
+                                            ThreadPoolExecutor(size, thread_name_prefix=f"failover-{label}"), size)
+            return pools[0], pools[1]
+
+    def depth(self, name):
+        return len(self._queues.get(name, ()))
+
+    def submit(self, name, func, *args):
+        """把任务放入lane的队列；未启动或队列已满时返回False，调用方应自行执行"""
+        with self._cond:
+            queue = self._queues.get(name)
+            lane = next((lane for lane in self.settings.lanes if lane.name == name), None)
+            if not self._running or self._stopping or queue is None or len(queue) >= lane.max_queue:
+                return False
+            queue.append((time.monotonic(), func, args))
+            metrics.QUEUE_DEPTH.labels(f"lane-{name}").inc()
+            self._cond.notify_all()
+        return True
+
+    def start(self):
+        """启动各lane的专属worker与共享worker；线程不会被fork继承，gunicorn worker中需重新调用"""
+        with self._cond:
+            self._running = True
+            self._stopping = False
+            self._threads = {}
+            self._spawn()
+
+    def _spawn(self):
+        wanted = [(lane.name, index) for lane in self.settings.lanes for index in range(lane.workers)]
+        wanted += [(None, index) for index in range(self.settings.shared_workers)]
+        for slot in wanted:
+            thread = self._threads.get(slot)
+            if thread is None or not thread.is_alive():
+                name = f"lane-{slot[0] or 'shared'}-{slot[1]}"
+                thread = self._threads[slot] = threading.Thread(target=self._run, args=(slot,), name=name, daemon=True)
+                thread.start()
+
+    def _wanted(self, slot):
+        lane_name, index = slot
+        if lane_name is None:
+            return index < self.settings.shared_workers
+        return any(lane.name == lane_name and index < lane.workers for lane in self.settings.lanes)
+
+    def _pick(self):
+        """共享worker选择下一个lane；所有lane为空时返回None"""
+        ready = [lane for lane in self.settings.lanes if self._queues.get(lane.name)]
+        if not ready:
+            return None
+        if self.settings.scheduling == 'strict':
+            return ready[0].name
+        # 平滑加权轮询：每次各非空lane加上自身weight，选累计最大者并减去总weight
+        total = 0
+        for lane in ready:
+            self._credits[lane.name] += lane.weight
+            total += lane.weight
+        chosen = max(ready, key=lambda lane: self._credits[lane.name]).name
+        self._credits[chosen] -= total
+        return chosen
+
+    def _take(self, slot):
+        with self._cond:
+            while True:
+                if not self._wanted(slot) and not self._stopping:
+                    return None
+                name = slot[0] if slot[0] is not None else self._pick()
+                if name is not None and self._queues.get(name):
+                    enqueued, func, args = self._queues[name].popleft()
+                    metrics.QUEUE_DEPTH.labels(f"lane-{name}").dec()
+                    return name, enqueued, func, args
+                if self._stopping:
+                    return None
+                self._cond.wait()
+
+    def _run(self, slot):
+        while True:
+            task = self._take(slot)
+            if task is None:
+                return
+            self._execute(*task)
+
+    @staticmethod
+    def _execute(name, enqueued, func, args):
+        started = time.monotonic()
+        metrics.LANE_WAIT.labels(name).observe(started - enqueued)
+        try:
+            func(*args)
+        except Exception as e:
+            logging.error(f"Task in lane {name} failed: {e}", exc_info=True)
+        finally:
+            metrics.LANE_LATENCY.labels(name).observe(time.monotonic() - enqueued)
+
+    def stop(self, timeout=10.0):
+        """停止接收任务，等待worker处理完队列；超时后在调用线程中执行剩余任务，最后关闭各lane的发送线程池"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            threads = list(self._threads.values())
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        with self._cond:
+            self._running = False
+            remaining = [(name, task) for name, queue in self._queues.items() for task in queue]
+            for queue in self._queues.values():
+                queue.clear()
+        for name, (enqueued, func, args) in remaining:
+            metrics.QUEUE_DEPTH.labels(f"lane-{name}").dec()
+            self._execute(name, enqueued, func, args)
+        with self._cond:
+            pools, self._pools = list(self._pools.values()), {}
+        for chunk_pool, failover_pool, _ in pools:
+            failover_pool.shutdown(wait=True)
+            chunk_pool.shutdown(wait=True)
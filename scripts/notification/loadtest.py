@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+通知服务端到端压测
+在本机启动假的钉钉/企业微信/飞书接收端(可注入延迟与错误，并像厂商一样拒绝超长消息)，按固定速率向通知服务发送Alertmanager格式的请求，
+统计每个平台的接收(ingest)延迟、从发出请求到厂商接收端收到消息的端到端延迟与吞吐。全部在本机完成，无需外网。
+
+默认自动启动一个使用临时配置的通知服务(python app.py)，Webhook指向假接收端；Redis不可用时服务自动进入降级模式，
+因此压测也不依赖Redis。也可以用 --service 压测已运行的服务，此时需自行把其Webhook指向 --receiver-port 上的假接收端。
+
+用法:
+  python loadtest.py --rate 50 --duration 30 --group-sizes 1,1,1,10,200 --latency-ms 80 --error-rate 0.02
+  python loadtest.py --service http://localhost:8888 --receiver-port 9999 --rate 20
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+PLATFORMS = ('dingtalk', 'wechat', 'feishu')
+MARKER = re.compile(r'\[lt:(\d+)\]')
+
+SITES = ('A栋', 'B栋', '停车场', '园区大门')
+DEVICE_TYPES = ('ip_camera', 'nvr', 'switch', 'ap')
+ALERTS = (
+    # alertname, severity, job, 摘要, 详情
+    ('DeviceDown', 'critical', 'blackbox-ping', '设备掉线', '设备已经连续 3 次检测失败，请立即检查网络连接或设备电源。'),
+    ('HighPingLatency', 'warning', 'blackbox-ping', '高Ping延迟', '设备的Ping延迟为 5.3 秒，已超过阈值5秒。请检查网络状况。'),
+    ('HttpProbeFailed', 'warning', 'blackbox-http', 'HTTP探测失败', '设备的HTTP探测返回状态码 503，期望为200。请检查设备服务。'),
+    ('SnmpDeviceUnreachable', 'critical', 'snmp', 'SNMP设备不可达', 'SNMP Exporter无法从设备抓取数据。请检查SNMP配置和网络连接。'),
+)
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+# --- 假厂商接收端 --- #
+# 成功/失败响应与各厂商接口一致，通知服务按真实的错误码处理(计入熔断、转入重试)
+VENDOR_OK = {
+    'dingtalk': (200, {'errcode': 0, 'errmsg': 'ok'}),
+    'wechat': (200, {'errcode': 0, 'errmsg': 'ok'}),
+    'feishu': (200, {'code': 0, 'msg': 'success'}),
+}
+VENDOR_ERRORS = {
+    'dingtalk': [(200, {'errcode': 130101, 'errmsg': 'send too fast'}), (500, {'errmsg': 'internal error'})],
+    'wechat': [(200, {'errcode': 45009, 'errmsg': 'api freq out of limit'}), (502, {'errmsg': 'bad gateway'})],
+    'feishu': [(200, {'code': 9499, 'msg': 'too many request'}), (500, {'msg': 'internal error'})],
+}
+
+# 厂商对消息正文长度的限制(UTF-8字节)与超限时的响应
+VENDOR_SIZE_LIMITS = {
+    'dingtalk': (20000, (200, {'errcode': 460101, 'errmsg': 'message too long'})),
+    'wechat': (4096, (200, {'errcode': 40058, 'errmsg': 'markdown.content exceed max length 4096'})),
+    'feishu': (30000, (200, {'code': 9499, 'msg': 'request body too large'})),
+}
+
+def message_content(platform, body):
+    data = json.loads(body)
+    if platform == 'dingtalk':
+        return data['markdown']['text']
+    if platform == 'wechat':
+        return data['markdown']['content']
+    return ''.join(element['text']['content'] for element in data['card']['elements'])
+
+class FakeVendorReceiver:
+    """在 /dingtalk、/wechat、/feishu 上模拟厂商Webhook；记录每条消息中的压测标记与到达时间"""
+
+    def __init__(self, port=0, latency_ms=50.0, jitter_ms=20.0, error_rate=0.0, enforce_limits=True):
+        self.enforce_limits = enforce_limits
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.received = {platform: [] for platform in PLATFORMS}  # [(到达时间, [序号...])]
+        self.messages = {platform: 0 for platform in PLATFORMS}
+        self.injected_errors = {platform: 0 for platform in PLATFORMS}
+        self.oversize = {platform: 0 for platform in PLATFORMS}
+        self.bytes = {platform: 0 for platform in PLATFORMS}
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                platform = self.path.strip('/').split('?')[0]
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status, response = receiver.handle(platform, body)
+                data = json.dumps(response).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def url(self, platform):
+        return f"http://127.0.0.1:{self.port}/{platform}"
+
+    def handle(self, platform, body):
+        if platform not in PLATFORMS:
+            return 404, {'errmsg': 'unknown path'}
+        delay = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000.0
+        time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            with self.lock:
+                self.injected_errors[platform] += 1
+            return random.choice(VENDOR_ERRORS[platform])
+        content = message_content(platform, body)
+        if self.enforce_limits:
+            limit, rejection = VENDOR_SIZE_LIMITS[platform]
+            if len(content.encode('utf-8')) > limit:
+                with self.lock:
+                    self.oversize[platform] += 1
+                return rejection
+        arrived = time.perf_counter()
+        sequences = [int(seq) for seq in MARKER.findall(content)]
+        with self.lock:
+            self.messages[platform] += 1
+            self.bytes[platform] += len(body)
+            self.received[platform].append((arrived, sequences))
+        return VENDOR_OK[platform]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name='fake-vendor', daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+
+# --- 压测请求 --- #
+class PayloadFactory:
+    """生成Alertmanager webhook(v4)格式的请求；每条告警的摘要中带 [lt:<序号>] 标记，用于计算端到端延迟"""
+
+    def __init__(self, group_sizes, resolved_ratio=0.2):
+        self.group_sizes = group_sizes
+        self.resolved_ratio = resolved_ratio
+        self.sequence = itertools.count()
+
+    def build(self):
+        size = random.choice(self.group_sizes)
+        alertname, severity, job, summary, description = random.choice(ALERTS)
+        site = random.choice(SITES)
+        status = 'resolved' if random.random() < self.resolved_ratio else 'firing'
+        sequences = []
+        alerts = []
+        for _ in range(size):
+            seq = next(self.sequence)
+            sequences.append(seq)
+            ip = f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
+            device_type = random.choice(DEVICE_TYPES)
+            instance = ip if job != 'blackbox-http' else f"http://{ip}:80/"
+            alerts.append({
+                'status': status,
+                'labels': {'alertname': alertname, 'instance': instance, 'job': job, 'severity': severity,
+                           'site': site, 'type': device_type, 'device_name': f"{device_type}-{seq}"},
+                'annotations': {'summary': f"{summary}: {instance} [lt:{seq}]", 'description': description,
+                                'check_url': instance},
+                'startsAt': '2024-01-01T00:00:00.000Z',
+                'endsAt': '2024-01-01T00:05:00.000Z' if status == 'resolved' else '0001-01-01T00:00:00Z',
+                'generatorURL': f"http://prometheus:9090/graph?g0.expr={alertname}",
+                # 唯一指纹，保证不会被去重短路
+                'fingerprint': uuid.uuid4().hex[:16],
+            })
+        group_key = f'{{}}:{{alertname="{alertname}", site="{site}"}}'
+        payload = {
+            'version': '4', 'groupKey': group_key, 'truncatedAlerts': 0, 'status': status,
+            'receiver': 'notification-service', 'groupLabels': {'alertname': alertname, 'site': site},
+            'commonLabels': {'alertname': alertname, 'severity': severity, 'job': job, 'site': site},
+            'commonAnnotations': {'description': description}, 'externalURL': 'http://alertmanager:9093',
+            'alerts': alerts,
+        }
+        return payload, sequences
+
+class LoadGenerator:
+    """开环发送：按 rate 定时发出请求，不因服务变慢而降低发送速率；并发上限用尽时记为客户端饱和"""
+
+    def __init__(self, service_url, platforms, factory, rate, duration, concurrency):
+        self.service_url = service_url.rstrip('/')
+        self.platforms = platforms
+        self.factory = factory
+        self.rate = rate
+        self.duration = duration
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.sent_at = {}  # 告警序号 -> (平台, 发出时间)
+        self.stats = {platform: {'requests': 0, 'alerts': 0, 'http_errors': 0, 'ingest': []} for platform in platforms}
+        self.saturated = 0
+
+    def _session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def _send(self, platform, payload, sequences):
+        try:
+            started = time.perf_counter()
+            with self.lock:
+                for seq in sequences:
+                    self.sent_at[seq] = (platform, started)
+            try:
+                response = self._session().post(f"{self.service_url}/webhook/{platform}", json=payload, timeout=60)
+                failed = response.status_code >= 400
+            except requests.exceptions.RequestException:
+                failed = True
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                stats = self.stats[platform]
+                stats['requests'] += 1
+                stats['alerts'] += len(sequences)
+                stats['http_errors'] += failed
+                stats['ingest'].append(elapsed)
+        finally:
+            self.slots.release()
+
+    def run(self):
+        interval = 1.0 / self.rate
+        platforms = itertools.cycle(self.platforms)
+        started = time.perf_counter()
+        next_at = started
+        while next_at - started < self.duration:
+            now = time.perf_counter()
+            if next_at > now:
+                time.sleep(next_at - now)
+            next_at += interval
+            if not self.slots.acquire(blocking=False):
+                self.saturated += 1
+                continue
+            payload, sequences = self.factory.build()
+            self.executor.submit(self._send, next(platforms), payload, sequences)
+        self.executor.shutdown(wait=True)
+        return time.perf_counter() - started
+
+# --- 被测服务 --- #
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def spawn_service(receiver, gunicorn=False):
+    """用临时配置启动通知服务，Webhook全部指向假接收端；返回 (进程, 服务地址, 临时目录)"""
+    workdir = tempfile.mkdtemp(prefix='notification-loadtest-')
+    config_path = os.path.join(workdir, 'notification_config.yml')
+    with open(config_path, 'w') as f:
+        json.dump({f"{platform}_webhook": receiver.url(platform) for platform in PLATFORMS}, f)  # JSON是合法的YAML
+    port = free_port()
+    env = dict(os.environ, CONFIG_FILE_PATH=config_path, PORT=str(port), LOG_LEVEL='WARNING',
+               CONFIG_RELOAD_INTERVAL='0', PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'))
+    here = os.path.dirname(os.path.abspath(__file__))
+    if gunicorn:
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app']
+    else:
+        env.pop('PROMETHEUS_MULTIPROC_DIR')
+        command = [sys.executable, 'app.py']
+    process = subprocess.Popen(command, cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Service exited during startup: {process.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                return process, url, workdir
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Service did not become healthy within 30s")
+
+# --- 报告 --- #
+def build_report(generator, receiver, elapsed):
+    delivered = {platform: [] for platform in generator.platforms}
+    with receiver.lock:
+        received = {platform: list(entries) for platform, entries in receiver.received.items()}
+    seen = set()
+    for entries in received.values():
+        for arrived, sequences in entries:
+            for seq in sequences:
+                sent = generator.sent_at.get(seq)
+                # 同一告警可能因故障转移或重试被投递多次，只统计首次到达
+                if sent is None or seq in seen:
+                    continue
+                seen.add(seq)
+                delivered[sent[0]].append(arrived - sent[1])
+
+    report = {'elapsed_s': round(elapsed, 2), 'client_saturated': generator.saturated, 'platforms': {}}
+    for platform in generator.platforms:
+        stats = generator.stats[platform]
+        ingest = sorted(stats['ingest'])
+        e2e = sorted(delivered[platform])
+        report['platforms'][platform] = {
+            'requests': stats['requests'],
+            'alerts': stats['alerts'],
+            'http_errors': stats['http_errors'],
+            'ingest_rps': round(stats['requests'] / elapsed, 1) if elapsed else 0.0,
+            'ingest_p50_ms': round(percentile(ingest, 50) * 1000, 1),
+            'ingest_p99_ms': round(percentile(ingest, 99) * 1000, 1),
+            'alerts_delivered': len(e2e),
+            'delivered_per_s': round(len(e2e) / elapsed, 1) if elapsed else 0.0,
+            'e2e_p50_ms': round(percentile(e2e, 50) * 1000, 1),
+            'e2e_p99_ms': round(percentile(e2e, 99) * 1000, 1),
+            'vendor_messages': receiver.messages[platform],
+            'vendor_bytes': receiver.bytes[platform],
+            'vendor_injected_errors': receiver.injected_errors[platform],
+            'vendor_oversize_rejects': receiver.oversize[platform],
+        }
+    return report
+
+def print_report(report):
+    print(f"elapsed={report['elapsed_s']}s client_saturated={report['client_saturated']}")
+    header = ('platform', 'reqs', 'alerts', 'http_err', 'rps', 'ingest p50', 'ingest p99',
+              'delivered', 'deliv/s', 'e2e p50', 'e2e p99', 'msgs', 'inj_err', 'oversize')
+    print(' '.join(f"{column:>10}" for column in header))
+    for platform, row in report['platforms'].items():
+        values = (platform, row['requests'], row['alerts'], row['http_errors'], row['ingest_rps'],
+                  f"{row['ingest_p50_ms']}ms", f"{row['ingest_p99_ms']}ms", row['alerts_delivered'],
+                  row['delivered_per_s'], f"{row['e2e_p50_ms']}ms", f"{row['e2e_p99_ms']}ms",
+                  row['vendor_messages'], row['vendor_injected_errors'], row['vendor_oversize_rejects'])
+        print(' '.join(f"{value:>10}" for value in values))
+
+def main():
+    parser = argparse.ArgumentParser(description='通知服务端到端压测(本机假厂商接收端)')
+    parser.add_argument('--service', help='压测已运行的服务(如 http://localhost:8888)；默认自动启动一个')
+    parser.add_argument('--gunicorn', action='store_true', help='自动启动服务时使用gunicorn生产模式')
+    parser.add_argument('--platforms', default='dingtalk,wechat,feishu', help='轮流发送的平台')
+    parser.add_argument('--rate', type=float, default=20, help='每秒发送的请求数')
+    parser.add_argument('--duration', type=float, default=30, help='发送时长(秒)')
+    parser.add_argument('--concurrency', type=int, default=64, help='客户端最大在途请求数')
+    parser.add_argument('--group-sizes', default='1,1,1,5,20,200',
+                        help='每个请求的告警数，逗号分隔，随机选取(重复的值相当于权重)')
+    parser.add_argument('--resolved-ratio', type=float, default=0.2, help='resolved请求的比例')
+    parser.add_argument('--receiver-port', type=int, default=0, help='假接收端端口(默认随机)')
+    parser.add_argument('--latency-ms', type=float, default=50, help='假接收端平均响应延迟')
+    parser.add_argument('--jitter-ms', type=float, default=20, help='延迟标准差')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='假接收端返回错误的概率')
+    parser.add_argument('--no-size-limits', action='store_true', help='假接收端不按厂商上限拒绝超长消息')
+    parser.add_argument('--drain', type=float, default=15, help='发送结束后等待重试/慢投递的秒数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出报告')
+    args = parser.parse_args()
+
+    platforms = [p.strip() for p in args.platforms.split(',') if p.strip()]
+    unknown = set(platforms) - set(PLATFORMS)
+    if unknown:
+        parser.error(f"unsupported platforms: {', '.join(sorted(unknown))}")
+    group_sizes = [int(size) for size in args.group_sizes.split(',')]
+
+    receiver = FakeVendorReceiver(args.receiver_port, args.latency_ms, args.jitter_ms, args.error_rate,
+                                  enforce_limits=not args.no_size_limits)
+    receiver.start()
+    process = None
+    try:
+        if args.service:
+            service_url = args.service
+            print(f"Fake vendor receiver on http://127.0.0.1:{receiver.port}/<platform>; "
+                  f"point the service's webhooks there", file=sys.stderr)
+        else:
+            process, service_url, workdir = spawn_service(receiver, args.gunicorn)
+            print(f"Started notification service at {service_url} (config in {workdir})", file=sys.stderr)
+
+        generator = LoadGenerator(service_url, platforms, PayloadFactory(group_sizes, args.resolved_ratio),
+                                  args.rate, args.duration, args.concurrency)
+        elapsed = generator.run()
+        # 等待重试队列与故障转移中的消息到达
+        expected = len(generator.sent_at)
+        deadline = time.monotonic() + args.drain
+        while time.monotonic() < deadline:
+            with receiver.lock:
+                arrived = len({seq for entries in receiver.received.values() for _, seqs in entries for seq in seqs})
+            if arrived >= expected:
+                break
+            time.sleep(0.5)
+        report = build_report(generator, receiver, elapsed)
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=35)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        receiver.stop()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == '__main__':
+    main()
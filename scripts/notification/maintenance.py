@@ -0,0 +1,307 @@
+# scripts/notification/maintenance.py
+# 维护窗口：窗口内的告警不发送通知
+#
+# 窗口按设备IP、IP网段、site、type限定范围(同时指定多项时需全部满足，每项可列出多个值)，
+# 时间为一次性的 start~end，或按星期重复的 schedule(如每周二、四 22:00~次日06:00，服务器本地时区)。
+# 来源有两处：notification_config.yml 中的 maintenance(随配置热加载)，以及 /maintenance API
+# 创建的窗口(保存在Redis哈希 maintenance:windows 中，各worker每 refresh_interval 秒重新加载)。
+#
+# 所有窗口在 [now-horizon, now+horizon] 内的各次发生时间被展开为区间，按端点排序后切分为互不重叠的时间段，
+# 每段预先记下其中生效的窗口。判断某一时刻生效的窗口是对端点数组的一次二分查找，与窗口数量成对数关系；
+# 再按告警的IP/site/type查表得到候选窗口。整个检查在渲染之前进行，且不访问Redis。
+import bisect
+import ipaddress
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import redis
+
+from device_state import device_ip
+
+WINDOWS_KEY = 'maintenance:windows'
+
+WEEKDAYS = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+
+def parse_time(value, field):
+    """epoch秒或ISO时间(无时区时按服务器本地时间) -> epoch秒"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        raise ValueError(f"maintenance window: invalid {field} '{value}'")
+
+def _clock(value, field):
+    try:
+        return datetime.strptime(str(value), '%H:%M').time()
+    except ValueError:
+        raise ValueError(f"maintenance window: schedule.{field} must be HH:MM, got '{value}'")
+
+def _weekday(value):
+    if isinstance(value, int) or str(value).isdigit():
+        number = int(value)
+        if 1 <= number <= 7:
+            return number - 1
+    elif str(value).lower()[:3] in WEEKDAYS:
+        return WEEKDAYS[str(value).lower()[:3]]
+    raise ValueError(f"maintenance window: invalid weekday '{value}' (use mon..sun or 1..7)")
+
+def _as_list(value):
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+class MaintenanceWindow:
+    __slots__ = ('id', 'name', 'source', 'ips', 'networks', 'sites', 'types',
+                 'start', 'end', 'weekdays', 'daily_start', 'daily_end', 'spec')
+
+    def __init__(self, spec, source, window_id=None):
+        """spec为配置或API中的窗口定义；格式错误时抛出ValueError"""
+        if not isinstance(spec, dict):
+            raise ValueError("maintenance window must be a mapping")
+        self.id = str(spec.get('id') or window_id or uuid.uuid4().hex[:12])
+        self.name = str(spec.get('name', ''))
+        self.source = source
+        self.ips = frozenset(str(ip).strip() for ip in _as_list(spec.get('ip')))
+        try:
+            self.networks = tuple(ipaddress.ip_network(str(cidr).strip(), strict=False)
+                                  for cidr in _as_list(spec.get('cidr')))
+        except ValueError as e:
+            raise ValueError(f"maintenance window '{self.id}': {e}")
+        self.sites = frozenset(str(site) for site in _as_list(spec.get('site')))
+        self.types = frozenset(str(value) for value in _as_list(spec.get('type')))
+        if not (self.ips or self.networks or self.sites or self.types):
+            raise ValueError(f"maintenance window '{self.id}' needs at least one of ip, cidr, site or type")
+
+        # 重复窗口的start/end表示生效的起止日期范围(可省略)，一次性窗口必须两者都有
+        self.start = parse_time(spec['start'], 'start') if spec.get('start') is not None else None
+        self.end = parse_time(spec['end'], 'end') if spec.get('end') is not None else None
+        schedule = spec.get('schedule')
+        if schedule:
+            self.weekdays = frozenset(_weekday(day) for day in _as_list(schedule.get('weekdays')) or range(1, 8))
+            self.daily_start = _clock(schedule.get('start'), 'start')
+            self.daily_end = _clock(schedule.get('end'), 'end')
+        else:
+            self.weekdays = self.daily_start = self.daily_end = None
+            if self.start is None or self.end is None:
+                raise ValueError(f"maintenance window '{self.id}' needs start and end, or a schedule")
+        if self.start is not None and self.end is not None and self.end <= self.start:
+            raise ValueError(f"maintenance window '{self.id}' ends before it starts")
+        self.spec = dict(spec, id=self.id)
+
+    def expired(self, now):
+        return self.end is not None and self.end <= now
+
+    def occurrences(self, since, until):
+        """产出与 [since, until] 相交的各次生效区间 (开始, 结束)"""
+        if self.weekdays is None:
+            if self.start < until and self.end > since:
+                yield self.start, self.end
+            return
+        # 跨午夜的时段从前一天开始展开
+        day = date.fromtimestamp(since) - timedelta(days=1)
+        last = date.fromtimestamp(until)
+        while day <= last:
+            if day.weekday() in self.weekdays:
+                start = datetime.combine(day, self.daily_start).timestamp()
+                end_day = day + timedelta(days=1) if self.daily_end <= self.daily_start else day
+                end = datetime.combine(end_day, self.daily_end).timestamp()
+                if self.start is not None:
+                    start = max(start, self.start)
+                if self.end is not None:
+                    end = min(end, self.end)
+                if start < end and start < until and end > since:
+                    yield start, end
+            day += timedelta(days=1)
+
+    def matches(self, ip, labels):
+        if self.ips and ip not in self.ips:
+            return False
+        if self.networks:
+            try:
+                address = ipaddress.ip_address(ip)
+            except (TypeError, ValueError):
+                return False
+            if not any(address in network for network in self.networks):
+                return False
+        if self.sites and str(labels.get('site', '')) not in self.sites:
+            return False
+        if self.types and str(labels.get('type', '')) not in self.types:
+            return False
+        return True
+
+class _Segment:
+    """某一时间段内生效的窗口，按最具体的范围字段建立查找表"""
+    __slots__ = ('by_ip', 'by_site', 'by_type', 'by_network')
+
+    def __init__(self, windows):
+        self.by_ip, self.by_site, self.by_type, self.by_network = {}, {}, {}, []
+        for window in windows:
+            if window.ips:
+                for ip in window.ips:
+                    self.by_ip.setdefault(ip, []).append(window)
+            elif window.sites:
+                for site in window.sites:
+                    self.by_site.setdefault(site, []).append(window)
+            elif window.types:
+                for value in window.types:
+                    self.by_type.setdefault(value, []).append(window)
+            else:
+                self.by_network.append(window)
+
+    def match(self, labels):
+        ip = device_ip(labels)
+        for candidates in (self.by_ip.get(ip), self.by_site.get(str(labels.get('site', ''))),
+                           self.by_type.get(str(labels.get('type', ''))), self.by_network):
+            for window in candidates or ():
+                if window.matches(ip, labels):
+                    return window
+        return None
+
+class MaintenanceIndex:
+    """窗口在一段时间内的区间索引(线段树)；超过valid_until后需要重建
+
+    各区间端点排序去重后把时间轴切成若干基本段，每个区间按线段树的方式登记在O(log n)个节点上；
+    查询某一时刻时二分定位基本段，再沿叶子到根收集各节点登记的窗口，耗时O(log n + 命中数)。
+    """
+
+    def __init__(self, windows, now, horizon):
+        self.valid_until = now + horizon / 2
+        intervals = [(start, end, window) for window in windows
+                     for start, end in window.occurrences(now - horizon, now + horizon)]
+        self.boundaries = sorted({point for start, end, _ in intervals for point in (start, end)})
+        size = 1
+        while size < len(self.boundaries):
+            size <<= 1
+        self._size = size
+        self._nodes = {} # 线段树节点编号 -> 完整覆盖该节点的窗口
+        for start, end, window in intervals:
+            # 覆盖基本段 [lo, hi)，基本段i为 [boundaries[i], boundaries[i+1])
+            lo = bisect.bisect_left(self.boundaries, start) + size
+            hi = bisect.bisect_left(self.boundaries, end) + size
+            while lo < hi:
+                if lo & 1:
+                    self._nodes.setdefault(lo, []).append(window)
+                    lo += 1
+                if hi & 1:
+                    hi -= 1
+                    self._nodes.setdefault(hi, []).append(window)
+                lo >>= 1
+                hi >>= 1
+        self._compiled = {}
+
+    def active(self, now):
+        """当前生效的窗口"""
+        position = bisect.bisect_right(self.boundaries, now) - 1
+        if position < 0 or position >= len(self.boundaries) - 1:
+            return ()
+        windows = {}
+        node = position + self._size
+        while node:
+            for window in self._nodes.get(node, ()):
+                windows[window.id] = window
+            node >>= 1
+        return tuple(windows.values())
+
+    def match(self, labels, now):
+        position = bisect.bisect_right(self.boundaries, now) - 1
+        segment = self._compiled.get(position)
+        if segment is None:
+            if len(self._compiled) > 1024:
+                self._compiled.clear()
+            segment = self._compiled[position] = _Segment(self.active(now))
+        return segment.match(labels)
+
+class MaintenanceStore:
+    """合并配置与API两处的窗口，维护当前的区间索引"""
+
+    def __init__(self, redis_client, config_windows, refresh_interval=5.0, horizon=2 * 86400):
+        """config_windows() 返回当前配置中的窗口(随热加载变化)"""
+        self.redis = redis_client
+        self.config_windows = config_windows
+        self.refresh_interval = refresh_interval
+        self.horizon = horizon
+        self._api_windows = ()
+        self._index = None
+        self._index_source = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def windows(self):
+        return tuple(self.config_windows()) + self._api_windows
+
+    def index(self, now=None):
+        now = time.time() if now is None else now
+        index = self._index
+        config_windows = self.config_windows()
+        if index is None or now >= index.valid_until or self._index_source is not config_windows:
+            with self._lock:
+                index = self._index = MaintenanceIndex(tuple(config_windows) + self._api_windows, now, self.horizon)
+                self._index_source = config_windows
+        return index
+
+    def match(self, labels, now=None):
+        """返回告警当前所在的维护窗口，不在任何窗口内时返回None"""
+        now = time.time() if now is None else now
+        return self.index(now).match(labels, now)
+
+    def add(self, spec):
+        window = MaintenanceWindow(spec, 'api')
+        if window.expired(time.time()):
+            raise ValueError(f"maintenance window '{window.id}' has already ended")
+        self.redis.hset(WINDOWS_KEY, window.id, json.dumps(window.spec, ensure_ascii=False))
+        self.refresh()
+        return window
+
+    def remove(self, window_id):
+        removed = self.redis.hdel(WINDOWS_KEY, window_id)
+        self.refresh()
+        return bool(removed)
+
+    def refresh(self):
+        """从Redis重新加载API创建的窗口，并删除已结束的一次性窗口"""
+        now = time.time()
+        windows, expired = [], []
+        for window_id, raw in self.redis.hgetall(WINDOWS_KEY).items():
+            try:
+                window = MaintenanceWindow(json.loads(raw), 'api', window_id)
+            except ValueError as e:
+                logging.warning(f"Ignoring invalid maintenance window {window_id}: {e}")
+                continue
+            (expired if window.expired(now) else windows).append(window)
+        if expired:
+            self.redis.hdel(WINDOWS_KEY, *(window.id for window in expired))
+        with self._lock:
+            self._api_windows = tuple(windows)
+            self._index = None
+
+    def start(self):
+        """启动定期加载线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='maintenance', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        available = True
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                available = True
+            except redis.RedisError as e:
+                # 沿用上次加载的窗口
+                if available:
+                    logging.warning(f"Cannot load maintenance windows from Redis, keeping the last copy: {e}")
+                    available = False
+            self._stop.wait(self.refresh_interval)
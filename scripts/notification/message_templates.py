@@ -0,0 +1,285 @@
+# scripts/notification/message_templates.py
+# 告警消息模板：按平台、按alertname配置，启动时编译一次，渲染时直接写入列表缓冲区
+#
+# 模板语法为Python format语法的子集，可用字段见 TEMPLATE_FIELDS，标签/注释通过
+# {labels[site]}、{annotations[runbook]} 引用(不存在时为空字符串)。以 "?" 开头的行为可选行，
+# 只有当该行引用的字段全部非空时才输出，例如Grafana链接行。字面量花括号请写成 {{ }}。
+import re
+import string
+from functools import lru_cache
+from urllib.parse import quote
+
+TITLE_PREFIX = "Prometheus告警"
+ALERT_SEPARATOR = "\n\n---\n\n"
+
+# 各平台单条消息正文的上限(UTF-8字节)，超过时按告警边界拆成多条；可在配置的message_limits中覆盖
+DEFAULT_MESSAGE_LIMITS = {'dingtalk': 20000, 'wechat': 4096, 'feishu': 30000}
+PART_HEADER = "**(第{index}/{total}部分)**\n\n"
+# 为分片头预留的字节数(上限按9999/9999计算)
+PART_HEADER_RESERVE = len(PART_HEADER.format(index=9999, total=9999).encode('utf-8'))
+# payload中该字段为组内已通知过、仍在持续的告警数(见delta.py)，这些告警不再逐条渲染，只在末尾附一行计数
+STILL_FIRING_FIELD = 'stillFiring'
+STILL_FIRING_LINE = "另有 {count} 条告警仍在持续(此前已通知)"
+TRUNCATED_SUFFIX = "\n\n…(内容过长，已截断)"
+
+DEFAULT_TEMPLATES = {
+    'dingtalk': (
+        "#### {title}\n"
+        "\n"
+        "- **级别**: {severity}\n"
+        "?- **设备**: {labels[device_name]}\n"
+        "?- **位置**: {labels[location]}\n"
+        "?- **上游设备**: {labels[upstream]}\n"
+        "- **摘要**: {summary}\n"
+        "- **详情**: {description}\n"
+        "- **开始时间**: {starts_at}\n"
+        "?- **[查看Grafana]({grafana_link})**\n"
+    ),
+    'wechat': (
+        "**{title}**\n"
+        ">级别: <font color=\"warning\">{severity}</font>\n"
+        "?>设备: {labels[device_name]}\n"
+        "?>位置: {labels[location]}\n"
+        "?>上游设备: {labels[upstream]}\n"
+        ">摘要: {summary}\n"
+        ">详情: {description}\n"
+        ">开始时间: {starts_at}\n"
+        "?>[查看Grafana]({grafana_link})\n"
+    ),
+    'feishu': (
+        "**{title}**\n"
+        "- **级别**: {severity}\n"
+        "?- **设备**: {labels[device_name]}\n"
+        "?- **位置**: {labels[location]}\n"
+        "?- **上游设备**: {labels[upstream]}\n"
+        "- **摘要**: {summary}\n"
+        "- **详情**: {description}\n"
+        "- **开始时间**: {starts_at}\n"
+        "?- **[查看Grafana]({grafana_link})**\n"
+    ),
+}
+
+# 没有独立模板的平台沿用其实际投递渠道的模板
+PLATFORM_ALIASES = {'default': 'dingtalk', 'zabbix': 'dingtalk'}
+
+# 每个字段的取值代码，编译模板时只为用到的字段生成
+_FIELD_CODE = {
+    'status': "status = alert.get('status', 'firing').upper()",
+    'alertname': "alertname = labels.get('alertname', 'N/A')",
+    'instance': "instance = labels.get('instance', 'N/A')",
+    'severity': "severity = labels.get('severity', 'N/A').upper()",
+    'summary': "summary = annotations.get('summary', common_summary)",
+    'description': "description = annotations.get('description', '无详细描述')",
+    'starts_at': "starts_at = alert.get('startsAt', 'N/A').split('.')[0].replace('T', ' ')",
+    # 优先使用注释中更具体的Grafana链接，否则由externalURL构建explore链接
+    'grafana_link': (
+        "grafana_link = annotations.get('grafana_link')\n"
+        "    if grafana_link is None:\n"
+        "        grafana_link = external_url\n"
+        "        if external_url and alertname != 'N/A' and instance != 'N/A':\n"
+        "            grafana_link = grafana_explore_link(external_url, alertname, instance)"
+    ),
+}
+_FIELD_DEPENDS = {'grafana_link': ('alertname', 'instance')}
+TEMPLATE_FIELDS = set(_FIELD_CODE) | {'title', 'labels', 'annotations'}
+
+_formatter = string.Formatter()
+_MAPPING_FIELD = re.compile(r'^(labels|annotations)\[([^\[\]]+)\]$')
+
+@lru_cache(maxsize=64)
+def _explore_prefix(external_url):
+    return f"{external_url.replace('/alerts', '/explore')}?orgId=1&left=%5B%22now-1h%22,%22now%22,%22Prometheus%22,%7B%22expr%22:%22"
+
+@lru_cache(maxsize=4096)
+def grafana_explore_link(external_url, alertname, instance):
+    """构建通用的Grafana explore链接，相同告警重复出现时直接命中缓存"""
+    query_expr = f"{{alertname='{alertname}', instance='{instance}'}}"
+    return f"{_explore_prefix(external_url)}{quote(alertname + query_expr)}%22%7D%5D"
+
+def truncate_utf8(text, max_bytes, suffix=TRUNCATED_SUFFIX):
+    """把text截断到编码后不超过max_bytes字节，在字符边界处截断并追加suffix"""
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text
+    budget = max(0, max_bytes - len(suffix.encode('utf-8')))
+    return encoded[:budget].decode('utf-8', 'ignore') + suffix
+
+def _parse_line(line):
+    """把一行模板拆成 ('lit', 文本) / ('field', 字段名) / ('map', (labels|annotations, 键)) 序列"""
+    parts = []
+    for literal, field_name, format_spec, conversion in _formatter.parse(line):
+        if literal:
+            parts.append(('lit', literal))
+        if field_name is None:
+            continue
+        if format_spec or conversion:
+            raise ValueError(f"Format spec/conversion is not supported in template field '{field_name}'")
+        if field_name == 'title':
+            parts.extend([('lit', '['), ('field', 'status'), ('lit', '] '), ('field', 'alertname'),
+                          ('lit', ' - '), ('field', 'instance')])
+            continue
+        match = _MAPPING_FIELD.match(field_name)
+        if match:
+            parts.append(('map', (match.group(1), match.group(2))))
+        elif field_name in _FIELD_CODE:
+            parts.append(('field', field_name))
+        else:
+            raise ValueError(f"Unknown template field '{field_name}'")
+    return parts
+
+class CompiledTemplate:
+    """编译后的模板
+
+    启动时把模板编译成一个Python函数：只计算模板用到的字段，连续的普通行合并为一次
+    ''.join，可选行编译为if判断。模板文字全部作为常量传入，不会被当作代码执行。
+    """
+    __slots__ = ('source', 'render_into')
+
+    def __init__(self, source):
+        self.source = source
+        consts = {}
+        used_fields = set()
+        mapping_vars = {}
+
+        def const(text):
+            name = f"_c{len(consts)}"
+            consts[name] = text
+            return name
+
+        def expr(part):
+            kind, value = part
+            if kind == 'lit':
+                return const(value)
+            if kind == 'field':
+                used_fields.add(value)
+                used_fields.update(_FIELD_DEPENDS.get(value, ()))
+                return value
+            if value not in mapping_vars:
+                mapping_vars[value] = f"_m{len(mapping_vars)}"
+            return mapping_vars[value]
+
+        body = []
+        pending = []
+        for line in source.splitlines(keepends=True):
+            optional = line.startswith('?')
+            parts = _parse_line(line[1:] if optional else line)
+            exprs = [expr(part) for part in parts]
+            if not exprs:
+                continue
+            if not optional:
+                pending.extend(exprs)
+                continue
+            if pending:
+                body.append(f"    buf.append(''.join(({', '.join(pending)},)))")
+                pending = []
+            conditions = [e for e, part in zip(exprs, parts) if part[0] != 'lit'] or ['True']
+            body.append(f"    if {' and '.join(conditions)}:")
+            body.append(f"        buf.append(''.join(({', '.join(exprs)},)))")
+        if pending:
+            body.append(f"    buf.append(''.join(({', '.join(pending)},)))")
+
+        prelude = [f"    {code}" for name, code in _FIELD_CODE.items() if name in used_fields]
+        for (mapping, key), var in mapping_vars.items():
+            prelude.append(f"    {var} = {mapping}.get({const(key)}, '')")
+
+        code = ("def render_into(buf, alert, labels, annotations, common_summary, external_url):\n"
+                + '\n'.join(prelude + body + ['    return']) + '\n')
+        namespace = dict(consts, grafana_explore_link=grafana_explore_link)
+        exec(compile(code, '<notification template>', 'exec'), namespace)
+        self.render_into = namespace['render_into']
+
+class TemplateSet:
+    """所有平台的已编译模板；查找顺序: 平台+alertname -> 平台默认 -> 内置默认"""
+
+    def __init__(self, templates_config=None, limits=None):
+        self.templates = {}
+        for platform, source in DEFAULT_TEMPLATES.items():
+            self.templates[platform] = {'default': CompiledTemplate(source)}
+        for platform, by_alertname in (templates_config or {}).items():
+            if not isinstance(by_alertname, dict):
+                raise ValueError(f"Templates for platform '{platform}' must be a mapping of alertname to template")
+            compiled = self.templates.setdefault(platform, {})
+            for alertname, source in by_alertname.items():
+                compiled[alertname] = CompiledTemplate(source)
+        self.limits = dict(DEFAULT_MESSAGE_LIMITS)
+        for platform, limit in (limits or {}).items():
+            limit = int(limit)
+            if limit <= PART_HEADER_RESERVE + len(TRUNCATED_SUFFIX.encode('utf-8')):
+                raise ValueError(f"message_limits for '{platform}' is too small: {limit}")
+            self.limits[platform] = limit
+
+    def get(self, platform, alertname):
+        by_alertname = self.templates.get(platform)
+        if by_alertname is None:
+            by_alertname = self.templates.get(PLATFORM_ALIASES.get(platform))
+            if by_alertname is None:
+                return None
+        return by_alertname.get(alertname) or by_alertname.get('default')
+
+    def _rendered_alerts(self, payload, platform):
+        """逐条渲染告警，依次产出每条告警的文本"""
+        common_summary = payload.get('commonAnnotations', {}).get('summary', 'N/A')
+        external_url = payload.get('externalURL', '') # Alertmanager的externalURL，可以指向Grafana
+        for alert in payload.get('alerts', []):
+            labels = alert.get('labels', {})
+            template = self.get(platform, labels.get('alertname', 'N/A'))
+            if template is None:
+                continue
+            buf = []
+            template.render_into(buf, alert, labels, alert.get('annotations', {}), common_summary, external_url)
+            yield ''.join(buf)
+        still_firing = payload.get(STILL_FIRING_FIELD)
+        if still_firing:
+            yield STILL_FIRING_LINE.format(count=still_firing)
+
+    @staticmethod
+    def _resolved_fallback(payload, platform):
+        """没有可渲染的告警但整组已恢复时的简短通知"""
+        if payload.get('status') != 'resolved':
+            return ''
+        common_labels = payload.get('commonLabels', {})
+        title = f"[{payload.get('status', 'resolved').upper()}] {common_labels.get('alertname', 'Alert')} Resolved"
+        message = f"告警 **{common_labels.get('alertname', 'N/A')}** 已恢复.\n实例: {common_labels.get('instance', 'N/A')}"
+        if platform == "dingtalk":
+            message = f"#### {title}\n\n{message}"
+        return message
+
+    def render(self, payload, platform):
+        """渲染整组告警，返回 (标题前缀, 消息正文)"""
+        full_message = ALERT_SEPARATOR.join(self._rendered_alerts(payload, platform))
+        if not full_message:
+            full_message = self._resolved_fallback(payload, platform)
+        return TITLE_PREFIX, full_message
+
+    def render_chunks(self, payload, platform):
+        """按平台的字节上限渲染整组告警，返回 (标题前缀, [分片正文, ...])
+
+        告警逐条累加到当前分片，加入下一条会超过上限时另起一片；单条告警本身超过上限时截断。
+        拆成多片时每片开头加 "(第i/n部分)"；没有内容时返回空列表。
+        """
+        limit = self.limits.get(PLATFORM_ALIASES.get(platform, platform))
+        if not limit:
+            _, message = self.render(payload, platform)
+            return TITLE_PREFIX, [message] if message else []
+        body_limit = limit - PART_HEADER_RESERVE
+        separator_bytes = len(ALERT_SEPARATOR.encode('utf-8'))
+        chunks, current, size = [], [], 0
+        for text in self._rendered_alerts(payload, platform):
+            length = len(text.encode('utf-8'))
+            if length > body_limit:
+                text = truncate_utf8(text, body_limit)
+                length = len(text.encode('utf-8'))
+            if current and size + separator_bytes + length > body_limit:
+                chunks.append(ALERT_SEPARATOR.join(current))
+                current, size = [], 0
+            size += length + (separator_bytes if current else 0)
+            current.append(text)
+        if current:
+            chunks.append(ALERT_SEPARATOR.join(current))
+        if not chunks:
+            message = self._resolved_fallback(payload, platform)
+            return TITLE_PREFIX, [message] if message else []
+        if len(chunks) > 1:
+            total = len(chunks)
+            chunks = [PART_HEADER.format(index=index, total=total) + chunk for index, chunk in enumerate(chunks, 1)]
+        return TITLE_PREFIX, chunks
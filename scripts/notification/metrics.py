@@ -0,0 +1,85 @@
+# scripts/notification/metrics.py
+# 通知服务自身的Prometheus指标
+# gunicorn多进程模式下需设置 PROMETHEUS_MULTIPROC_DIR(见gunicorn.conf.py)，各worker的指标写入共享目录，
+# /metrics 抓取时再聚合；单进程(python app.py)时直接使用默认registry。
+import os
+import time
+
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram,
+                               REGISTRY, generate_latest)
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+if MULTIPROC_DIR:
+    # 无标签的指标在下面定义时就会写入目录中的文件
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+# 投递延迟主要由厂商接口决定，桶的范围覆盖到发送超时(10s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+REDIS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+INGEST_LATENCY = Histogram('notification_ingest_seconds', 'Webhook请求处理耗时(接收到响应)',
+                           ['platform'], buckets=LATENCY_BUCKETS)
+DELIVERY_LATENCY = Histogram('notification_delivery_seconds', '单次厂商Webhook投递耗时',
+                             ['platform'], buckets=LATENCY_BUCKETS)
+# 优先级lane：排队等待时间与从入队到投递完成的总耗时
+LANE_WAIT = Histogram('notification_lane_wait_seconds', '任务在优先级lane队列中的等待时间', ['lane'],
+                      buckets=LATENCY_BUCKETS)
+LANE_LATENCY = Histogram('notification_lane_latency_seconds', '任务从进入优先级lane到投递完成的耗时', ['lane'],
+                         buckets=LATENCY_BUCKETS)
+MESSAGES_SENT = Counter('notification_messages_sent_total', '投递成功的消息数', ['platform'])
+MESSAGES_FAILED = Counter('notification_messages_failed_total', '投递失败的消息数', ['platform'])
+ALERTS_DEDUPLICATED = Counter('notification_alerts_deduplicated_total', '被去重抑制的告警数', ['platform'])
+PAYLOADS_DUPLICATE = Counter('notification_payloads_duplicate_total', '窗口内内容相同、直接确认而未处理的重复webhook', ['platform'])
+ALERTS_UNCHANGED = Counter('notification_alerts_unchanged_total', '告警组重发中状态未变化、不再逐条发送的告警数', ['platform'])
+ALERTS_MUTED = Counter('notification_alerts_muted_total', '处于维护窗口内而未发送的告警数', ['platform'])
+ALERTS_FLAPPING_SUPPRESSED = Counter('notification_alerts_flapping_suppressed_total', '因设备状态抖动被抑制的告警数', ['platform'])
+VENDOR_ERRORS = Counter('notification_vendor_errors_total', '厂商接口返回的错误码(errcode/HTTP状态/异常类型)',
+                        ['platform', 'code'])
+QUEUE_DEPTH = Gauge('notification_queue_depth', '等待或正在处理的任务数', ['queue'],
+                    multiprocess_mode='livesum')
+# 熔断器状态: 0=关闭 1=半开 2=打开；多进程时取各worker中的最大值
+CIRCUIT_STATE = Gauge('notification_circuit_state', '目的地熔断器状态(0关闭/1半开/2打开)', ['destination'],
+                      multiprocess_mode='max')
+CIRCUIT_TRANSITIONS = Counter('notification_circuit_transitions_total', '熔断器状态切换次数', ['destination', 'state'])
+CIRCUIT_REJECTIONS = Counter('notification_circuit_rejections_total', '熔断打开期间被直接拒绝的发送', ['destination'])
+RETRIES_EXHAUSTED = Counter('notification_retries_exhausted_total', '重试耗尽或重试队列满而丢弃的消息', ['platform'])
+FAILOVER_HOPS = Counter('notification_failover_hops_total', '主目的地在deadline内未确认而启动下一跳的次数', ['primary'])
+FAILOVER_DELIVERIES = Counter('notification_failover_deliveries_total', '配置了故障转移的消息最终由哪个渠道送达',
+                              ['primary', 'delivered_by', 'hop'])
+ZABBIX_BATCH_SIZE = Histogram('notification_zabbix_batch_events', '合并发送的每批Zabbix事件数',
+                              buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+ESCALATIONS = Counter('notification_escalations_total', '未恢复告警的重复通知(renotify)与升级(escalate)次数',
+                      ['destination', 'kind'])
+AUDIT_RECORDS_DROPPED = Counter('notification_audit_records_dropped_total', '缓冲区已满或写入失败而丢弃的投递审计记录')
+CONFIG_RELOADS = Counter('notification_config_reloads_total', '配置热加载次数', ['result'])
+REDIS_DEGRADED = Gauge('notification_redis_degraded', 'Redis不可用、使用进程内去重与状态存储(1)', multiprocess_mode='max')
+REDIS_LATENCY = Histogram('notification_redis_seconds', 'Redis往返耗时', ['operation'], buckets=REDIS_BUCKETS)
+
+# 命中率 = rate(notification_l1_cache_requests_total{result="hit"}) / rate(notification_l1_cache_requests_total)
+L1_CACHE_REQUESTS = Counter('notification_l1_cache_requests_total', '进程内缓存查询次数', ['cache', 'result'])
+L1_CACHE_EVICTIONS = Counter('notification_l1_cache_evictions_total', '进程内缓存因容量淘汰的条目数', ['cache'])
+
+def observe_delivery(platform, started, success, code=None):
+    """记录一次投递的耗时与结果；code为厂商错误码，成功时忽略"""
+    DELIVERY_LATENCY.labels(platform).observe(time.perf_counter() - started)
+    if success:
+        MESSAGES_SENT.labels(platform).inc()
+    else:
+        MESSAGES_FAILED.labels(platform).inc()
+        VENDOR_ERRORS.labels(platform, str(code)).inc()
+
+def render_latest():
+    """生成 /metrics 响应内容"""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead(pid):
+    """worker退出后清理其live类指标文件"""
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
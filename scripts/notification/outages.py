@@ -0,0 +1,52 @@
+# scripts/notification/outages.py
+# 设备中断时长统计(MTTR)
+#
+# 设备状态由down恢复为up时，device_state.py中的Lua脚本把这次中断写入三个有序集合：
+#   outage:device:<ip>, outage:site:<site>, outage:type:<type>
+# 分数为恢复时间(epoch秒)，成员为 "序号|累计时长|本次时长|ip"，累计时长是该集合中截至本条的中断时长前缀和。
+# 任意时间窗口内的中断次数、总时长只需要窗口内第一条与最后一条记录：
+#   次数 = ZCOUNT，总时长 = 最后一条的累计值 - (第一条的累计值 - 第一条的本次时长)
+# 每个查询是三个O(log n)命令，多个对象的查询通过一个pipeline一次往返完成，不需要查询Prometheus。
+# 早于保留期的记录被ZREMRANGEBYSCORE清理；前缀和只做差值，清理不影响结果。
+OUTAGE_PREFIX = 'outage:'
+
+SCOPES = ('device', 'site', 'type')
+
+def outage_key(scope, name):
+    return f"{OUTAGE_PREFIX}{scope}:{name}"
+
+def _parse_member(member):
+    """返回 (累计时长, 本次时长)"""
+    _, total, duration, _ = member.split('|', 3)
+    return float(total), float(duration)
+
+class OutageStats:
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    def summaries(self, targets, start, end):
+        """targets为 [(scope, name)]，统计恢复时间落在[start, end]内的中断；未恢复的中断不计入
+
+        返回与targets一一对应的 {'outages', 'downtime_seconds', 'mttr_seconds'}
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for scope, name in targets:
+            key = outage_key(scope, name)
+            pipe.zcount(key, start, end)
+            pipe.zrangebyscore(key, start, end, start=0, num=1)
+            pipe.zrevrangebyscore(key, end, start, start=0, num=1)
+        results = iter(pipe.execute())
+        summaries = []
+        for _ in targets:
+            count, first, last = next(results), next(results), next(results)
+            downtime = 0.0
+            if count and first and last:
+                first_total, first_duration = _parse_member(first[0])
+                last_total, _ = _parse_member(last[0])
+                downtime = max(0.0, last_total - (first_total - first_duration))
+            summaries.append({
+                'outages': count,
+                'downtime_seconds': round(downtime, 3),
+                'mttr_seconds': round(downtime / count, 3) if count else None,
+            })
+        return summaries
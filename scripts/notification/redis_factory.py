@@ -0,0 +1,94 @@
+# scripts/notification/redis_factory.py
+# 通知服务与设备发现脚本共用的Redis客户端工厂
+#
+# 连接参数全部来自环境变量，默认值与原先硬编码的 redis:6379 一致：
+#   REDIS_URL                  redis://[:password@]host:port/db，设置后优先于下面的单项配置
+#   REDIS_HOST / REDIS_PORT / REDIS_DB / REDIS_PASSWORD
+#   REDIS_MAX_CONNECTIONS      连接池大小(默认50)；池满时最多等待 REDIS_POOL_TIMEOUT 秒，仍无空闲连接时抛出PoolExhaustedError
+#   REDIS_SOCKET_TIMEOUT       读写超时(默认0.5秒)
+#   REDIS_CONNECT_TIMEOUT      建立连接超时(默认0.5秒)
+#   REDIS_HEALTH_CHECK_INTERVAL 空闲连接复用前的健康检查间隔(默认30秒)
+#   REDIS_SENTINELS            逗号分隔的 host:port 列表，设置后通过Sentinel发现主节点
+#   REDIS_SENTINEL_MASTER      Sentinel中的主节点名称(默认mymaster)
+# 超时设置得较短：告警链路上宁可快速失败进入降级模式，也不要让每条告警等待默认的无限超时。
+import os
+from queue import Empty, LifoQueue
+from urllib.parse import urlsplit
+
+import redis
+from redis.sentinel import Sentinel
+
+class PoolExhaustedError(redis.RedisError):
+    """连接池在 REDIS_POOL_TIMEOUT 内没有空闲连接
+
+    redis-py此时抛出ConnectionError，与Redis不可达无法区分；连接池被占满说明Redis繁忙但可达，
+    调用方按一般的Redis错误处理(本次改用进程内存储)，不进入降级模式。
+    """
+
+class _CheckoutQueue(LifoQueue):
+    """BlockingConnectionPool的空闲连接队列；等待超时时抛出PoolExhaustedError"""
+
+    def get(self, block=True, timeout=None):
+        try:
+            return super().get(block, timeout)
+        except Empty:
+            raise PoolExhaustedError("No connection available in the Redis pool") from None
+
+def _env(name, default, cast=str):
+    value = os.environ.get(name)
+    return cast(value) if value not in (None, '') else default
+
+def redis_settings(db=None):
+    """从环境变量读取连接参数；db参数优先于REDIS_DB/REDIS_URL中的库号"""
+    settings = {
+        'host': _env('REDIS_HOST', 'redis'),
+        'port': _env('REDIS_PORT', 6379, int),
+        'db': _env('REDIS_DB', 0, int),
+        'password': _env('REDIS_PASSWORD', None),
+        'max_connections': _env('REDIS_MAX_CONNECTIONS', 50, int),
+        'pool_timeout': _env('REDIS_POOL_TIMEOUT', 1.0, float),
+        'socket_timeout': _env('REDIS_SOCKET_TIMEOUT', 0.5, float),
+        'connect_timeout': _env('REDIS_CONNECT_TIMEOUT', 0.5, float),
+        'health_check_interval': _env('REDIS_HEALTH_CHECK_INTERVAL', 30, int),
+        'sentinels': [],
+        'sentinel_master': _env('REDIS_SENTINEL_MASTER', 'mymaster'),
+    }
+    url = _env('REDIS_URL', None)
+    if url:
+        parts = urlsplit(url)
+        settings['host'] = parts.hostname or settings['host']
+        settings['port'] = parts.port or settings['port']
+        settings['password'] = parts.password or settings['password']
+        if parts.path.strip('/'):
+            settings['db'] = int(parts.path.strip('/'))
+    for entry in _env('REDIS_SENTINELS', '').split(','):
+        entry = entry.strip()
+        if entry:
+            host, _, port = entry.partition(':')
+            settings['sentinels'].append((host, int(port or 26379)))
+    if db is not None:
+        settings['db'] = db
+    return settings
+
+def create_redis_client(db=None, decode_responses=True):
+    """按环境变量创建带连接池的Redis客户端；连接在首次使用时才建立"""
+    settings = redis_settings(db)
+    connection_kwargs = {
+        'db': settings['db'],
+        'password': settings['password'],
+        'socket_timeout': settings['socket_timeout'],
+        'socket_connect_timeout': settings['connect_timeout'],
+        'health_check_interval': settings['health_check_interval'],
+        'decode_responses': decode_responses,
+    }
+    if settings['sentinels']:
+        sentinel = Sentinel(settings['sentinels'],
+                            socket_timeout=settings['socket_timeout'],
+                            socket_connect_timeout=settings['connect_timeout'])
+        return sentinel.master_for(settings['sentinel_master'],
+                                   max_connections=settings['max_connections'], **connection_kwargs)
+    pool = redis.BlockingConnectionPool(host=settings['host'], port=settings['port'],
+                                        max_connections=settings['max_connections'],
+                                        timeout=settings['pool_timeout'], queue_class=_CheckoutQueue,
+                                        **connection_kwargs)
+    return redis.Redis(connection_pool=pool)
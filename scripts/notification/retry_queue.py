@@ -0,0 +1,145 @@
+# scripts/notification/retry_queue.py
+# 发送失败或被熔断拒绝的消息的进程内重试队列
+# 按到期时间排序(最小堆)，后台线程到期后重新投递，失败则按指数退避重新入队，超过最大次数后丢弃。
+# 到期的任务可交给其所属的优先级lane执行(见submit)，critical消息的重试不排在大量warning重试之后。
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import metrics
+
+class RetrySettings:
+    """重试参数，对应notification_config.yml中的retry"""
+    __slots__ = ('max_attempts', 'base_delay', 'max_delay', 'max_queue')
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.max_attempts = int(config.get('max_attempts', 5))
+        self.base_delay = float(config.get('base_delay', 5))
+        self.max_delay = float(config.get('max_delay', 300))
+        self.max_queue = int(config.get('max_queue', 1000))
+
+class RetryJob:
+    __slots__ = ('destination', 'title', 'message', 'attempt', 'subjects', 'lane')
+
+    def __init__(self, destination, title, message, attempt=0, subjects=(), lane=None):
+        self.destination = destination
+        self.title = title
+        self.message = message
+        self.attempt = attempt
+        # 消息中各告警的审计信息，见app.audit_subjects
+        self.subjects = subjects
+        # 消息所属的优先级lane；None表示不经lane(如升级通知)
+        self.lane = lane
+
+class RetryQueue:
+    def __init__(self, send_func, settings=None, submit=None):
+        """send_func(job) -> bool，返回是否投递成功
+
+        submit(job) -> bool 把到期的任务交给其他线程调用attempt(job)；返回False或未设置时在重试线程中直接执行。
+        """
+        self.send_func = send_func
+        self.submit = submit
+        self.settings = settings or RetrySettings()
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def configure(self, settings):
+        self.settings = settings
+
+    def __len__(self):
+        return len(self._heap)
+
+    def put(self, job):
+        """按退避时间把任务放入队列；队列已满或超过最大重试次数时返回False
+
+        stop()开始后不再入队，在调用线程中立即做最后一次尝试，返回是否投递成功。
+        """
+        settings = self.settings
+        if job.attempt >= settings.max_attempts:
+            logging.error(f"Giving up on message to {job.destination.name} after {job.attempt} attempts")
+            metrics.RETRIES_EXHAUSTED.labels(job.destination.platform).inc()
+            return False
+        delay = min(settings.base_delay * (2 ** job.attempt), settings.max_delay)
+        with self._cond:
+            if not self._stopping:
+                if len(self._heap) >= settings.max_queue:
+                    logging.error(f"Retry queue full, dropping message to {job.destination.name}")
+                    metrics.RETRIES_EXHAUSTED.labels(job.destination.platform).inc()
+                    return False
+                heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), job))
+                metrics.QUEUE_DEPTH.labels('retry').inc()
+                self._cond.notify()
+                return True
+        if self._try_send(job):
+            return True
+        logging.warning(f"Retry queue stopping, dropping undelivered message to {job.destination.name}")
+        metrics.RETRIES_EXHAUSTED.labels(job.destination.platform).inc()
+        return False
+
+    def start(self):
+        """启动后台重试线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='retry-queue', daemon=True)
+        self._thread.start()
+
+    def _pop_due(self):
+        with self._cond:
+            while not self._stopping:
+                if self._heap:
+                    due = self._heap[0][0] - time.monotonic()
+                    if due <= 0:
+                        metrics.QUEUE_DEPTH.labels('retry').dec()
+                        return heapq.heappop(self._heap)[2]
+                    self._cond.wait(due)
+                else:
+                    self._cond.wait()
+            return None
+
+    def _run(self):
+        while True:
+            job = self._pop_due()
+            if job is None:
+                return
+            if self.submit is None or not self.submit(job):
+                self.attempt(job)
+
+    def _try_send(self, job):
+        job.attempt += 1
+        try:
+            return self.send_func(job)
+        except Exception as e:
+            logging.error(f"Retry to {job.destination.name} raised: {e}")
+            return False
+
+    def attempt(self, job):
+        """投递一次，失败时按退避重新入队"""
+        if not self._try_send(job):
+            self.put(job)
+
+    def stop(self, timeout=10.0):
+        """停止后台线程，并在timeout内对队列中剩余的消息各做最后一次尝试
+
+        置位_stopping后put()不再入队，等后台线程退出后再取出队列，之后不会有遗漏的消息。
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._cond:
+            pending = [entry[2] for entry in self._heap]
+            self._heap = []
+        deadline = time.monotonic() + timeout
+        dropped = 0
+        for job in pending:
+            metrics.QUEUE_DEPTH.labels('retry').dec()
+            if time.monotonic() >= deadline or not self._try_send(job):
+                dropped += 1
+        if dropped:
+            logging.warning(f"Retry queue stopped with {dropped} undelivered messages")
@@ -0,0 +1,190 @@
+# scripts/notification/routing.py
+# 基于标签匹配的通知路由表
+#
+# notification_config.yml 中的 routes 由标签匹配条件(site、type、severity、alertname等)映射到目的地列表，
+# 启动时编译为按"标签键 -> 标签值 -> 规则位图"组织的倒排索引。匹配一条告警时只需对规则中出现过的
+# 每个标签键做一次查表和位运算，耗时与告警的标签数成正比，而与规则数量无关。
+SUPPORTED_PLATFORMS = ('dingtalk', 'wechat', 'feishu')
+
+# 结果缓存上限：同一组合的匹配位图直接复用已解析的目的地列表
+_DESTINATION_CACHE_SIZE = 4096
+
+class Destination:
+    """一个通知目的地(某个平台上的一个机器人)"""
+    __slots__ = ('name', 'platform', 'url')
+
+    def __init__(self, name, platform, url):
+        self.name = name
+        self.platform = platform
+        self.url = url
+
+    def __repr__(self):
+        return f"Destination({self.name!r}, {self.platform!r})"
+
+class Failover:
+    """规则上的故障转移链：主目的地在deadline秒内未确认送达时启动下一跳"""
+    __slots__ = ('chain', 'deadline')
+
+    def __init__(self, chain, deadline):
+        self.chain = chain
+        self.deadline = deadline
+
+class Escalation:
+    """规则上的重复通知与升级策略(见escalation.py)；时间单位为秒，0表示不启用该项"""
+    __slots__ = ('renotify_interval', 'escalate_after', 'escalate_to')
+
+    def __init__(self, renotify_interval, escalate_after, escalate_to):
+        self.renotify_interval = renotify_interval
+        self.escalate_after = escalate_after
+        self.escalate_to = escalate_to
+
+    def first_due(self):
+        """告警首次通知后，第一次需要处理的相对时间"""
+        return min(delay for delay in (self.renotify_interval, self.escalate_after) if delay > 0)
+
+class _RuleIndex:
+    """单个平台的已编译规则索引，规则i对应位图中的第i位"""
+
+    def __init__(self, rules, default_destinations):
+        self.rule_destinations = [destinations for _, destinations, _, _ in rules]
+        self.rule_options = [(failover, escalation) for _, _, failover, escalation in rules]
+        self.default_destinations = default_destinations
+        self.all_rules = (1 << len(rules)) - 1
+        self.postings = {} # 标签键 -> {标签值: 约束了该键且接受该值的规则位图}
+        constrained = {}   # 标签键 -> 约束了该键的规则位图
+        for index, (matchers, _, _, _) in enumerate(rules):
+            bit = 1 << index
+            for key, values in matchers.items():
+                constrained[key] = constrained.get(key, 0) | bit
+                by_value = self.postings.setdefault(key, {})
+                for value in values:
+                    by_value[value] = by_value.get(value, 0) | bit
+        # 未约束某标签键的规则对该键总是匹配
+        self.unconstrained = {key: self.all_rules & ~mask for key, mask in constrained.items()}
+        self._cache = {}
+
+    def match(self, labels):
+        mask = self.all_rules
+        for key, by_value in self.postings.items():
+            mask &= self.unconstrained[key] | by_value.get(labels.get(key), 0)
+            if not mask:
+                break
+        if not mask:
+            return self.default_destinations
+        return self._resolve(mask)
+
+    def _resolve(self, mask):
+        destinations = self._cache.get(mask)
+        if destinations is not None:
+            return destinations
+        seen = {}
+        remaining, index = mask, 0
+        while remaining:
+            if remaining & 1:
+                # 同一目的地出现在多条规则中时，以第一条规则的故障转移与升级设置为准
+                for destination in self.rule_destinations[index]:
+                    seen.setdefault(destination.name, (destination, *self.rule_options[index]))
+            remaining >>= 1
+            index += 1
+        destinations = tuple(seen.values())
+        if len(self._cache) >= _DESTINATION_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[mask] = destinations
+        return destinations
+
+class RoutingTable:
+    """编译后的路由表；按平台分别建立索引，/webhook/<platform> 只会路由到该平台的目的地"""
+
+    def __init__(self, routing_config, fallback_urls=None):
+        routing_config = routing_config or {}
+        self.destinations = {}
+        for name, spec in (routing_config.get('destinations') or {}).items():
+            platform = str((spec or {}).get('platform', '')).lower()
+            url = (spec or {}).get('url')
+            if platform not in SUPPORTED_PLATFORMS:
+                raise ValueError(f"Destination '{name}' has unsupported platform '{platform}'")
+            if not url:
+                raise ValueError(f"Destination '{name}' has no url")
+            self.destinations[name] = Destination(name, platform, url)
+
+        rules = []
+        for position, route in enumerate(routing_config.get('routes') or []):
+            matchers = {}
+            for key, values in (route.get('match') or {}).items():
+                if not isinstance(values, (list, tuple)):
+                    values = [values]
+                matchers[str(key)] = frozenset(str(value) for value in values)
+            where = f"route #{position + 1}"
+            rules.append((matchers, self._lookup(route.get('destinations'), where),
+                          self._failover(route, where), self._escalation(route, where)))
+        default_destinations = tuple((d, None, None) for d in
+                                     self._lookup(routing_config.get('default_destinations'), 'default_destinations'))
+
+        # 未配置默认目的地的平台以旧的单Webhook配置(dingtalk_webhook等)兜底
+        fallbacks = {}
+        for platform, url in (fallback_urls or {}).items():
+            if url:
+                fallbacks[platform] = ((Destination(platform, platform, url), None, None),)
+
+        self.indexes = {}
+        for platform in SUPPORTED_PLATFORMS:
+            platform_rules = []
+            for matchers, destinations, failover, escalation in rules:
+                selected = tuple(d for d in destinations if d.platform == platform)
+                if selected:
+                    platform_rules.append((matchers, selected, failover, escalation))
+            platform_defaults = tuple(t for t in default_destinations if t[0].platform == platform)
+            if not platform_defaults:
+                platform_defaults = fallbacks.get(platform, ())
+            self.indexes[platform] = _RuleIndex(platform_rules, platform_defaults)
+
+    def _lookup(self, names, where):
+        destinations = []
+        for name in names or []:
+            if name not in self.destinations:
+                raise ValueError(f"Unknown destination '{name}' in {where}")
+            destinations.append(self.destinations[name])
+        return tuple(destinations)
+
+    def _failover(self, route, where):
+        spec = route.get('failover')
+        if not spec:
+            return None
+        chain = self._lookup(spec.get('chain'), f"{where} failover")
+        deadline = float(spec.get('deadline', 5))
+        if not chain or deadline <= 0:
+            raise ValueError(f"{where} failover needs a non-empty chain and a positive deadline")
+        return Failover(chain, deadline)
+
+    def _escalation(self, route, where):
+        spec = route.get('escalation')
+        if not spec:
+            return None
+        renotify_interval = float(spec.get('renotify_interval', 0))
+        escalate_after = float(spec.get('escalate_after', 0))
+        escalate_to = self._lookup(spec.get('escalate_to'), f"{where} escalation")
+        if renotify_interval < 0 or escalate_after < 0 or not (renotify_interval or escalate_after):
+            raise ValueError(f"{where} escalation needs a positive renotify_interval or escalate_after")
+        if escalate_after and not escalate_to:
+            raise ValueError(f"{where} escalation has escalate_after but no escalate_to")
+        return Escalation(renotify_interval, escalate_after, escalate_to)
+
+    def route(self, platform, labels):
+        """返回告警应投递到的 (目的地, 故障转移设置或None, 升级策略或None) 元组"""
+        index = self.indexes.get(platform)
+        if index is None:
+            return ()
+        return index.match(labels)
+
+    def group_alerts(self, platform, alerts, common_labels=None):
+        """把一组告警按目的地分组，返回 {(Destination, Failover或None, Escalation或None): [alert, ...]}，保持告警原有顺序"""
+        groups = {}
+        if not alerts:
+            # 没有具体告警(例如只携带commonLabels的恢复通知)时按公共标签路由
+            for target in self.route(platform, common_labels or {}):
+                groups[target] = []
+            return groups
+        for alert in alerts:
+            for target in self.route(platform, alert.get('labels', {})):
+                groups.setdefault(target, []).append(alert)
+        return groups
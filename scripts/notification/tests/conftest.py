@@ -0,0 +1,84 @@
+# scripts/notification/tests/conftest.py
+# 测试公共夹具：app模块导入一次，所有Redis客户端都指向同一个fakeredis(Lua脚本需要lupa)
+#
+# 运行: cd scripts/notification && python -m pytest tests
+import os
+import sys
+
+import fakeredis
+import pytest
+
+NOTIFICATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, NOTIFICATION_DIR)
+
+# 导入app之前设置：不读取部署环境中的配置、设备清单与审计日志，不启动配置监视线程，指标使用默认registry
+os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+os.environ['CONFIG_FILE_PATH'] = os.path.join(NOTIFICATION_DIR, 'tests', 'missing_config.yml')
+os.environ['CONFIG_RELOAD_INTERVAL'] = '0'
+os.environ['DEVICE_INVENTORY_FILE'] = os.path.join(NOTIFICATION_DIR, 'tests', 'missing_devices.yml')
+os.environ['AUDIT_LOG_PATH'] = ''
+for name in ('DINGTALK_WEBHOOK', 'WECHAT_WEBHOOK', 'FEISHU_WEBHOOK'):
+    os.environ.pop(name, None)
+
+FAKE_SERVER = fakeredis.FakeServer()
+
+def fake_redis_client(db=None, decode_responses=True):
+    return fakeredis.FakeRedis(server=FAKE_SERVER, decode_responses=decode_responses)
+
+import redis_factory # noqa: E402
+
+create_real_redis_client = redis_factory.create_redis_client
+redis_factory.create_redis_client = fake_redis_client
+
+import app as notification_app # noqa: E402
+
+DINGTALK_URL = 'https://oapi.dingtalk.com/robot/send?access_token=TEST'
+
+@pytest.fixture
+def redis_client():
+    client = notification_app.redis_client
+    client.flushall()
+    yield client
+    client.flushall()
+
+@pytest.fixture
+def app_module(redis_client, monkeypatch):
+    """清空进程内状态的app模块；默认配置只有一个钉钉Webhook，发送函数被替换为记录调用"""
+    app = notification_app
+    for cache in (app.dedup_cache, app.state_cache):
+        cache.clear()
+    app.local_dedup.drain()
+    app.local_states.drain()
+    app.maintenance.refresh()
+    monkeypatch.setattr(app.redis_health, 'degraded', False)
+    monkeypatch.setattr(app.breakers, '_breakers', {})
+    monkeypatch.setattr(app.retry_queue, '_heap', [])
+    monkeypatch.setattr(app, 'state', app.state)
+    configure(app, {'dingtalk_webhook': DINGTALK_URL})
+    sent = []
+
+    def send_platform_message(destination, title, message):
+        sent.append((destination.name, title, message))
+        return True, "Sent"
+
+    monkeypatch.setattr(app, 'send_platform_message', send_platform_message)
+    app.sent_messages = sent
+    yield app
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+def configure(app, config):
+    """替换当前配置；app_module夹具在每个测试开始时恢复为只有钉钉Webhook的配置"""
+    app.state = app.build_state(config)
+    app.lanes.configure(app.state.lane_settings)
+    app.retry_queue.configure(app.state.retry_settings)
+    app.breakers.configure(app.state.breaker_settings)
+    return app.state
+
+def alert(fingerprint, status='firing', **labels):
+    labels.setdefault('alertname', 'DeviceDown')
+    labels.setdefault('severity', 'critical')
+    return {'status': status, 'labels': labels, 'annotations': {'summary': f"{fingerprint} {status}"},
+            'startsAt': '2024-06-01T00:00:00Z', 'fingerprint': fingerprint}
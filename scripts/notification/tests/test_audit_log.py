@@ -0,0 +1,56 @@
+# scripts/notification/tests/test_audit_log.py
+import pytest
+
+from audit_log import DeliveryAuditLog, decode_cursor
+from routing import Destination
+
+OPS = Destination('ops', 'dingtalk', 'https://example.invalid/ops')
+
+@pytest.fixture
+def audit_log(tmp_path):
+    log = DeliveryAuditLog(str(tmp_path / 'audit' / 'deliveries.db'), batch_size=10)
+    yield log
+    log.stop()
+
+def test_records_are_buffered_until_flush(audit_log):
+    audit_log.record(OPS, [('fp1', '10.0.0.1', 'DeviceDown', 'firing')], 0, True, 0.05, "Sent")
+    assert len(audit_log) == 1
+    assert audit_log.flush() == 1
+    (record,), cursor = audit_log.query()
+    assert cursor is None
+    assert record['fingerprint'] == 'fp1' and record['destination'] == 'ops'
+    assert record['success'] is True and record['latency_ms'] == 50
+
+def test_query_filters_and_paginates(audit_log):
+    for index in range(5):
+        audit_log.record(OPS, [(f"fp{index}", '10.0.0.1' if index % 2 else '10.0.0.2', 'DeviceDown', 'firing')],
+                         index, index != 3, 0.01, 'x' * 500)
+    audit_log.flush()
+    page, cursor = audit_log.query({'device': '10.0.0.2'}, limit=2)
+    assert [record['fingerprint'] for record in page] == ['fp4', 'fp2']
+    page, cursor = audit_log.query({'device': '10.0.0.2'}, cursor=cursor, limit=2)
+    assert [record['fingerprint'] for record in page] == ['fp0'] and cursor is None
+    assert len(audit_log.query({'fingerprint': 'fp3'})[0][0]['response']) == 200
+    with pytest.raises(ValueError):
+        decode_cursor('bogus')
+
+def test_buffer_overflow_drops_records(tmp_path):
+    log = DeliveryAuditLog(str(tmp_path / 'd.db'), max_pending=2)
+    log.record(OPS, [('a', None, 'x', 'firing')] * 3, 0, True, 0, '')
+    assert len(log) == 0
+
+def test_retention_removes_oldest_records(tmp_path):
+    log = DeliveryAuditLog(str(tmp_path / 'd.db'), max_bytes=64 * 1024)
+    for index in range(2000):
+        log.record(OPS, [(f"fp{index}", None, 'DeviceDown', 'firing')], 0, True, 0, 'y' * 100)
+    log.flush()
+    assert log.enforce_retention() > 0
+    records, _ = log.query(limit=1000)
+    assert records[0]['fingerprint'] == 'fp1999'
+    assert log.query({'fingerprint': 'fp0'})[0] == []
+
+def test_disabled_log_records_nothing():
+    log = DeliveryAuditLog('')
+    assert not log.enabled
+    log.record(OPS, [('a', None, 'x', 'firing')], 0, True, 0, '')
+    assert len(log) == 0
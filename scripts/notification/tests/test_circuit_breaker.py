@@ -0,0 +1,53 @@
+# scripts/notification/tests/test_circuit_breaker.py
+from types import SimpleNamespace
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, BreakerRegistry, BreakerSettings
+from routing import Destination
+
+OPS = Destination('ops', 'dingtalk', 'https://example.invalid/ops')
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+def breaker(**config):
+    settings = {'failure_threshold': 2, 'latency_threshold': 1.0, 'open_seconds': 30, 'half_open_probes': 1}
+    settings.update(config)
+    return BreakerRegistry(BreakerSettings(settings)).get(OPS)
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    b = breaker()
+    b.record(False, 0.1)
+    b.record(True, 0.1)
+    b.record(False, 0.1)
+    assert b.state == CLOSED and b.allow()
+    # 超过耗时阈值的成功也按失败计
+    b.record(True, 2.0)
+    assert b.state == OPEN
+    assert not b.allow()
+
+def test_half_open_probe_closes_or_reopens(clock):
+    b = breaker(failure_threshold=1)
+    b.record(False, 0.1)
+    clock[0] += 30
+    assert b.allow() and b.state == HALF_OPEN
+    # 半开状态只放行half_open_probes个探测请求
+    assert not b.allow()
+    b.record(False, 0.1)
+    assert b.state == OPEN and not b.allow()
+    clock[0] += 30
+    assert b.allow()
+    b.record(True, 0.1)
+    assert b.state == CLOSED and b.allow() and b.allow()
+
+def test_send_to_destination_short_circuits_while_open(app_module, monkeypatch):
+    app = app_module
+    monkeypatch.setattr(app.breakers, 'settings', BreakerSettings({'failure_threshold': 1}))
+    app.breakers.get(OPS).record(False, 0.1)
+    assert app.send_to_destination(OPS, 'title', 'message') == (False, "Circuit open")
+    assert app.sent_messages == []
@@ -0,0 +1,88 @@
+# scripts/notification/tests/test_dedup.py
+# 批量去重、进程内一级缓存与Redis降级模式
+import pytest
+import redis
+
+from conftest import alert
+
+NAMESPACE = 'alert:dingtalk'
+
+@pytest.fixture
+def redis_down(redis_client, monkeypatch):
+    """让pipeline的执行抛出连接错误"""
+    def fail(*args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(type(redis_client.pipeline()), 'execute', fail)
+
+def key(app, item):
+    return f"{NAMESPACE}:{app.alert_fingerprint(item)}"
+
+def test_batch_dedup_uses_window_and_resolution_clears_marker(app_module, redis_client):
+    app = app_module
+    batch = [alert('a'), alert('b', severity='warning'), alert('a')]
+    assert app.should_send_alerts(batch, NAMESPACE) == [True, True, False]
+    assert 0 < redis_client.ttl(key(app, alert('a'))) <= app.state.dedup_default_window
+    assert app.should_send_alerts([alert('a'), alert('b')], NAMESPACE) == [False, False]
+    assert app.should_send_alerts([alert('a', 'resolved')], NAMESPACE) == [True]
+    assert not redis_client.exists(key(app, alert('a')))
+    assert app.should_send_alerts([alert('a')], NAMESPACE) == [True]
+
+def test_l1_cache_answers_repeats_without_redis(app_module, redis_client, monkeypatch):
+    app = app_module
+    app.should_send_alerts([alert('a')], NAMESPACE)
+    assert app.dedup_cache.get(key(app, alert('a')))
+
+    def unreachable(*args, **kwargs):
+        raise AssertionError("L1 hit should not reach Redis")
+
+    monkeypatch.setattr(type(redis_client.pipeline()), 'execute', unreachable)
+    assert app.should_send_alerts([alert('a')], NAMESPACE) == [False]
+
+def test_fill_that_races_a_resolution_is_dropped(app_module, monkeypatch):
+    """firing读到旧标记后、回填前同一告警已恢复：回填不能把已删除的标记写回一级缓存"""
+    app = app_module
+    app.should_send_alerts([alert('a')], NAMESPACE)
+    app.dedup_cache.clear()
+    cache_set = app.dedup_cache.set
+
+    def resolve_then_set(*args, **kwargs):
+        app.should_send_alerts([alert('a', 'resolved')], NAMESPACE)
+        cache_set(*args, **kwargs)
+
+    monkeypatch.setattr(app.dedup_cache, 'set', resolve_then_set)
+    app.should_send_alerts([alert('a')], NAMESPACE)
+    monkeypatch.undo()
+    assert app.dedup_cache.get(key(app, alert('a'))) is None
+    # 同一批中其他键的失效不影响回填
+    app.should_send_alerts([alert('b'), alert('c', 'resolved')], NAMESPACE)
+    assert app.dedup_cache.get(key(app, alert('b')))
+
+def test_unreachable_redis_switches_to_local_dedup(app_module, redis_down):
+    app = app_module
+    assert app.should_send_alerts([alert('a'), alert('a')], NAMESPACE) == [True, False]
+    assert app.redis_health.degraded
+    assert app.should_send_alerts([alert('a')], NAMESPACE) == [False]
+    assert app.should_send_alerts([alert('b'), alert('a', 'resolved')], NAMESPACE) == [True, True]
+
+def test_reconcile_writes_back_markers_and_deletions(app_module, redis_client):
+    app = app_module
+    redis_client.set(key(app, alert('gone')), 'x')
+    app.redis_health.degraded = True
+    app.should_send_alerts([alert('a'), alert('gone', 'resolved')], NAMESPACE)
+    app.dedup_cache.clear()
+    app.reconcile_redis()
+    assert 0 < redis_client.pttl(key(app, alert('a'))) <= app.state.dedup_default_window * 1000
+    assert not redis_client.exists(key(app, alert('gone')))
+    assert app.local_dedup.drain() == ({}, [])
+
+def test_reconcile_failure_keeps_degraded_data(app_module, request):
+    app = app_module
+    app.redis_health.degraded = True
+    app.should_send_alerts([alert('a'), alert('gone', 'resolved')], NAMESPACE)
+    request.getfixturevalue('redis_down')
+    with pytest.raises(redis.ConnectionError):
+        app.reconcile_redis()
+    markers, deleted = app.local_dedup.drain()
+    assert list(markers) == [key(app, alert('a'))]
+    assert deleted == [key(app, alert('gone'))]
@@ -0,0 +1,27 @@
+# scripts/notification/tests/test_delta.py
+from delta import DeltaTracker, group_state_key
+
+def test_only_changed_alerts_are_reported(redis_client):
+    tracker = DeltaTracker(redis_client)
+    assert tracker.changed('dingtalk', 'g', [('a', 'firing'), ('b', 'firing')], 60) == [True, True]
+    assert tracker.changed('dingtalk', 'g', [('a', 'firing'), ('b', 'resolved')], 60) == [False, True]
+    assert tracker.changed('dingtalk', 'g', [('b', 'resolved')], 60) == [False]
+    # 平台之间互不影响
+    assert tracker.changed('wechat', 'g', [('a', 'firing')], 60) == [True]
+
+def test_complete_payload_prunes_missing_fingerprints(redis_client):
+    tracker = DeltaTracker(redis_client)
+    tracker.changed('dingtalk', 'g', [('a', 'firing'), ('b', 'firing')], 60)
+    tracker.changed('dingtalk', 'g', [('a', 'firing')], 60, complete=False)
+    assert sorted(redis_client.hkeys(group_state_key('dingtalk', 'g'))) == ['a', 'b']
+    tracker.changed('dingtalk', 'g', [('a', 'firing')], 60)
+    assert redis_client.hkeys(group_state_key('dingtalk', 'g')) == ['a']
+    assert 0 < redis_client.ttl(group_state_key('dingtalk', 'g')) <= 60
+
+def test_forget_makes_alerts_changed_again(redis_client):
+    tracker = DeltaTracker(redis_client)
+    tracker.changed('dingtalk', 'g', [('a', 'firing'), ('b', 'firing')], 60)
+    tracker.forget('dingtalk', 'g', ['a'])
+    assert tracker.changed('dingtalk', 'g', [('a', 'firing'), ('b', 'firing')], 60) == [True, False]
+    tracker.forget('dingtalk', 'g')
+    assert not redis_client.exists(group_state_key('dingtalk', 'g'))
@@ -0,0 +1,91 @@
+# scripts/notification/tests/test_device_state.py
+# 设备状态Lua脚本：状态切换、site/type索引、中断记录与抖动检测
+import time
+
+from conftest import alert
+from device_state import KEY_PREFIX, DeviceStateStore, device_ip, parse_timestamp
+from flapping import FlapSettings, is_flapping_summary
+from l1_cache import LocalCache
+from outages import OutageStats
+
+def event(ip, status, at, alertname='DeviceDown', site='A栋', device_type='ip_camera'):
+    return (ip, status, alertname, site, device_type, f"t{at}", at)
+
+def test_device_is_down_until_all_alerts_resolve(redis_client):
+    store = DeviceStateStore(redis_client)
+    store.update([event('10.0.0.1', 'firing', 100), event('10.0.0.1', 'firing', 110, alertname='SnmpDeviceUnreachable')])
+    store.update([event('10.0.0.1', 'resolved', 120)])
+    entry, unknown = store.get_many(['10.0.0.1', '10.0.0.2'])
+    assert entry['status'] == 'down' and entry['since_ts'] == 100
+    assert list(entry['alerts']) == ['SnmpDeviceUnreachable']
+    assert unknown is None
+    store.update([event('10.0.0.1', 'resolved', 130, alertname='SnmpDeviceUnreachable')])
+    assert store.get_many(['10.0.0.1'])[0]['status'] == 'up'
+    assert store.by_site('A栋')['10.0.0.1']['status'] == 'up'
+    assert list(store.by_type('ip_camera')) == ['10.0.0.1']
+
+def test_site_change_moves_device_between_indexes(redis_client):
+    store = DeviceStateStore(redis_client)
+    store.update([event('10.0.0.1', 'firing', 100)])
+    store.update([event('10.0.0.1', 'resolved', 110, site='B栋')])
+    store.update([event('10.0.0.1', 'firing', 120, site='')]) # 未带site标签时沿用之前的值
+    assert store.by_site('A栋') == {}
+    assert store.by_site('B栋')['10.0.0.1']['status'] == 'down'
+
+def test_recovery_records_outage_durations(redis_client):
+    store = DeviceStateStore(redis_client)
+    store.update([event('10.0.0.1', 'firing', 100), event('10.0.0.1', 'resolved', 160),
+                  event('10.0.0.2', 'firing', 100), event('10.0.0.2', 'resolved', 400)])
+    device, site, empty = OutageStats(redis_client).summaries(
+        [('device', '10.0.0.1'), ('site', 'A栋'), ('type', 'router')], 0, 1000)
+    assert device == {'outages': 1, 'downtime_seconds': 60.0, 'mttr_seconds': 60.0}
+    assert site == {'outages': 2, 'downtime_seconds': 360.0, 'mttr_seconds': 180.0}
+    assert empty['outages'] == 0 and empty['mttr_seconds'] is None
+
+def test_update_invalidates_cached_entries(redis_client):
+    cache = LocalCache('test', 100, 60)
+    store = DeviceStateStore(redis_client, cache)
+    assert store.get_many(['10.0.0.1']) == [None]
+    store.update([event('10.0.0.1', 'firing', 100)])
+    assert cache.get(f"{KEY_PREFIX}10.0.0.1") is None
+    assert store.get_many(['10.0.0.1'])[0]['status'] == 'down'
+
+def test_flapping_is_detected_and_summary_is_rate_limited(redis_client):
+    store = DeviceStateStore(redis_client)
+    settings = FlapSettings({'window': 3600, 'threshold': 4, 'summary_interval': 600})
+    now = time.time()
+    flapping = {}
+    for index, status in enumerate(['firing', 'resolved', 'firing', 'resolved']):
+        _, flapping = store.update([event('10.0.0.1', status, now - 100 + index)], settings)
+    assert flapping == {'10.0.0.1': ('up', True)}
+    _, flapping = store.update([event('10.0.0.1', 'firing', now)], settings)
+    assert flapping == {'10.0.0.1': ('down', False)}
+    # 不做抖动检测的更新(如降级数据重放)不返回抖动设备
+    assert store.update([event('10.0.0.1', 'resolved', now)])[1] == {}
+
+def test_flapping_devices_are_summarised_once(app_module):
+    app = app_module
+    flapping = {'10.0.0.1': ('down', True)}
+    alerts = [alert('a', ip='10.0.0.1'), alert('b', ip='10.0.0.1'), alert('c', ip='10.0.0.2'),
+              alert('d', ip='10.0.0.1', alertname='HighCpu')]
+    kept, summaries = app.suppress_flapping(alerts, flapping, 'dingtalk', app.state)
+    assert [item['fingerprint'] for item in kept] == ['c', 'd']
+    assert len(summaries) == 1 and is_flapping_summary(summaries[0])
+
+def test_status_query_by_ips(app_module, client):
+    client.post('/webhook/alertmanager', json={'alerts': [alert('a', instance='10.0.0.1:9100')]})
+    response = client.post('/status', json={'ips': ['10.0.0.1', '10.0.0.2']})
+    assert response.status_code == 200
+    devices = response.get_json()['devices']
+    assert devices['10.0.0.1']['status'] == 'down' and devices['10.0.0.2']['status'] == 'unknown'
+
+def test_status_rejects_malformed_ips(client):
+    for body in ({'ips': '10.0.0.1'}, {'ips': [1]}, {'ips': {'10.0.0.1': 1}}, ['10.0.0.1']):
+        response = client.post('/status', json=body)
+        assert response.status_code == 400 and response.get_json()['status'] == 'error'
+
+def test_device_ip_and_timestamp_parsing():
+    assert device_ip({'instance': 'http://10.0.0.5:9100/metrics'}) == '10.0.0.5'
+    assert device_ip({'ip': ' 10.0.0.6 ', 'instance': 'x'}) == '10.0.0.6'
+    assert device_ip({}) is None
+    assert parse_timestamp('2024-06-01T00:00:00.123456789Z') == parse_timestamp('2024-06-01T00:00:00.123456Z')
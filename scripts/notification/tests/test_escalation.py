@@ -0,0 +1,78 @@
+# scripts/notification/tests/test_escalation.py
+# 重复通知与升级：Lua调度脚本，以及恢复、维护窗口与抖动汇总对跟踪的影响
+import json
+import time
+
+from conftest import alert, configure
+from escalation import ALERTS_KEY, SCHEDULE_KEY, EscalationScheduler
+from routing import Destination, Escalation
+
+OPS = Destination('ops', 'dingtalk', 'https://example.invalid/ops')
+LEAD = Destination('lead', 'dingtalk', 'https://example.invalid/lead')
+POLICY = Escalation(renotify_interval=60, escalate_after=300, escalate_to=(LEAD,))
+
+ESCALATION_CONFIG = {
+    'destinations': {'ops': {'platform': 'dingtalk', 'url': OPS.url}, 'lead': {'platform': 'dingtalk', 'url': LEAD.url}},
+    'routes': [{'match': {'severity': 'critical'}, 'destinations': ['ops'],
+                'escalation': {'renotify_interval': 60, 'escalate_after': 300, 'escalate_to': ['lead']}}],
+}
+
+def scheduler(redis_client, notified, muted=None):
+    return EscalationScheduler(redis_client, lambda entry: (OPS, POLICY), notified.extend, muted=muted)
+
+def tracked(fingerprint):
+    return (OPS, POLICY, fingerprint, alert(fingerprint), 'dingtalk', '')
+
+def test_renotify_then_escalate_then_stop_on_resolution(redis_client):
+    notified = []
+    escalations = scheduler(redis_client, notified)
+    escalations.sync([tracked('a')], [])
+    escalations.sync([tracked('a')], []) # Alertmanager重发不会推迟计划
+    started = time.time()
+    assert escalations.run_once(started + 30) == 0
+    assert escalations.run_once(started + 61) == 1
+    assert [kind for _, _, _, kind in notified] == ['renotify']
+    notified.clear()
+    escalations.run_once(started + 301)
+    assert sorted(kind for _, _, _, kind in notified) == ['escalate', 'renotify']
+    removed = escalations.sync([], [(OPS, 'a')])
+    assert [entry['escalated'] for entry in removed] == [True]
+    assert len(escalations) == 0 and not redis_client.hlen(ALERTS_KEY)
+
+def test_claimed_entries_are_leased(redis_client):
+    notified = []
+    first, second = scheduler(redis_client, notified), scheduler(redis_client, notified)
+    first.sync([tracked('a')], [])
+    due = time.time() + 61
+    first._reschedule = lambda args: None # 模拟领取后崩溃：保留租约分数
+    assert first.run_once(due) == 1
+    assert second.run_once(due) == 0
+    assert second.run_once(due + first.lease) == 1
+
+def test_muted_entries_are_deferred_without_notifying(redis_client):
+    notified = []
+    escalations = scheduler(redis_client, notified, muted=lambda entry: True)
+    escalations.sync([tracked('a')], [])
+    now = time.time() + 400
+    assert escalations.run_once(now) == 1
+    assert notified == []
+    assert redis_client.zscore(SCHEDULE_KEY, 'ops|a') == now + escalations.lease
+    assert not json.loads(redis_client.hget(ALERTS_KEY, 'ops|a'))['escalated']
+
+def test_resolution_inside_maintenance_stops_tracking(app_module, client, redis_client):
+    app = app_module
+    configure(app, ESCALATION_CONFIG)
+    assert client.post('/webhook/dingtalk', json={'alerts': [alert('f1', ip='10.0.0.1')]}).status_code == 202
+    assert redis_client.zscore(SCHEDULE_KEY, 'ops|f1') is not None
+    app.maintenance.add({'ip': '10.0.0.1', 'start': time.time() - 60, 'end': time.time() + 3600})
+    response = client.post('/webhook/dingtalk', json={'alerts': [alert('f1', 'resolved', ip='10.0.0.1')]})
+    assert response.status_code == 200
+    assert redis_client.zscore(SCHEDULE_KEY, 'ops|f1') is None
+
+def test_flapping_summary_is_not_tracked(app_module, redis_client):
+    app = app_module
+    configure(app, ESCALATION_CONFIG)
+    summary = dict(alert('s'), labels={'alertname': 'DeviceFlapping', 'flapping': 'true', 'severity': 'critical'})
+    queued, errors = app.dispatch('dingtalk', {'alerts': [summary]})
+    assert queued and not errors
+    assert redis_client.zcard(SCHEDULE_KEY) == 0
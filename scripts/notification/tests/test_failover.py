@@ -0,0 +1,70 @@
+# scripts/notification/tests/test_failover.py
+# 故障转移链：主目的地失败或熔断时由下一跳送达，所有跳都失败时转入重试队列
+import pytest
+
+from conftest import alert, configure
+
+CONFIG = {
+    'destinations': {
+        'ops': {'platform': 'dingtalk', 'url': 'https://example.invalid/ops'},
+        'backup': {'platform': 'dingtalk', 'url': 'https://example.invalid/backup'},
+        'oncall': {'platform': 'wechat', 'url': 'https://example.invalid/oncall'},
+    },
+    'routes': [
+        {'match': {'severity': 'critical'}, 'destinations': ['ops'],
+         'failover': {'chain': ['backup', 'oncall'], 'deadline': 5}},
+    ],
+    'circuit_breaker': {'failure_threshold': 1, 'open_seconds': 60},
+}
+
+@pytest.fixture
+def failover_app(app_module, monkeypatch):
+    """按目的地名称决定发送结果；failing中的目的地返回HTTP 500"""
+    app = app_module
+    configure(app, CONFIG)
+    app.failing = set()
+    app.attempted = []
+
+    def send_platform_message(destination, title, message):
+        app.attempted.append(destination.name)
+        if destination.name in app.failing:
+            return False, "HTTP 500"
+        app.sent_messages.append((destination.name, title, message))
+        return True, "Sent"
+
+    monkeypatch.setattr(app, 'send_platform_message', send_platform_message)
+    return app
+
+def deliver(app, *alerts):
+    return app.deliver('dingtalk', {'alerts': list(alerts)}, current=app.state, lane='critical')
+
+def test_primary_delivers_without_failover(failover_app):
+    app = failover_app
+    assert deliver(app, alert('a')) == (True, "Sent")
+    assert app.attempted == ['ops']
+
+def test_failing_primary_falls_over_to_next_hop(failover_app):
+    app = failover_app
+    app.failing.add('ops')
+    assert deliver(app, alert('a')) == (True, "Sent")
+    assert [name for name, _, _ in app.sent_messages] == ['backup']
+    assert app.attempted == ['ops', 'backup']
+    assert len(app.retry_queue) == 0
+
+def test_open_breaker_is_skipped(failover_app):
+    app = failover_app
+    ops = app.state.routing.destinations['ops']
+    app.breakers.get(ops).record(False, 0)
+    assert deliver(app, alert('a')) == (True, "Sent")
+    assert [name for name, _, _ in app.sent_messages] == ['backup']
+    # 熔断期间不再调用主目的地的接口
+    assert app.attempted == ['backup']
+
+def test_all_hops_failing_queues_for_retry(failover_app):
+    app = failover_app
+    app.failing.update(['ops', 'backup', 'oncall'])
+    success, message = deliver(app, alert('a'))
+    assert success and message == "Queued for retry: ops"
+    assert app.attempted == ['ops', 'backup', 'oncall']
+    (_, _, job), = app.retry_queue._heap
+    assert job.destination.name == 'ops' and job.lane == 'critical'
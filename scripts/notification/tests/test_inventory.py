@@ -0,0 +1,67 @@
+# scripts/notification/tests/test_inventory.py
+import os
+from pathlib import Path
+
+import pytest
+import yaml
+
+from inventory import DeviceInventory, normalize_ip
+
+DEVICES = [
+    {'ip': '10.0.0.1', 'name': 'NVR-1', 'type': 'nvr', 'site': 'A栋'},
+    {'ip': '10.0.0.21', 'name': 'CAM-21', 'type': 'camera', 'site': 'A栋', 'location': '大门', 'upstream': 'NVR-1'},
+]
+
+def write(path, devices, mtime):
+    Path(path).write_text(yaml.safe_dump(devices, allow_unicode=True), encoding='utf-8')
+    # 同一秒内的两次写入可能得到相同的mtime，显式设置
+    os.utime(path, ns=(mtime, mtime))
+
+@pytest.fixture
+def inventory(tmp_path):
+    path = tmp_path / 'devices.yml'
+    write(path, DEVICES, 1_000_000_000)
+    inventory = DeviceInventory(str(path))
+    assert inventory.reload()
+    return inventory
+
+@pytest.mark.parametrize('value, expected', [
+    ('10.0.0.21', '10.0.0.21'),
+    ('10.0.0.21:9100', '10.0.0.21'),
+    ('http://10.0.0.21:80/probe', '10.0.0.21'),
+    ('https://10.0.0.21', '10.0.0.21'),
+    ('[2001:db8:0::1]:9100', '2001:db8::1'),
+    ('Camera-21.Local:80', 'camera-21.local'),
+    ('', None),
+])
+def test_normalize_ip(value, expected):
+    assert normalize_ip(value) == expected
+
+def test_enrich_adds_labels_without_overwriting(inventory):
+    alerts = [{'labels': {'instance': 'http://10.0.0.21:80/probe', 'site': 'B栋'}},
+              {'labels': {'instance': '10.9.9.9:9100'}}]
+    camera, unknown = inventory.enrich(alerts)
+    assert camera['labels'] == {'instance': 'http://10.0.0.21:80/probe', 'site': 'B栋', 'device_name': 'CAM-21',
+                                'type': 'camera', 'location': '大门', 'upstream': 'NVR-1 (10.0.0.1)'}
+    assert unknown is alerts[1]
+    # 原告警不被修改
+    assert alerts[0]['labels'] == {'instance': 'http://10.0.0.21:80/probe', 'site': 'B栋'}
+
+def test_reload_picks_up_file_changes(inventory):
+    assert not inventory.reload()
+    camera = inventory.lookup({'instance': '10.0.0.21:9100'})
+    moved = [dict(DEVICES[0], ip='10.0.0.2'), DEVICES[1], {'ip': '10.0.0.22', 'name': 'CAM-22'}]
+    write(inventory.path, moved, 2_000_000_000)
+    assert inventory.reload()
+    assert len(inventory) == 3
+    assert inventory.lookup({'instance': '10.0.0.1'}) is None
+    # 未变化的条目被复用，上游设备变化时重新生成标签
+    assert inventory.lookup({'instance': '10.0.0.21'}) is camera
+    assert camera.labels['upstream'] == 'NVR-1 (10.0.0.2)'
+    assert inventory.lookup({'ip': '10.0.0.22'}).labels == {'device_name': 'CAM-22'}
+
+def test_broken_file_keeps_previous_copy(inventory):
+    Path(inventory.path).write_text('devices: [', encoding='utf-8')
+    os.utime(inventory.path, ns=(3_000_000_000, 3_000_000_000))
+    assert not inventory.reload()
+    assert len(inventory) == 2
@@ -0,0 +1,99 @@
+# scripts/notification/tests/test_lanes.py
+import threading
+import time
+
+import pytest
+
+from conftest import DINGTALK_URL, alert, configure
+from lanes import LaneScheduler, LaneSettings
+
+def test_alerts_are_assigned_by_severity():
+    settings = LaneSettings()
+    assert settings.lane_for({'labels': {'severity': 'CRITICAL'}}) == 'critical'
+    assert settings.lane_for({'labels': {'severity': 'info'}}) == 'default'
+    assert settings.lane_for({}) == 'default'
+
+@pytest.mark.parametrize('config', [
+    {'scheduling': 'fifo'},
+    {'lanes': [{'name': 'a'}, {'name': 'a'}]},
+    {'lanes': [{'name': 'a', 'workers': 0}], 'shared_workers': 0},
+])
+def test_invalid_lane_config_is_rejected(config):
+    with pytest.raises(ValueError):
+        LaneSettings(config)
+
+def drain_order(scheduling, backlog):
+    """只有一个共享worker时各lane任务的执行顺序"""
+    settings = LaneSettings({'scheduling': scheduling, 'shared_workers': 1, 'lanes': [
+        {'name': 'critical', 'severities': ['critical'], 'workers': 0, 'weight': 3},
+        {'name': 'warning', 'severities': ['warning'], 'workers': 0, 'weight': 1},
+    ]})
+    scheduler = LaneScheduler(settings)
+    order = []
+    scheduler._running = True # 先积压任务，再启动worker
+    for name, count in backlog.items():
+        for _ in range(count):
+            assert scheduler.submit(name, order.append, name)
+    scheduler.start()
+    scheduler.stop()
+    return order
+
+def test_strict_scheduling_drains_higher_priority_first():
+    assert drain_order('strict', {'warning': 2, 'critical': 2}) == ['critical'] * 2 + ['warning'] * 2
+
+def test_weighted_scheduling_shares_capacity():
+    order = drain_order('weighted', {'critical': 6, 'warning': 6})
+    assert order[:4].count('warning') == 1
+    assert sorted(order) == ['critical'] * 6 + ['warning'] * 6
+
+def test_full_or_stopped_lane_rejects_work():
+    scheduler = LaneScheduler(LaneSettings({'lanes': [{'name': 'only', 'workers': 0, 'max_queue': 1}],
+                                            'shared_workers': 1}))
+    assert not scheduler.submit('only', print) # 未启动
+    scheduler._running = True
+    assert scheduler.submit('only', print)
+    assert not scheduler.submit('only', print)
+
+def test_stop_runs_queued_tasks():
+    scheduler = LaneScheduler(LaneSettings())
+    scheduler.start()
+    done = threading.Event()
+    assert scheduler.submit('warning', done.set)
+    scheduler.stop()
+    assert done.is_set()
+    assert not scheduler.submit('warning', done.set)
+
+def test_critical_send_is_not_blocked_by_saturated_default_lane(app_module, monkeypatch):
+    """default lane的多分片消息占满其发送线程时，critical的分片仍在自己的线程池中立即发送"""
+    app = app_module
+    configure(app, {'dingtalk_webhook': DINGTALK_URL, 'message_limits': {'dingtalk': 300},
+                    'lanes': {'shared_workers': 0, 'lanes': [
+                        {'name': 'critical', 'severities': ['critical'], 'workers': 1},
+                        {'name': 'default', 'workers': 8}]}})
+    release, critical_sent = threading.Event(), threading.Event()
+    blocked = []
+
+    def send_platform_message(destination, title, message):
+        if 'CRITICAL' in message:
+            critical_sent.set()
+        else:
+            blocked.append(title)
+            release.wait(10)
+        return True, "Sent"
+
+    monkeypatch.setattr(app, 'send_platform_message', send_platform_message)
+    monkeypatch.setattr(app.lanes, 'send_threads', 2)
+    app.lanes.start()
+    try:
+        for index in range(16):
+            app.dispatch('dingtalk', {'alerts': [alert(f"w{index}a", severity='info'),
+                                                 alert(f"w{index}b", severity='info')]})
+        deadline = time.monotonic() + 5
+        while len(blocked) < 16 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(blocked) == 16 # default lane的发送线程已全部阻塞
+        app.dispatch('dingtalk', {'alerts': [alert('c1'), alert('c2')]})
+        assert critical_sent.wait(5)
+    finally:
+        release.set()
+        app.lanes.stop()
@@ -0,0 +1,52 @@
+# scripts/notification/tests/test_maintenance.py
+import time
+from datetime import datetime
+
+import pytest
+
+from maintenance import MaintenanceIndex, MaintenanceWindow
+
+def window(spec, window_id='w'):
+    return MaintenanceWindow(spec, 'config', window_id)
+
+def test_scope_requires_all_listed_dimensions():
+    item = window({'cidr': '10.1.0.0/16', 'type': ['ip_camera', 'nvr'], 'start': 0, 'end': 10})
+    assert item.matches('10.1.2.3', {'type': 'nvr'})
+    assert not item.matches('10.1.2.3', {'type': 'router'})
+    assert not item.matches('10.2.0.1', {'type': 'nvr'})
+    assert not item.matches(None, {'type': 'nvr'})
+
+def test_weekly_schedule_crossing_midnight():
+    item = window({'site': 'A栋', 'schedule': {'weekdays': ['tue'], 'start': '22:00', 'end': '06:00'}})
+    tuesday = datetime(2024, 6, 4, 23, 0).timestamp()
+    wednesday = datetime(2024, 6, 5, 5, 0).timestamp()
+    later = datetime(2024, 6, 5, 7, 0).timestamp()
+    index = MaintenanceIndex((item,), tuesday - 86400, 2 * 86400)
+    labels = {'site': 'A栋'}
+    assert index.match(labels, tuesday) is item
+    assert index.match(labels, wednesday) is item
+    assert index.match(labels, later) is None
+    assert index.match({'site': 'B栋'}, tuesday) is None
+
+@pytest.mark.parametrize('spec', [
+    {'start': 0, 'end': 10},
+    {'ip': '10.0.0.1'},
+    {'ip': '10.0.0.1', 'start': 10, 'end': 5},
+    {'cidr': 'not-a-network', 'start': 0, 'end': 10},
+    {'ip': '10.0.0.1', 'schedule': {'start': '25:00', 'end': '06:00'}},
+])
+def test_invalid_windows_are_rejected(spec):
+    with pytest.raises(ValueError):
+        window(spec)
+
+def test_api_windows_mute_alerts_and_can_be_deleted(app_module, client):
+    now = time.time()
+    response = client.post('/maintenance', json={'name': 'swap', 'ip': '10.0.0.1', 'start': now - 60, 'end': now + 600})
+    assert response.status_code == 201
+    window_id = response.get_json()['window']['id']
+    assert client.get('/maintenance?ip=10.0.0.1').get_json()['count'] == 1
+    assert app_module.suppress_maintenance([{'labels': {'ip': '10.0.0.1'}}, {'labels': {'ip': '10.0.0.2'}}],
+                                           'dingtalk') == [{'labels': {'ip': '10.0.0.2'}}]
+    assert client.delete(f'/maintenance/{window_id}').status_code == 200
+    assert client.delete(f'/maintenance/{window_id}').status_code == 404
+    assert client.post('/maintenance', json={'ip': '10.0.0.1', 'start': now - 600, 'end': now - 60}).status_code == 400
@@ -0,0 +1,44 @@
+# scripts/notification/tests/test_metrics.py
+# 测试中未设置PROMETHEUS_MULTIPROC_DIR，指标在默认registry中(多进程模式见test_preload.py)
+import time
+
+from prometheus_client import REGISTRY
+
+import metrics
+from conftest import alert
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_metrics_endpoint_exposes_ingest_latency(client):
+    before = sample('notification_ingest_seconds_count', platform='dingtalk')
+    client.post('/webhook/dingtalk', json={'alerts': [alert('a')]})
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    assert b'notification_ingest_seconds_bucket{le="0.005",platform="dingtalk"}' in response.data
+    assert sample('notification_ingest_seconds_count', platform='dingtalk') == before + 1
+    assert sample('notification_queue_depth', queue='webhook') == 0
+
+def test_unknown_platforms_share_one_label(client):
+    before = sample('notification_ingest_seconds_count', platform='unknown')
+    client.post('/webhook/sms-1', json={'alerts': []})
+    client.post('/webhook/sms-2', json={'alerts': []})
+    assert sample('notification_ingest_seconds_count', platform='unknown') == before + 2
+    assert sample('notification_ingest_seconds_count', platform='sms-1') == 0
+
+def test_deduplicated_alerts_are_counted(client):
+    before = sample('notification_alerts_deduplicated_total', platform='dingtalk')
+    client.post('/webhook/dingtalk', json={'alerts': [alert('a')]})
+    client.post('/webhook/dingtalk', json={'alerts': [alert('a'), alert('b')], 'groupKey': 'other'})
+    assert sample('notification_alerts_deduplicated_total', platform='dingtalk') == before + 1
+
+def test_observe_delivery_counts_results_and_vendor_codes():
+    sent = sample('notification_messages_sent_total', platform='feishu')
+    failed = sample('notification_messages_failed_total', platform='feishu')
+    errors = sample('notification_vendor_errors_total', platform='feishu', code='19024')
+    metrics.observe_delivery('feishu', time.perf_counter(), True)
+    metrics.observe_delivery('feishu', time.perf_counter(), False, 19024)
+    assert sample('notification_messages_sent_total', platform='feishu') == sent + 1
+    assert sample('notification_messages_failed_total', platform='feishu') == failed + 1
+    assert sample('notification_vendor_errors_total', platform='feishu', code='19024') == errors + 1
@@ -0,0 +1,45 @@
+# scripts/notification/tests/test_preload.py
+# 模拟gunicorn preload：先执行gunicorn.conf.py，再在同一进程中导入app(此时on_starting尚未执行)，
+# PROMETHEUS_MULTIPROC_DIR指向一个还不存在的目录
+import os
+import subprocess
+import sys
+
+from conftest import NOTIFICATION_DIR
+
+PRELOAD_SCRIPT = """
+import runpy
+
+import fakeredis
+
+runpy.run_path('gunicorn.conf.py')
+
+import redis_factory
+
+server = fakeredis.FakeServer()
+redis_factory.create_redis_client = (
+    lambda db=None, decode_responses=True: fakeredis.FakeRedis(server=server, decode_responses=decode_responses))
+
+import app
+
+client = app.app.test_client()
+assert client.get('/health').status_code == 200
+assert client.post('/webhook/dingtalk', json={'alerts': []}).status_code == 500
+metrics = client.get('/metrics').get_data(as_text=True)
+assert 'notification_redis_degraded' in metrics, metrics
+assert 'notification_ingest_seconds_count{platform="dingtalk"} 1.0' in metrics, metrics
+"""
+
+def test_app_imports_under_preload_with_fresh_multiproc_dir(tmp_path):
+    env = dict(os.environ,
+               PROMETHEUS_MULTIPROC_DIR=str(tmp_path / 'metrics'),
+               CONFIG_FILE_PATH=str(tmp_path / 'missing_config.yml'),
+               DEVICE_INVENTORY_FILE=str(tmp_path / 'missing_devices.yml'),
+               CONFIG_RELOAD_INTERVAL='0',
+               AUDIT_LOG_PATH='')
+    for name in ('DINGTALK_WEBHOOK', 'WECHAT_WEBHOOK', 'FEISHU_WEBHOOK'):
+        env.pop(name, None)
+    result = subprocess.run([sys.executable, '-c', PRELOAD_SCRIPT], cwd=NOTIFICATION_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert os.listdir(tmp_path / 'metrics')
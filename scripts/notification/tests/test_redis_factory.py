@@ -0,0 +1,29 @@
+# scripts/notification/tests/test_redis_factory.py
+import pytest
+
+from conftest import create_real_redis_client
+from fallback_store import UNAVAILABLE_ERRORS
+from redis_factory import PoolExhaustedError
+
+def test_pool_checkout_timeout_is_not_unavailability(monkeypatch):
+    monkeypatch.setenv('REDIS_HOST', '127.0.0.1')
+    monkeypatch.setenv('REDIS_MAX_CONNECTIONS', '1')
+    monkeypatch.setenv('REDIS_POOL_TIMEOUT', '0.01')
+    client = create_real_redis_client()
+    # 占用唯一的连接槽位，不需要真正连上Redis
+    client.connection_pool.pool.get_nowait()
+    with pytest.raises(PoolExhaustedError) as raised:
+        client.get('key')
+    assert not isinstance(raised.value, UNAVAILABLE_ERRORS)
+
+def test_exhausted_pool_does_not_enter_degraded_mode(app_module, redis_client, monkeypatch):
+    app = app_module
+
+    def exhausted(*args, **kwargs):
+        raise PoolExhaustedError("No connection available in the Redis pool")
+
+    monkeypatch.setattr(type(redis_client), 'set', exhausted)
+    assert app.claim_payload('ingest:test', app.state)
+    assert not app.redis_health.degraded
+    # 本次改用进程内标记
+    assert not app.claim_payload('ingest:test', app.state)
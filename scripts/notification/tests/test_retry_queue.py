@@ -0,0 +1,61 @@
+# scripts/notification/tests/test_retry_queue.py
+import time
+
+from retry_queue import RetryJob, RetryQueue, RetrySettings
+from routing import Destination
+
+OPS = Destination('ops', 'dingtalk', 'https://example.invalid/ops')
+
+def job(message, attempt=0):
+    return RetryJob(OPS, 'title', message, attempt)
+
+def test_put_respects_attempt_and_queue_limits():
+    queue = RetryQueue(lambda item: True, RetrySettings({'max_attempts': 2, 'max_queue': 1}))
+    assert not queue.put(job('a', attempt=2))
+    assert queue.put(job('a'))
+    assert not queue.put(job('b'))
+    assert len(queue) == 1
+
+def test_failed_attempt_is_requeued_with_backoff():
+    attempts = []
+    queue = RetryQueue(lambda item: attempts.append(item.attempt) or False, RetrySettings({'base_delay': 100}))
+    queue.attempt(job('a'))
+    assert attempts == [1] and len(queue) == 1
+    assert queue._heap[0][2].attempt == 1
+
+def test_stop_attempts_jobs_enqueued_while_stopping():
+    sent = []
+    queue = RetryQueue(lambda item: sent.append(item.message) or True, RetrySettings({'base_delay': 100}))
+    queue.start()
+    queue.put(job('queued'))
+    join = queue._thread.join
+
+    def put_while_joining(timeout):
+        queue.put(job('late'))
+        join(timeout)
+
+    queue._thread.join = put_while_joining
+    queue.stop(timeout=1)
+    assert sorted(sent) == ['late', 'queued']
+    assert len(queue) == 0
+    assert queue.put(job('after')) and sent[-1] == 'after'
+
+def test_due_jobs_are_handed_to_their_lane():
+    handed, sent = [], []
+
+    def submit(item):
+        if item.lane != 'critical':
+            return False
+        handed.append(item)
+        return True
+
+    queue = RetryQueue(lambda item: sent.append(item.message) or True, RetrySettings({'base_delay': 0}), submit)
+    queue.start()
+    queue.put(RetryJob(OPS, 'title', 'critical', lane='critical'))
+    queue.put(RetryJob(OPS, 'title', 'other'))
+    deadline = time.monotonic() + 5
+    while not (handed and sent) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    queue.stop(timeout=1)
+    assert [item.message for item in handed] == ['critical']
+    assert sent == ['other']
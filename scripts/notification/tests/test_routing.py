@@ -0,0 +1,58 @@
+# scripts/notification/tests/test_routing.py
+import pytest
+
+from routing import RoutingTable
+
+CONFIG = {
+    'destinations': {
+        'ops': {'platform': 'dingtalk', 'url': 'https://example.invalid/ops'},
+        'site-a': {'platform': 'dingtalk', 'url': 'https://example.invalid/site-a'},
+        'oncall': {'platform': 'wechat', 'url': 'https://example.invalid/oncall'},
+        'lead': {'platform': 'dingtalk', 'url': 'https://example.invalid/lead'},
+    },
+    'routes': [
+        {'match': {'site': 'A栋'}, 'destinations': ['site-a']},
+        {'match': {'severity': ['critical']}, 'destinations': ['ops', 'oncall'],
+         'escalation': {'renotify_interval': 600, 'escalate_after': 1800, 'escalate_to': ['lead']}},
+    ],
+    'default_destinations': ['ops'],
+}
+
+def names(targets):
+    return sorted(destination.name for destination, _, _ in targets)
+
+def test_rules_match_on_all_labels_and_merge_destinations():
+    table = RoutingTable(CONFIG)
+    assert names(table.route('dingtalk', {'site': 'A栋', 'severity': 'critical'})) == ['ops', 'site-a']
+    assert names(table.route('dingtalk', {'site': 'A栋', 'severity': 'warning'})) == ['site-a']
+    assert names(table.route('wechat', {'severity': 'critical'})) == ['oncall']
+
+def test_unmatched_alerts_use_default_then_fallback_webhook():
+    table = RoutingTable(CONFIG, fallback_urls={'feishu': 'https://example.invalid/feishu'})
+    assert names(table.route('dingtalk', {'severity': 'info'})) == ['ops']
+    assert names(table.route('feishu', {'severity': 'info'})) == ['feishu']
+    assert table.route('wechat', {'severity': 'info'}) == ()
+    assert table.route('sms', {}) == ()
+
+def test_escalation_policy_is_attached_to_matching_rule():
+    table = RoutingTable(CONFIG)
+    (_, _, escalation), = [t for t in table.route('dingtalk', {'severity': 'critical'}) if t[0].name == 'ops']
+    assert escalation.first_due() == 600
+    assert [d.name for d in escalation.escalate_to] == ['lead']
+
+def test_group_alerts_keeps_order_and_routes_common_labels_without_alerts():
+    table = RoutingTable(CONFIG)
+    alerts = [{'labels': {'site': 'A栋', 'n': str(i)}} for i in range(3)]
+    groups = table.group_alerts('dingtalk', alerts)
+    assert [[a['labels']['n'] for a in group] for group in groups.values()] == [['0', '1', '2']]
+    assert names(table.group_alerts('dingtalk', [], {'severity': 'critical'})) == ['ops']
+
+@pytest.mark.parametrize('config, message', [
+    ({'destinations': {'x': {'platform': 'sms', 'url': 'u'}}}, 'unsupported platform'),
+    ({'routes': [{'destinations': ['missing']}]}, 'Unknown destination'),
+    ({'destinations': {'x': {'platform': 'dingtalk', 'url': 'u'}},
+      'routes': [{'destinations': ['x'], 'escalation': {'escalate_after': 60}}]}, 'no escalate_to'),
+])
+def test_invalid_config_is_rejected(config, message):
+    with pytest.raises(ValueError, match=message):
+        RoutingTable(config)
@@ -0,0 +1,51 @@
+# scripts/notification/tests/test_templates.py
+import pytest
+
+from message_templates import PART_HEADER_RESERVE, TITLE_PREFIX, TemplateSet
+
+def payload(count, summary='设备离线', **labels):
+    labels.setdefault('alertname', 'DeviceDown')
+    labels.setdefault('instance', '10.0.0.1')
+    labels.setdefault('severity', 'critical')
+    return {'status': 'firing', 'externalURL': 'http://grafana.example/alerts',
+            'alerts': [{'status': 'firing', 'labels': dict(labels), 'startsAt': '2024-06-01T08:00:00.123Z',
+                        'annotations': {'summary': f"{summary} {index}"}} for index in range(count)]}
+
+def test_default_template_renders_fields_and_skips_empty_optional_lines():
+    title, message = TemplateSet().render(payload(1, location='3F'), 'dingtalk')
+    assert title == TITLE_PREFIX
+    assert message.startswith("#### [FIRING] DeviceDown - 10.0.0.1\n")
+    assert "- **级别**: CRITICAL" in message
+    assert "- **位置**: 3F" in message
+    assert "设备**" not in message # 没有device_name标签时可选行不输出
+    assert "- **开始时间**: 2024-06-01 08:00:00" in message
+    assert "explore?orgId=1" in message
+
+def test_alertname_template_overrides_platform_default():
+    templates = TemplateSet({'dingtalk': {'DeviceDown': "{labels[site]}|{summary}"}})
+    _, message = templates.render(payload(1, site='A栋'), 'zabbix')
+    assert message == "A栋|设备离线 0"
+
+def test_large_payload_is_split_on_alert_boundaries():
+    templates = TemplateSet(limits={'wechat': 1000})
+    _, chunks = templates.render_chunks(payload(40), 'wechat')
+    assert len(chunks) > 1
+    assert all(len(chunk.encode('utf-8')) <= 1000 for chunk in chunks)
+    assert chunks[0].startswith(f"**(第1/{len(chunks)}部分)**")
+    assert sum(chunk.count("摘要: 设备离线") for chunk in chunks) == 40
+
+def test_oversized_single_alert_is_truncated():
+    templates = TemplateSet(limits={'dingtalk': PART_HEADER_RESERVE + 200})
+    _, chunks = templates.render_chunks(payload(1, summary='长' * 500), 'dingtalk')
+    assert len(chunks) == 1
+    assert chunks[0].endswith("已截断)")
+
+def test_resolved_group_without_alerts_gets_fallback_message():
+    _, chunks = TemplateSet().render_chunks(
+        {'status': 'resolved', 'alerts': [], 'commonLabels': {'alertname': 'DeviceDown'}}, 'dingtalk')
+    assert chunks and "已恢复" in chunks[0]
+
+@pytest.mark.parametrize('source', ["{unknown}", "{summary!r}", "{summary:>10}"])
+def test_invalid_template_is_rejected(source):
+    with pytest.raises(ValueError):
+        TemplateSet({'dingtalk': {'default': source}})
@@ -0,0 +1,95 @@
+# scripts/notification/tests/test_webhooks.py
+# Webhook端点：路由检查、payload幂等、投递失败时的回滚、增量通知与Zabbix事件校验
+import pytest
+
+from conftest import DINGTALK_URL, alert, configure
+
+@pytest.fixture
+def failing_delivery(app_module, monkeypatch):
+    """厂商接口失败且重试队列无法接收"""
+    configure(app_module, {'dingtalk_webhook': DINGTALK_URL, 'retry': {'max_queue': 0}})
+    monkeypatch.setattr(app_module, 'send_platform_message', lambda destination, title, message: (False, "HTTP 500"))
+
+def am_payload(*alerts, group='{}:{alertname="DeviceDown"}'):
+    return {'groupKey': group, 'status': 'firing', 'alerts': list(alerts)}
+
+def test_delivery_is_accepted_and_sent(app_module, client):
+    response = client.post('/webhook/dingtalk', json={'alerts': [alert('a')]})
+    assert response.status_code == 202
+    assert response.get_json()['lanes'] == {'critical': 1}
+    assert [name for name, _, _ in app_module.sent_messages] == ['dingtalk']
+
+def test_unconfigured_platform_returns_500(app_module, client):
+    configure(app_module, {})
+    response = client.post('/webhook/dingtalk', json={'alerts': [alert('a')]})
+    assert response.status_code == 500
+    assert response.get_json()['message'] == 'Unknown platform or not configured'
+    assert client.post('/webhook/alertmanager', json=am_payload(alert('a'))).status_code == 500
+    assert client.post('/webhook/sms', json={'alerts': [alert('a')]}).status_code == 400
+
+def test_duplicate_payload_is_acknowledged(app_module, client, redis_client):
+    body = am_payload(alert('a'))
+    first = client.post('/webhook/alertmanager', json=body)
+    assert first.get_json()['queued'] == 1
+    second = client.post('/webhook/alertmanager', json=body)
+    assert second.status_code == 200 and second.get_json()['duplicate']
+    assert len(app_module.sent_messages) == 1
+    (key,) = redis_client.keys('ingest:alertmanager:*')
+    assert 0 < redis_client.ttl(key) <= app_module.state.payload_dedup_window
+
+def test_payload_claim_is_one_round_trip(app_module, client, redis_client, monkeypatch):
+    commands = []
+    execute = type(redis_client).execute_command
+    def recording(self, *args, **options):
+        commands.append(args[0])
+        return execute(self, *args, **options)
+    monkeypatch.setattr(type(redis_client), 'execute_command', recording)
+    assert app_module.claim_payload('ingest:test', app_module.state)
+    assert not app_module.claim_payload('ingest:test', app_module.state)
+    assert commands == ['SET', 'SET']
+
+def test_failed_delivery_rolls_back_admission_state(app_module, client, redis_client, failing_delivery):
+    body = am_payload(alert('a'))
+    response = client.post('/webhook/alertmanager', json=body)
+    assert response.status_code == 500
+    # 去重标记、payload标记与告警组状态都已撤销，Alertmanager重试时重新投递
+    assert redis_client.keys('alert:*') == []
+    assert redis_client.keys('ingest:*') == []
+    assert redis_client.keys('delta:*') == []
+
+def test_lane_failure_releases_dedup_markers(app_module, redis_client, failing_delivery):
+    app = app_module
+    key = f"alert:dingtalk:{app.alert_fingerprint(alert('a'))}"
+    redis_client.set(key, 'x')
+    app.deliver_logged('dingtalk', {'alerts': [alert('a')]}, '', app.state,
+                       app.admission_rollback('alert:dingtalk', None, app.state))
+    assert not redis_client.exists(key)
+
+def test_group_resend_only_delivers_changes(app_module, client):
+    app = app_module
+    client.post('/webhook/alertmanager', json=am_payload(alert('a'), alert('b')))
+    app.dedup_cache.clear()
+    app.redis_client.delete(*app.redis_client.keys('alert:*'))
+    response = client.post('/webhook/alertmanager', json=am_payload(alert('a'), alert('b'), alert('c')))
+    assert response.get_json()['unchanged'] == 2
+    message = app.sent_messages[-1][2]
+    assert "c firing" in message and "a firing" not in message
+    assert "另有 2 条告警仍在持续" in message
+
+def test_zabbix_events_are_validated(app_module, client):
+    assert client.post('/webhook/zabbix', data='null', content_type='application/json').status_code == 400
+    assert client.post('/webhook/zabbix', json={'events': 'x'}).status_code == 400
+    assert client.post('/webhook/zabbix', json={'events': [1]}).status_code == 400
+    response = client.post('/webhook/zabbix', json={'host': 'sw1'})
+    assert response.status_code == 400 and response.get_json()['status'] == 'error'
+
+def test_zabbix_events_are_batched(app_module, client, monkeypatch):
+    batches = []
+    monkeypatch.setattr(app_module.zabbix_batcher, 'add', batches.append)
+    response = client.post('/webhook/zabbix', json={'events': [
+        {'event_id': '1', 'host': 'sw1', 'severity': 'High', 'trigger_name': 'Down'},
+        {'event_id': '1', 'event_value': '0', 'host': 'sw1'},
+    ]})
+    assert response.status_code == 202 and response.get_json()['events'] == 2
+    assert [item['status'] for item in batches[0]] == ['firing', 'resolved']
+    assert batches[0][0]['labels']['severity'] == 'critical'
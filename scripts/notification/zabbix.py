@@ -0,0 +1,208 @@
+# scripts/notification/zabbix.py
+# Zabbix webhook媒介类型的原生事件接入
+#
+# Zabbix动作通过webhook媒介类型逐个事件推送，字段由媒介类型的参数决定。这里按常用的参数名
+# (event_id、host、host_ip、severity、event_value、trigger_name、event_tags等，兼容 {EVENT.ID} 一类宏名)
+# 解析事件，转换为与Alertmanager相同的告警结构，之后的设备状态、去重、路由与模板渲染完全复用。
+# 触发器风暴时Zabbix会在短时间内推送大量事件，ZabbixBatcher把 window 秒内到达的事件合并为一组发送，
+# 厂商接口的调用次数由"每个事件一次"降为"每个窗口每个目的地一次"。
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+
+import metrics
+
+# Zabbix严重级别(名称或0~5的数值) -> 告警的severity标签
+SEVERITY_MAP = {
+    'not classified': 'info', 'information': 'info', 'warning': 'warning',
+    'average': 'warning', 'high': 'critical', 'disaster': 'critical',
+    '0': 'info', '1': 'info', '2': 'warning', '3': 'warning', '4': 'critical', '5': 'critical',
+}
+
+# 每个字段可接受的参数名，按优先级排列
+FIELD_NAMES = {
+    'event_id': ('event_id', 'eventid', 'EVENT.ID'),
+    'event_name': ('event_name', 'EVENT.NAME', 'subject', 'alert_subject'),
+    'trigger_name': ('trigger_name', 'TRIGGER.NAME'),
+    'host': ('host', 'host_name', 'hostname', 'HOST.NAME', 'HOST.HOST'),
+    'host_ip': ('host_ip', 'ip', 'HOST.IP'),
+    'severity': ('severity', 'event_severity', 'EVENT.SEVERITY', 'event_nseverity', 'EVENT.NSEVERITY'),
+    'value': ('event_value', 'EVENT.VALUE', 'value'),
+    'recovery': ('recovery', 'event_recovery', 'is_recovery'),
+    'recovery_id': ('event_recovery_id', 'EVENT.RECOVERY.ID'),
+    'message': ('message', 'alert_message', 'event_message'),
+    'date': ('event_date', 'EVENT.DATE'),
+    'time': ('event_time', 'EVENT.TIME'),
+    'recovery_date': ('event_recovery_date', 'EVENT.RECOVERY.DATE'),
+    'recovery_time': ('event_recovery_time', 'EVENT.RECOVERY.TIME'),
+    'tags': ('event_tags', 'EVENT.TAGS', 'tags'),
+    'url': ('event_url', 'zabbix_url', 'url'),
+}
+
+# 未被替换的宏(如 "{EVENT.RECOVERY.ID}")视为空值
+_UNRESOLVED_MACRO = re.compile(r'^\{[A-Z0-9_.]+\}$')
+_LABEL_NAME = re.compile(r'[^a-zA-Z0-9_]')
+
+def _field(event, name):
+    for key in FIELD_NAMES[name]:
+        value = event.get(key)
+        if value is None:
+            value = event.get(f"{{{key}}}")
+        if value is None or value == '':
+            continue
+        value = str(value).strip()
+        if value and not _UNRESOLVED_MACRO.match(value):
+            return value
+    return ''
+
+def _timestamp(date, clock):
+    """Zabbix的 "2024.05.01" + "12:00:00"(服务器本地时间) -> RFC3339；无法解析时为空"""
+    if not date:
+        return ''
+    try:
+        parsed = datetime.strptime(f"{date.replace('-', '.')} {clock or '00:00:00'}", '%Y.%m.%d %H:%M:%S')
+    except ValueError:
+        return ''
+    return parsed.astimezone().isoformat()
+
+def _tags(value):
+    """event_tags可以是 [{"tag":..,"value":..}]、{"tag": "value"} 或 "tag:value,tag2:value2" """
+    if isinstance(value, list):
+        return {str(item.get('tag', '')): str(item.get('value', '')) for item in value if isinstance(item, dict)}
+    if isinstance(value, dict):
+        return {str(k): str(v) for k, v in value.items()}
+    tags = {}
+    for part in str(value or '').split(','):
+        tag, _, tag_value = part.partition(':')
+        if tag.strip():
+            tags[tag.strip()] = tag_value.strip()
+    return tags
+
+def is_native_event(payload):
+    """Alertmanager转发的payload带alerts数组；其余视为Zabbix媒介类型直接推送的事件"""
+    return isinstance(payload, dict) and 'alerts' not in payload
+
+def normalize_event(event):
+    """把一个Zabbix事件转换为Alertmanager格式的告警；缺少事件ID时返回None"""
+    event_id = _field(event, 'event_id')
+    if not event_id:
+        return None
+    recovery = (_field(event, 'value') == '0' or bool(_field(event, 'recovery_id'))
+                or _field(event, 'recovery').lower() in ('1', 'true', 'yes'))
+    raw_severity = _field(event, 'severity')
+    name = _field(event, 'trigger_name') or _field(event, 'event_name') or 'ZabbixEvent'
+    host = _field(event, 'host')
+    labels = {}
+    # 事件标签(site、type等)用于路由，放在前面以免覆盖下面的固定标签
+    raw_tags = next((event[key] for key in FIELD_NAMES['tags'] if event.get(key)), '')
+    for tag, value in _tags('' if _UNRESOLVED_MACRO.match(str(raw_tags)) else raw_tags).items():
+        labels[_LABEL_NAME.sub('_', tag)] = value
+    labels.update({
+        'alertname': name,
+        'source': 'zabbix',
+        'severity': SEVERITY_MAP.get(raw_severity.lower(), 'warning'),
+        'zabbix_severity': raw_severity,
+        'zabbix_event_id': event_id,
+    })
+    if host:
+        labels['instance'] = host
+        labels['host'] = host
+    host_ip = _field(event, 'host_ip')
+    if host_ip:
+        labels['ip'] = host_ip
+    annotations = {'summary': _field(event, 'event_name') or name}
+    message = _field(event, 'message')
+    if message:
+        annotations['description'] = message
+    return {
+        'status': 'resolved' if recovery else 'firing',
+        'labels': labels,
+        'annotations': annotations,
+        'startsAt': _timestamp(_field(event, 'date'), _field(event, 'time')),
+        'endsAt': _timestamp(_field(event, 'recovery_date'), _field(event, 'recovery_time')) if recovery else '',
+        'generatorURL': _field(event, 'url'),
+        # 问题事件与其恢复事件共享同一个event_id，去重键和升级条目因此能在恢复时对应上
+        'fingerprint': f"zabbix-{event_id}",
+    }
+
+class ZabbixBatcher:
+    """把短时间内到达的告警合并为一批，由后台线程调用 flush(alerts)"""
+
+    def __init__(self, flush, window=2.0, max_batch=500):
+        self.flush = flush
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._deadline = None
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, alerts):
+        """加入一批告警；window为0时在调用线程中直接发送"""
+        if self.window <= 0:
+            self.flush(alerts)
+            return
+        with self._cond:
+            if not self._pending:
+                self._deadline = time.monotonic() + self.window
+            self._pending.extend(alerts)
+            metrics.QUEUE_DEPTH.labels('zabbix').inc(len(alerts))
+            if len(self._pending) >= self.max_batch:
+                self._deadline = time.monotonic()
+            self._cond.notify()
+
+    def start(self):
+        """启动后台线程；线程不会被fork继承，gunicorn worker中需重新调用"""
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='zabbix-batcher', daemon=True)
+        self._thread.start()
+
+    def _take(self):
+        with self._cond:
+            while True:
+                if self._pending:
+                    wait = self._deadline - time.monotonic()
+                    if wait <= 0 or self._stopping:
+                        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                        self._deadline = time.monotonic() if self._pending else None
+                        metrics.QUEUE_DEPTH.labels('zabbix').dec(len(batch))
+                        return batch
+                    self._cond.wait(wait)
+                elif self._stopping:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch):
+        metrics.ZABBIX_BATCH_SIZE.observe(len(batch))
+        try:
+            self.flush(batch)
+        except Exception as e:
+            logging.error(f"Sending batch of {len(batch)} Zabbix events failed: {e}", exc_info=True)
+
+    def stop(self, timeout=10.0):
+        """停止后台线程，发送剩余的告警"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._cond:
+            remaining, self._pending = self._pending, []
+        if remaining:
+            # 后台线程未运行或未能在timeout内处理完
+            metrics.QUEUE_DEPTH.labels('zabbix').dec(len(remaining))
+            self._flush(remaining)